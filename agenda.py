@@ -0,0 +1,241 @@
+###############################################################################
+# Agenda de recordatorios a partir del calendario
+#
+# Los recordatorios de todas las sesiones para todos los canales suscritos
+# salen de un único montículo (heap) de avisos y de una sola tarea que
+# duerme hasta el siguiente. Hay una entrada por sesión y por antelación
+# distinta entre los canales, no una por canal: al vencer, el aviso se
+# reparte entre los canales con esa antelación, así que miles de canales
+# suscritos no suponen miles de temporizadores.
+#
+# La agenda también tiene el calendario ordenado, para encontrar la próxima
+# carrera o sesión con una búsqueda binaria.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para la tarea en segundo plano
+import bisect                # Búsqueda de la próxima carrera o sesión
+import heapq                 # Montículo de avisos
+import itertools             # Orden de llegada para desempatar avisos
+import logging               # Para registro de eventos y errores
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from cache import temporada_actual
+from ergast import ClienteErgast, ErrorErgast, fijar_presupuesto
+from metricas import REGISTRO
+from modelos import Carrera
+from planificador import SESION_CARRERA
+from suscripciones import Suscripciones
+
+# Segundos máximos entre recargas del calendario (la caché de la API evita descargarlo cada vez)
+ESPERA_CALENDARIO = 60 * 60
+
+# Un recordatorio que vence con más retraso que este (p. ej. con el bot caído) ya no se envía
+RETRASO_MAXIMO = timedelta(minutes=5)
+
+avisos_enviados = REGISTRO.contador(
+    'f1bot_avisos_enviados_total', 'Avisos encolados en los canales suscritos, por tipo', ('tipo',))
+
+
+class Sesion(NamedTuple):
+    inicio: datetime             # UTC
+    sesion: str
+    carrera: Carrera
+
+
+class Aviso(NamedTuple):
+    instante: datetime           # Cuándo se envía (UTC)
+    antelacion: int              # Minutos antes del inicio de la sesión
+    sesion: Sesion
+
+
+# Función a la que se entrega cada recordatorio con los canales que lo reciben
+Publicador = Callable[[Aviso, Set[int]], Awaitable[None]]
+
+
+def sesiones_de(carreras: Iterable[Carrera]) -> List[Sesion]:
+    """
+    Devuelve todas las sesiones de un calendario (la carrera incluida), ordenadas por inicio.
+    """
+    sesiones = []
+    for carrera in carreras:
+        sesiones.extend(Sesion(inicio, sesion, carrera) for sesion, inicio in carrera.sesiones)
+        if carrera.inicio is not None:
+            sesiones.append(Sesion(carrera.inicio, SESION_CARRERA, carrera))
+    sesiones.sort(key=lambda sesion: sesion.inicio)
+    return sesiones
+
+
+class AgendaAvisos:
+    """
+    Calendario ordenado y recordatorios programados de la temporada en curso.
+
+    Args:
+        cliente (ClienteErgast): Cliente de la API, para leer el calendario
+        suscripciones (Suscripciones): Canales suscritos y sus antelaciones
+        espera_calendario (float): Segundos máximos entre recargas del calendario
+    """
+
+    def __init__(self, cliente: ClienteErgast, suscripciones: Suscripciones,
+                 espera_calendario: float = ESPERA_CALENDARIO):
+        self.cliente = cliente
+        self.suscripciones = suscripciones
+        self.espera_calendario = espera_calendario
+        self.carreras: List[Carrera] = []
+        self.sesiones: List[Sesion] = []
+        self._inicios_carrera: List[datetime] = []
+        self._inicios_sesion: List[datetime] = []
+        self._origen: Optional[List[Carrera]] = None
+        self._monticulo: List[Tuple[datetime, int, Aviso]] = []
+        self._orden = itertools.count()
+        self._antelaciones: Set[int] = set()
+        self._publicadores: List[Publicador] = []
+        self._despertar = asyncio.Event()
+        self._tarea: Optional[asyncio.Task] = None
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._monticulo)
+
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+
+    def iniciar(self) -> None:
+        """
+        Arranca la tarea en segundo plano (no hace nada si ya está en marcha).
+        """
+        if not self.activo:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        """
+        Cancela la tarea en segundo plano y espera a que termine.
+        """
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+        self._tarea = None
+
+    def escuchar(self, publicador: Publicador) -> None:
+        """
+        Registra una función a la que entregar cada recordatorio.
+        """
+        self._publicadores.append(publicador)
+
+    def dejar_de_escuchar(self, publicador: Publicador) -> None:
+        if publicador in self._publicadores:
+            self._publicadores.remove(publicador)
+
+    ###########################################################################
+    # Calendario
+    ###########################################################################
+
+    def programar(self, carreras: List[Carrera]) -> None:
+        """
+        Ordena el calendario y vuelve a programar los recordatorios de todas las antelaciones en uso.
+        """
+        self._origen = carreras
+        self.carreras = sorted((c for c in carreras if c.inicio is not None), key=lambda c: c.inicio)
+        self._inicios_carrera = [carrera.inicio for carrera in self.carreras]
+        self.sesiones = sesiones_de(carreras)
+        self._inicios_sesion = [sesion.inicio for sesion in self.sesiones]
+        self._monticulo = []
+        self._antelaciones = set()
+        for antelacion in list(self.suscripciones.antelaciones):
+            self._programar_antelacion(antelacion)
+        self._despertar.set()
+
+    def _programar_antelacion(self, antelacion: int) -> None:
+        ahora = datetime.utcnow()
+        margen = timedelta(minutes=antelacion)
+        for sesion in self.sesiones[bisect.bisect_right(self._inicios_sesion, ahora):]:
+            heapq.heappush(self._monticulo, (sesion.inicio - margen, next(self._orden),
+                                             Aviso(sesion.inicio - margen, antelacion, sesion)))
+        self._antelaciones.add(antelacion)
+
+    def nueva_antelacion(self, antelacion: int) -> None:
+        """
+        Programa los recordatorios de una antelación que acaba de elegir un canal, si aún no lo estaban.
+        """
+        if antelacion not in self._antelaciones:
+            self._programar_antelacion(antelacion)
+            self._despertar.set()
+
+    def proxima_carrera(self, ahora: datetime) -> Optional[Carrera]:
+        """
+        Devuelve la primera carrera que empieza después de `ahora`, o None si no queda ninguna en la agenda.
+        """
+        indice = bisect.bisect_right(self._inicios_carrera, ahora)
+        return self.carreras[indice] if indice < len(self.carreras) else None
+
+    def proxima_sesion(self, ahora: datetime) -> Optional[Sesion]:
+        indice = bisect.bisect_right(self._inicios_sesion, ahora)
+        return self.sesiones[indice] if indice < len(self.sesiones) else None
+
+    async def _cargar_calendario(self) -> None:
+        """
+        Lee el calendario de la temporada en curso (y, si ya ha terminado, el de la siguiente).
+        """
+        temporada = temporada_actual()
+        try:
+            carreras = await self.cliente.carreras(str(temporada))
+            ahora = datetime.utcnow()
+            if not any(c.inicio is not None and c.inicio > ahora for c in carreras):
+                carreras = carreras + await self.cliente.carreras(str(temporada + 1))
+        except ErrorErgast as e:
+            logging.warning(f"Agenda: no se pudo cargar el calendario ({e})")
+            return
+        # La caché devuelve la misma lista mientras el calendario no cambia
+        if carreras is not self._origen:
+            self.programar(carreras)
+
+    ###########################################################################
+    # Ejecución
+    ###########################################################################
+
+    async def _bucle(self) -> None:
+        """
+        Bucle principal: duerme hasta el siguiente aviso (o la siguiente recarga del calendario).
+        """
+        # Las consultas son de la agenda, no de ningún comando
+        fijar_presupuesto(None)
+        recarga = datetime.utcnow()
+        while True:
+            if datetime.utcnow() >= recarga:
+                await self._cargar_calendario()
+                recarga = datetime.utcnow() + timedelta(seconds=self.espera_calendario)
+            self._despertar.clear()
+            await self._vencer(datetime.utcnow())
+            siguiente = min(self._monticulo[0][0], recarga) if self._monticulo else recarga
+            # Un canal con una antelación nueva o un calendario nuevo despiertan la tarea antes.
+            # Con asyncio.wait (y no wait_for) una cancelación que coincide con el aviso no se pierde
+            despertar = asyncio.ensure_future(self._despertar.wait())
+            try:
+                await asyncio.wait((despertar,), timeout=max(0.0, (siguiente - datetime.utcnow()).total_seconds()))
+            finally:
+                despertar.cancel()
+
+    async def _vencer(self, ahora: datetime) -> None:
+        """
+        Entrega los avisos que ya han vencido a los canales con su antelación.
+        """
+        while self._monticulo and self._monticulo[0][0] <= ahora:
+            _, _, aviso = heapq.heappop(self._monticulo)
+            if ahora - aviso.instante > RETRASO_MAXIMO:
+                continue
+            canales = self.suscripciones.por_antelacion.get(aviso.antelacion)
+            if not canales:
+                continue
+            for publicador in list(self._publicadores):
+                try:
+                    await publicador(aviso, set(canales))
+                except Exception as e:
+                    logging.error(f"Error al publicar el recordatorio de {aviso.sesion.sesion} "
+                                  f"de {aviso.sesion.carrera.nombre}: {e}")
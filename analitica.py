@@ -0,0 +1,485 @@
+###############################################################################
+# Estadísticas de temporadas y trayectorias calculadas sobre columnas
+#
+# Los resultados de cada temporada se convierten una sola vez en una tabla de
+# columnas (arrays del módulo `array`, un valor de tipo fijo por fila) en lugar
+# de recorrer las listas de resultados en cada consulta. Pilotos y
+# constructores se numeran en catálogos comunes, así que las tablas de varias
+# temporadas se unen concatenando columnas, y los filtros, recuentos y sumas
+# se hacen con map/compress/count/sum sobre enteros, en C y sin crear objetos
+# por fila. Las temporadas terminadas se guardan en memoria para siempre: una
+# trayectoria de cientos de carreras se calcula en milisegundos.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para compartir las cargas de temporadas entre comandos
+import logging               # Para registro de eventos y errores
+import math                  # Para sumar puntos sin errores de redondeo
+from array import array      # Columnas de tipo fijo
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, compress, repeat
+from operator import eq, gt, lt
+from typing import Dict, Generic, Iterable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from cache import temporada_actual
+from ergast import PRIMERA_TEMPORADA_SPRINT, ClienteErgast, ErrorErgast, fijar_presupuesto
+from modelos import Constructor, Piloto, ResultadosCarrera
+
+# Segundos que un comando espera a que se carguen las temporadas que necesita;
+# si tardan más, la carga sigue en segundo plano y se avisa al usuario
+ESPERA_CARGA = 10.0
+
+# Pilotos que se muestran en la progresión de puntos de una temporada
+MAX_SERIES_PROGRESION = 5
+
+
+class CargaEnCurso(ErrorErgast):
+    """
+    Las temporadas que necesita la consulta todavía se están descargando.
+    """
+
+    def __init__(self, pendientes: int, total: int):
+        super().__init__(f"Cargando {pendientes} de {total} temporadas")
+        self.pendientes = pendientes
+        self.total = total
+
+
+T = TypeVar('T', Piloto, Constructor)
+
+
+class Catalogo(Generic[T]):
+    """
+    Numera pilotos o constructores para guardarlos en las columnas como enteros.
+    """
+
+    def __init__(self):
+        self._objetos: List[T] = []
+        self._indices: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._objetos)
+
+    def __getitem__(self, indice: int) -> T:
+        return self._objetos[indice]
+
+    def indice(self, objeto: T) -> int:
+        """
+        Devuelve el número de un piloto o constructor, asignándole uno si es nuevo.
+        """
+        indice = self._indices.get(objeto.id)
+        if indice is None:
+            indice = self._indices[objeto.id] = len(self._objetos)
+            self._objetos.append(objeto)
+        return indice
+
+    def buscar(self, objeto_id: str) -> Optional[int]:
+        return self._indices.get(objeto_id)
+
+
+def _entero(texto: str) -> int:
+    return int(texto) if texto.isdigit() else 0
+
+
+def _puntos(texto: str) -> float:
+    try:
+        return float(texto)
+    except ValueError:
+        return 0.0
+
+
+class TablaResultados:
+    """
+    Resultados de carrera en columnas, ordenados por carrera.
+
+    Cada carrera se identifica con `año * 100 + ronda`, de forma que las filas de
+    una carrera o de una temporada son un tramo contiguo que se localiza con bisect.
+    """
+
+    __slots__ = ('carrera', 'piloto', 'constructor', 'posicion', 'parrilla', 'puntos', 'terminada')
+
+    def __init__(self):
+        self.carrera = array('L')        # año * 100 + ronda
+        self.piloto = array('H')         # Número del piloto en el catálogo
+        self.constructor = array('H')    # Número del constructor en el catálogo
+        self.posicion = array('B')       # Posición final (1 = victoria)
+        self.parrilla = array('B')       # Posición de salida (0 = desde el pit lane)
+        self.puntos = array('d')         # Puntos de la carrera
+        self.terminada = array('B')      # 1 si cruzó la meta (aunque fuera doblado)
+
+    def __len__(self) -> int:
+        return len(self.carrera)
+
+    @classmethod
+    def desde_carreras(cls, carreras: Iterable[ResultadosCarrera], pilotos: Catalogo[Piloto],
+                       constructores: Catalogo[Constructor]) -> "TablaResultados":
+        """
+        Construye la tabla a partir de los resultados de varias carreras.
+
+        Args:
+            carreras: Resultados de cada carrera (de `ClienteErgast.resultados_temporada`)
+            pilotos (Catalogo): Catálogo común de pilotos
+            constructores (Catalogo): Catálogo común de constructores
+        """
+        tabla = cls()
+        for carrera, resultados in sorted(carreras, key=lambda c: (c.carrera.temporada, c.carrera.ronda)):
+            clave = carrera.temporada * 100 + carrera.ronda
+            tabla.carrera.extend(repeat(clave, len(resultados)))
+            for resultado in resultados:
+                tabla.piloto.append(pilotos.indice(resultado.piloto))
+                tabla.constructor.append(constructores.indice(resultado.constructor))
+                tabla.posicion.append(min(_entero(resultado.posicion), 255))
+                tabla.parrilla.append(min(_entero(resultado.parrilla), 255))
+                tabla.puntos.append(_puntos(resultado.puntos))
+                tabla.terminada.append(resultado.estado == 'Finished' or resultado.estado.startswith('+'))
+        return tabla
+
+    @classmethod
+    def unir(cls, tablas: Sequence["TablaResultados"]) -> "TablaResultados":
+        """
+        Une tablas de temporadas distintas concatenando sus columnas.
+        """
+        if len(tablas) == 1:
+            return tablas[0]
+        union = cls()
+        for tabla in sorted(tablas, key=lambda t: t.carrera[0] if len(t) else 0):
+            for columna in cls.__slots__:
+                getattr(union, columna).extend(getattr(tabla, columna))
+        return union
+
+    def tramo_temporada(self, año: int) -> Tuple[int, int]:
+        """
+        Devuelve el tramo [inicio, fin) de filas de una temporada.
+        """
+        return bisect_left(self.carrera, año * 100), bisect_left(self.carrera, (año + 1) * 100)
+
+    def tramo_carrera(self, carrera: int) -> Tuple[int, int]:
+        """
+        Devuelve el tramo [inicio, fin) de filas de una carrera (`año * 100 + ronda`).
+        """
+        return bisect_left(self.carrera, carrera), bisect_right(self.carrera, carrera)
+
+    @staticmethod
+    def filas(columna: array, valor: int, inicio: int = 0, fin: Optional[int] = None) -> array:
+        """
+        Devuelve los números de fila de un tramo en los que la columna vale `valor`.
+        """
+        fin = len(columna) if fin is None else fin
+        return array('L', compress(range(inicio, fin), map(eq, columna[inicio:fin], repeat(valor))))
+
+    @staticmethod
+    def tomar(columna: array, filas: Iterable[int]) -> array:
+        """
+        Devuelve los valores de una columna en las filas indicadas.
+        """
+        return array(columna.typecode, map(columna.__getitem__, filas))
+
+
+###############################################################################
+# Resultados de las consultas
+###############################################################################
+
+class TemporadaPiloto(NamedTuple):
+    año: int
+    carreras: int
+    victorias: int
+    podios: int
+    puntos: float
+
+
+class ResumenPiloto(NamedTuple):
+    piloto: Piloto
+    carreras: int
+    victorias: int
+    podios: int
+    poles: int                   # Salidas desde la primera posición de la parrilla
+    terminadas: int
+    mejor: int                   # Mejor posición final
+    puntos: float
+    equipos: Tuple[Constructor, ...]   # En el orden en que corrió con ellos
+    temporadas: Tuple[TemporadaPiloto, ...]
+
+
+class CaraACara(NamedTuple):
+    piloto_a: Piloto
+    piloto_b: Piloto
+    carreras: int                # Carreras que disputaron los dos
+    delante_a: int
+    delante_b: int
+    parrilla_a: int              # Veces que salió por delante (con los dos en parrilla)
+    parrilla_b: int
+    victorias_a: int
+    victorias_b: int
+    puntos_a: float
+    puntos_b: float
+    compañeros: int              # Carreras que disputaron en el mismo equipo
+
+
+class Compañero(NamedTuple):
+    piloto: Piloto
+    equipos: Tuple[Constructor, ...]
+    carreras: int
+    delante: int                 # Carreras que el piloto consultado terminó por delante
+    parrilla: int                # Carreras que salió por delante (con los dos en parrilla)
+    puntos: float                # Puntos del piloto consultado en esas carreras
+    puntos_compañero: float
+
+
+class Progresion(NamedTuple):
+    año: int
+    rondas: Tuple[int, ...]
+    series: Tuple[Tuple[Piloto, Tuple[float, ...]], ...]   # Puntos acumulados tras cada ronda
+
+
+###############################################################################
+# MOTOR DE ESTADÍSTICAS
+###############################################################################
+
+class Analitica:
+    """
+    Carga las temporadas en tablas de columnas y calcula estadísticas sobre ellas.
+
+    Las temporadas terminadas se cargan una vez y se guardan; la temporada en
+    curso se vuelve a convertir sólo cuando el cliente devuelve resultados nuevos.
+    Las cargas se comparten entre los comandos que piden la misma temporada y
+    no gastan el presupuesto de peticiones de ninguno de ellos.
+
+    Args:
+        cliente (ClienteErgast): Cliente de la API (con caché y snapshot)
+        espera (float): Segundos que un comando espera a las temporadas que faltan
+    """
+
+    def __init__(self, cliente: ClienteErgast, espera: float = ESPERA_CARGA):
+        self.cliente = cliente
+        self.espera = espera
+        self.pilotos: Catalogo[Piloto] = Catalogo()
+        self.constructores: Catalogo[Constructor] = Catalogo()
+        # (año, sprint) -> (resultados de origen si la temporada sigue en curso, tabla)
+        self._temporadas: Dict[Tuple[int, bool], Tuple[Optional[List[ResultadosCarrera]], TablaResultados]] = {}
+        self._cargas: Dict[Tuple[int, bool], asyncio.Task] = {}
+
+    @property
+    def temporadas_cargadas(self) -> int:
+        return len(self._temporadas)
+
+    async def _cargar_temporada(self, año: int, sprint: bool) -> TablaResultados:
+        # La carga es compartida: no cuenta para el presupuesto del comando que la lanzó
+        fijar_presupuesto(None)
+        if sprint:
+            carreras = await self.cliente.sprints_temporada(str(año)) if año >= PRIMERA_TEMPORADA_SPRINT else []
+        else:
+            carreras = await self.cliente.resultados_temporada(str(año))
+        guardada = self._temporadas.get((año, sprint))
+        if guardada is not None and guardada[0] is carreras:
+            return guardada[1]
+        tabla = TablaResultados.desde_carreras(carreras, self.pilotos, self.constructores)
+        self._temporadas[(año, sprint)] = (carreras if año >= temporada_actual() else None, tabla)
+        return tabla
+
+    def _carga_terminada(self, clave: Tuple[int, bool], tarea: asyncio.Task) -> None:
+        self._cargas.pop(clave, None)
+        if not tarea.cancelled() and tarea.exception() is not None:
+            logging.warning(f"No se pudo cargar la temporada {clave[0]} para las estadísticas: {tarea.exception()}")
+
+    async def temporadas(self, años: Sequence[int], sprint: bool = False) -> TablaResultados:
+        """
+        Devuelve una tabla con los resultados de varias temporadas.
+
+        Args:
+            años (list): Años de las temporadas
+            sprint (bool): True para los resultados de las carreras sprint en lugar de los de carrera
+
+        Raises:
+            CargaEnCurso: Si alguna temporada no termina de cargarse dentro de la espera
+            ErrorErgast: Si falla la descarga de alguna temporada
+        """
+        actual = temporada_actual()
+        tablas, pendientes = [], []
+        for año in años:
+            clave = (año, sprint)
+            guardada = self._temporadas.get(clave)
+            if guardada is not None and año < actual:
+                tablas.append(guardada[1])
+                continue
+            tarea = self._cargas.get(clave)
+            if tarea is None:
+                tarea = asyncio.create_task(self._cargar_temporada(año, sprint))
+                tarea.add_done_callback(lambda t, clave=clave: self._carga_terminada(clave, t))
+                self._cargas[clave] = tarea
+            pendientes.append(tarea)
+        if pendientes:
+            _, sin_terminar = await asyncio.wait(pendientes, timeout=self.espera)
+            if sin_terminar:
+                raise CargaEnCurso(len(sin_terminar), len(años))
+            tablas.extend(tarea.result() for tarea in pendientes)
+        if not tablas:
+            return TablaResultados()
+        return TablaResultados.unir(tablas)
+
+    async def temporada(self, año: int, sprint: bool = False) -> TablaResultados:
+        return await self.temporadas([año], sprint)
+
+    async def _años_piloto(self, piloto_id: str) -> List[int]:
+        años = await self.cliente.temporadas_piloto(piloto_id)
+        # La copia local sólo tiene temporadas terminadas: si los años salen de ella,
+        # se mira en la tabla de la temporada en curso si el piloto también la corre
+        actual = temporada_actual()
+        if años and años[-1] < actual and self.cliente.snapshot is not None:
+            tabla = await self.temporada(actual)
+            indice = self.pilotos.buscar(piloto_id)
+            if indice is not None and tabla.filas(tabla.piloto, indice):
+                años = años + [actual]
+        return años
+
+    async def trayectoria(self, *pilotos_id: str) -> TablaResultados:
+        """
+        Devuelve una tabla con todas las temporadas (completas) en las que corrió un
+        piloto o, si se indican varios, en las que corrieron todos ellos.
+        """
+        listas = await asyncio.gather(*(self._años_piloto(piloto_id) for piloto_id in pilotos_id))
+        return await self.temporadas(sorted(set(listas[0]).intersection(*listas[1:])))
+
+    ###########################################################################
+    # Consultas
+    ###########################################################################
+
+    def resumen(self, tabla: TablaResultados, piloto_id: str) -> Optional[ResumenPiloto]:
+        """
+        Carreras, victorias, podios, poles y puntos de un piloto, en total y por temporada.
+
+        Returns:
+            ResumenPiloto: El resumen, None si el piloto no corrió en las temporadas de la tabla
+        """
+        indice = self.pilotos.buscar(piloto_id)
+        filas = tabla.filas(tabla.piloto, indice) if indice is not None else array('L')
+        if not filas:
+            return None
+        carreras = tabla.tomar(tabla.carrera, filas)
+        posiciones = tabla.tomar(tabla.posicion, filas)
+        puntos = tabla.tomar(tabla.puntos, filas)
+
+        temporadas = []
+        for año in sorted({carrera // 100 for carrera in carreras}):
+            inicio, fin = bisect_left(carreras, año * 100), bisect_left(carreras, (año + 1) * 100)
+            tramo = posiciones[inicio:fin]
+            victorias = tramo.count(1)
+            temporadas.append(TemporadaPiloto(año, fin - inicio, victorias,
+                                              victorias + tramo.count(2) + tramo.count(3),
+                                              math.fsum(puntos[inicio:fin])))
+
+        victorias = posiciones.count(1)
+        equipos = dict.fromkeys(map(tabla.constructor.__getitem__, filas))
+        return ResumenPiloto(
+            piloto=self.pilotos[indice],
+            carreras=len(filas),
+            victorias=victorias,
+            podios=victorias + posiciones.count(2) + posiciones.count(3),
+            poles=tabla.tomar(tabla.parrilla, filas).count(1),
+            terminadas=sum(map(tabla.terminada.__getitem__, filas)),
+            mejor=min(p for p in posiciones if p) if any(posiciones) else 0,
+            puntos=math.fsum(puntos),
+            equipos=tuple(self.constructores[c] for c in equipos),
+            temporadas=tuple(temporadas),
+        )
+
+    def cara_a_cara(self, tabla: TablaResultados, piloto_a: str, piloto_b: str) -> Optional[CaraACara]:
+        """
+        Compara dos pilotos en las carreras que disputaron los dos.
+
+        Returns:
+            CaraACara: La comparación, None si alguno no corrió en las temporadas de la tabla
+        """
+        indice_a, indice_b = self.pilotos.buscar(piloto_a), self.pilotos.buscar(piloto_b)
+        if indice_a is None or indice_b is None:
+            return None
+        filas_a = tabla.filas(tabla.piloto, indice_a)
+        filas_b = tabla.filas(tabla.piloto, indice_b)
+        if not filas_a or not filas_b:
+            return None
+
+        # Emparejar las filas de los dos pilotos por carrera
+        por_carrera_a = dict(zip(map(tabla.carrera.__getitem__, filas_a), filas_a))
+        por_carrera_b = dict(zip(map(tabla.carrera.__getitem__, filas_b), filas_b))
+        comunes = sorted(por_carrera_a.keys() & por_carrera_b.keys())
+        filas_a = array('L', map(por_carrera_a.__getitem__, comunes))
+        filas_b = array('L', map(por_carrera_b.__getitem__, comunes))
+
+        posiciones_a, posiciones_b = tabla.tomar(tabla.posicion, filas_a), tabla.tomar(tabla.posicion, filas_b)
+        parrilla_a, parrilla_b = tabla.tomar(tabla.parrilla, filas_a), tabla.tomar(tabla.parrilla, filas_b)
+        # Una salida desde el pit lane (0) cuenta como la última posición de la parrilla
+        parrilla_a = array('H', (p or 999 for p in parrilla_a))
+        parrilla_b = array('H', (p or 999 for p in parrilla_b))
+        return CaraACara(
+            piloto_a=self.pilotos[indice_a],
+            piloto_b=self.pilotos[indice_b],
+            carreras=len(comunes),
+            delante_a=sum(map(lt, posiciones_a, posiciones_b)),
+            delante_b=sum(map(gt, posiciones_a, posiciones_b)),
+            parrilla_a=sum(map(lt, parrilla_a, parrilla_b)),
+            parrilla_b=sum(map(gt, parrilla_a, parrilla_b)),
+            victorias_a=posiciones_a.count(1),
+            victorias_b=posiciones_b.count(1),
+            puntos_a=math.fsum(map(tabla.puntos.__getitem__, filas_a)),
+            puntos_b=math.fsum(map(tabla.puntos.__getitem__, filas_b)),
+            compañeros=sum(map(eq, tabla.tomar(tabla.constructor, filas_a), tabla.tomar(tabla.constructor, filas_b))),
+        )
+
+    def compañeros(self, tabla: TablaResultados, piloto_id: str) -> Optional[List[Compañero]]:
+        """
+        Compara a un piloto con cada uno de sus compañeros de equipo.
+
+        Returns:
+            list: Un registro por compañero, en el orden en que lo fueron; None si
+                  el piloto no corrió en las temporadas de la tabla
+        """
+        indice = self.pilotos.buscar(piloto_id)
+        filas = tabla.filas(tabla.piloto, indice) if indice is not None else array('L')
+        if not filas:
+            return None
+
+        # compañero -> [carreras, delante, parrilla, puntos propios, puntos del compañero, equipos]
+        acumulado: Dict[int, list] = {}
+        for fila in filas:
+            equipo = tabla.constructor[fila]
+            inicio, fin = tabla.tramo_carrera(tabla.carrera[fila])
+            for otra in tabla.filas(tabla.constructor, equipo, inicio, fin):
+                compañero = tabla.piloto[otra]
+                if compañero == indice:
+                    continue
+                datos = acumulado.setdefault(compañero, [0, 0, 0, 0.0, 0.0, {}])
+                datos[0] += 1
+                datos[1] += tabla.posicion[fila] < tabla.posicion[otra]
+                datos[2] += (tabla.parrilla[fila] or 999) < (tabla.parrilla[otra] or 999)
+                datos[3] += tabla.puntos[fila]
+                datos[4] += tabla.puntos[otra]
+                datos[5][equipo] = None
+        return [Compañero(self.pilotos[compañero], tuple(self.constructores[e] for e in equipos),
+                          carreras, delante, parrilla, puntos, puntos_compañero)
+                for compañero, (carreras, delante, parrilla, puntos, puntos_compañero, equipos)
+                in acumulado.items()]
+
+    def progresion(self, tabla: TablaResultados, año: int,
+                   maximo: int = MAX_SERIES_PROGRESION) -> Optional[Progresion]:
+        """
+        Puntos acumulados ronda a ronda por los primeros pilotos de una temporada.
+
+        Returns:
+            Progresion: Las series de puntos, None si la temporada no tiene resultados
+        """
+        inicio, fin = tabla.tramo_temporada(año)
+        if inicio == fin:
+            return None
+        claves = sorted(set(tabla.carrera[inicio:fin]))
+        columna_de = {clave: i for i, clave in enumerate(claves)}
+
+        # Puntos de cada piloto en cada ronda, y después acumulados
+        por_piloto: Dict[int, array] = {}
+        for fila in range(inicio, fin):
+            serie = por_piloto.get(tabla.piloto[fila])
+            if serie is None:
+                serie = por_piloto[tabla.piloto[fila]] = array('d', bytes(8 * len(claves)))
+            serie[columna_de[tabla.carrera[fila]]] += tabla.puntos[fila]
+        acumulados = {piloto: tuple(accumulate(serie)) for piloto, serie in por_piloto.items()}
+        primeros = sorted(acumulados, key=lambda piloto: acumulados[piloto][-1], reverse=True)[:maximo]
+        return Progresion(año, tuple(clave % 100 for clave in claves),
+                          tuple((self.pilotos[piloto], acumulados[piloto]) for piloto in primeros))
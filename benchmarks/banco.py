@@ -0,0 +1,271 @@
+###############################################################################
+# Banco de pruebas de rendimiento de los comandos del bot
+#
+# Ejecuta los comandos del bot (paquete f1bot) contra un servidor local que imita la
+# API Ergast (ver servidor_fixtures.py) y un contexto de Discord falso que
+# sólo guarda lo enviado, así que no necesita red ni token de Discord.
+# Para cada comando informa del rendimiento (ejecuciones por segundo), de
+# las latencias p50/p95/p99 y del tiempo medio de cada fase, y puede
+# compararse con una ejecución anterior guardada en JSON.
+#
+# Uso:
+#   python benchmarks/banco.py --iteraciones 500 --concurrencia 20 --json actual.json
+#   python benchmarks/banco.py --base actual.json           # comparar con una base
+#   python benchmarks/banco.py grabar                         # grabar fixtures de la API real
+###############################################################################
+
+from __future__ import annotations
+
+import argparse              # Para los argumentos de la línea de comandos
+import asyncio               # Para ejecutar los comandos concurrentemente
+import itertools             # Para los identificadores de canal de los contextos falsos
+import json                  # Para guardar y comparar resultados
+import logging               # Para silenciar los logs del bot durante la medición
+import os                    # Para configurar el entorno antes de importar el bot
+import sys                   # Para importar los módulos del bot
+import time                  # Reloj de alta resolución
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_fixtures import DIRECTORIO_FIXTURES, ServidorFixtures, grabar
+
+_canales = itertools.count(1)
+
+# Comandos medidos y sus argumentos
+ESCENARIOS = {
+    'calendario': ('2023',),
+    'resultados': ('monaco', '2023'),
+    'proxima': (),
+    'piloto': ('alonso',),
+    'mundialpilotos': ('2023',),
+    'constructores': ('2023',),
+    'estadisticas': ('alonso', '2023'),
+    'duelo': ('alonso', 'hamilton', '2023'),
+    'compañeros': ('alonso', '2023'),
+    'progresion': ('2023',),
+}
+
+
+def rutas_escenarios() -> List[str]:
+    """
+    Rutas de la API que consultan los escenarios (las que hay que grabar).
+    """
+    actual = datetime.utcnow().year
+    return ['circuits', '2023/races', '2023/circuits', '2023/circuits/monaco/results', f'{actual}/races',
+            f'{actual + 1}/races', 'drivers', 'drivers/alonso', '2023/driverStandings', '2023/constructorStandings',
+            '2023/results']
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """
+    Percentil por el método del rango más cercano (valores ya ordenados).
+    """
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+class MensajeFalso:
+    """
+    Mensaje devuelto por el contexto falso; admite ediciones.
+    """
+
+    def __init__(self, ctx: "ContextoFalso"):
+        self._ctx = ctx
+
+    async def edit(self, **kwargs: Any) -> "MensajeFalso":
+        self._ctx.enviados.append(kwargs)
+        return self
+
+    async def delete(self) -> None:
+        pass
+
+
+class ContextoFalso:
+    """
+    Sustituto de `commands.Context` que guarda lo enviado en lugar de mandarlo a Discord.
+    """
+
+    def __init__(self, contenido: str = ''):
+        self.enviados: List[Dict[str, Any]] = []
+        self.message = type('Mensaje', (), {'content': contenido})()
+        self.interaction = None
+        # Mensaje directo, fuera de cualquier servidor
+        self.guild = None
+        # Un canal distinto por contexto: el límite de envíos por canal no debe afectar a la medida
+        self.channel = type('Canal', (), {'id': next(_canales)})()
+
+    async def send(self, content: Optional[str] = None, **kwargs: Any) -> MensajeFalso:
+        kwargs['content'] = content
+        self.enviados.append(kwargs)
+        return MensajeFalso(self)
+
+
+async def medir(bot: Any, nombre: str, args: tuple, iteraciones: int, concurrencia: int,
+                servidor: ServidorFixtures) -> Dict[str, Any]:
+    """
+    Ejecuta un comando `iteraciones` veces con `concurrencia` ejecuciones simultáneas.
+
+    Returns:
+        dict: Rendimiento, percentiles de latencia (ms), tiempo medio por fase (ms) y peticiones a la API
+    """
+    from metricas import iniciar_invocacion, terminar_invocacion
+
+    comando = bot.get_command(nombre)
+    contenido = ' '.join(('!' + nombre,) + args)
+    latencias: List[float] = []
+    fases: Dict[str, float] = defaultdict(float)
+    mensajes = 0
+    pendientes = iter(range(iteraciones))
+    peticiones_antes = servidor.peticiones
+
+    async def trabajador() -> None:
+        nonlocal mensajes
+        for _ in pendientes:
+            ctx = ContextoFalso(contenido)
+            inicio = time.perf_counter()
+            iniciar_invocacion(nombre)
+            await comando.callback(comando.cog, ctx, *args)
+            invocacion = terminar_invocacion()
+            latencias.append(time.perf_counter() - inicio)
+            for fase, duracion in invocacion.fases.items():
+                fases[fase] += duracion
+            mensajes += len(ctx.enviados)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        'iteraciones': len(latencias),
+        'por_segundo': len(latencias) / total if total else 0.0,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'max_ms': latencias[-1] * 1000 if latencias else 0.0,
+        'fases_ms': {fase: duracion / len(latencias) * 1000 for fase, duracion in sorted(fases.items())},
+        'mensajes': mensajes / len(latencias) if latencias else 0.0,
+        'peticiones_api': servidor.peticiones - peticiones_antes,
+    }
+
+
+def imprimir(resultados: Dict[str, Dict[str, Any]], base: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    """
+    Muestra una tabla con los resultados y, si hay base, la variación respecto a ella.
+    """
+    cabecera = f"{'comando':<16}{'ejec/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'API':>6}  fases (ms medios)"
+    print(cabecera)
+    print('-' * len(cabecera))
+    for nombre, r in resultados.items():
+        fases = ' '.join(f'{f}={d:.3f}' for f, d in r['fases_ms'].items())
+        print(f"{nombre:<16}{r['por_segundo']:>10.1f}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+              f"{r['p99_ms']:>10.3f}{r['peticiones_api']:>6}  {fases}")
+        anterior = (base or {}).get(nombre)
+        if anterior:
+            variaciones = []
+            for clave in ('por_segundo', 'p50_ms', 'p95_ms', 'p99_ms'):
+                if anterior[clave]:
+                    variaciones.append(f"{clave} {(r[clave] / anterior[clave] - 1) * 100:+.1f}%")
+            print(f"{'':<16}vs. base: {', '.join(variaciones)}")
+
+
+async def ejecutar(argumentos: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """
+    Arranca el servidor de fixtures, prepara el bot y mide cada escenario.
+    """
+    # El bot lee su configuración al crearse: sin token real, sin snapshot ni caché en disco
+    os.environ.setdefault('DISCORD_TOKEN', 'banco-de-pruebas')
+    os.environ['F1_SNAPSHOT'] = ''
+    os.environ['ERGAST_CACHE_DISCO'] = ''
+    os.environ['F1_SUSCRIPCIONES'] = ':memory:'
+    from embeds import CacheEmbeds
+    from f1bot.bot import FormulaBot
+    from f1bot.configuracion import Configuracion
+    logging.getLogger().setLevel(logging.WARNING)
+
+    servidor = ServidorFixtures(argumentos.fixtures, latencia=argumentos.latencia_api / 1000)
+    await servidor.iniciar()
+    bot = FormulaBot(Configuracion())
+    await bot.cargar_extensiones()
+    servicios = bot.servicios
+    cliente = servicios.cliente_ergast
+    cliente.url_base = servidor.url_base
+    if not argumentos.con_limitador:
+        cliente.limitador = None
+    if argumentos.sin_cache:
+        cliente.cache = None
+        servicios.cache_embeds = CacheEmbeds(max_entradas=0)
+    await cliente.iniciar()
+    await servicios.cargar_indice_pilotos()
+
+    comandos = argumentos.comandos.split(',') if argumentos.comandos else list(ESCENARIOS)
+    resultados = {}
+    try:
+        for nombre in comandos:
+            args = ESCENARIOS[nombre]
+            # Calentamiento: índice de circuitos, cachés e importaciones perezosas
+            for _ in range(argumentos.calentamiento):
+                comando = bot.get_command(nombre)
+                await comando.callback(comando.cog, ContextoFalso(), *args)
+            resultados[nombre] = await medir(bot, nombre, args, argumentos.iteraciones,
+                                             argumentos.concurrencia, servidor)
+    finally:
+        await cliente.cerrar()
+        await servidor.detener()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento del bot de F1 (sin red)")
+    subcomandos = parser.add_subparsers(dest='accion')
+    parser_grabar = subcomandos.add_parser('grabar', help="Graba de la API real las respuestas que usa el banco")
+    parser_grabar.add_argument('--url', default=None, help="URL base de la API (por defecto, la de ergast.py)")
+    parser.add_argument('--iteraciones', type=int, default=200, help="Ejecuciones de cada comando")
+    parser.add_argument('--concurrencia', type=int, default=10, help="Ejecuciones simultáneas")
+    parser.add_argument('--comandos', default='', help=f"Comandos a medir, separados por comas ({','.join(ESCENARIOS)})")
+    parser.add_argument('--calentamiento', type=int, default=1, help="Ejecuciones previas sin medir")
+    parser.add_argument('--latencia-api', type=float, default=0.0, help="Milisegundos de latencia simulada de la API")
+    parser.add_argument('--sin-cache', action='store_true', help="Desactiva las cachés (todas las consultas van al servidor)")
+    parser.add_argument('--con-limitador', action='store_true', help="Mantiene el límite de peticiones de la API")
+    parser.add_argument('--fixtures', default=DIRECTORIO_FIXTURES, help="Directorio de respuestas grabadas")
+    parser.add_argument('--json', help="Fichero donde guardar los resultados")
+    parser.add_argument('--base', help="Resultados anteriores (JSON) con los que comparar")
+    argumentos = parser.parse_args()
+
+    if argumentos.accion == 'grabar':
+        from ergast import URL_BASE, ClienteErgast
+        from limitador import LimitadorPeticiones
+
+        async def grabar_fixtures() -> None:
+            cliente = ClienteErgast(argumentos.url or URL_BASE, limitador=LimitadorPeticiones())
+            try:
+                for fichero in await grabar(cliente, rutas_escenarios(), argumentos.fixtures):
+                    print(f"Grabado {fichero}")
+            finally:
+                await cliente.cerrar()
+
+        asyncio.run(grabar_fixtures())
+        return
+
+    resultados = asyncio.run(ejecutar(argumentos))
+    base = None
+    if argumentos.base:
+        with open(argumentos.base, encoding='utf-8') as f:
+            base = json.load(f)
+    print(f"Iteraciones: {argumentos.iteraciones}, concurrencia: {argumentos.concurrencia}, "
+          f"latencia API: {argumentos.latencia_api} ms, cachés: {'no' if argumentos.sin_cache else 'sí'}")
+    imprimir(resultados, base)
+    if argumentos.json:
+        with open(argumentos.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
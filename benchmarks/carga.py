@@ -0,0 +1,422 @@
+###############################################################################
+# Generador de carga: muchos servidores de Discord usando el bot a la vez
+#
+# Envía miles de mensajes de comando sintéticos a la instancia real de
+# `commands.Bot` del paquete f1bot (prefijo, análisis de argumentos, hooks y
+# `ctx.send` incluidos). El transporte de Discord es simulado: los envíos no
+# salen de este proceso pero tardan lo que se configure. La API Ergast es el
+# servidor local de servidor_fixtures.py.
+#
+# Las llegadas siguen un perfil (carga normal, avalancha tras una carrera...)
+# y cada cierto tiempo se informa de latencias, invocaciones en curso, colas,
+# errores y memoria, para ver dónde deja de dar abasto el bot.
+#
+# Uso:
+#   python benchmarks/carga.py --perfil post_carrera --tasa 300 --duracion 60
+###############################################################################
+
+from __future__ import annotations
+
+import argparse              # Para los argumentos de la línea de comandos
+import asyncio               # Para generar la carga concurrentemente
+import itertools             # Para los identificadores sintéticos
+import json                  # Para guardar el informe
+import logging               # Para silenciar los logs del bot durante la prueba
+import os                    # Para configurar el entorno antes de importar el bot
+import random                # Para las llegadas y la mezcla de comandos
+import sys                   # Para importar los módulos del bot
+import time                  # Reloj de alta resolución
+import tracemalloc           # Para medir el crecimiento de la memoria de Python
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from banco import percentil
+from servidor_fixtures import DIRECTORIO_FIXTURES, ServidorFixtures
+
+_ids = itertools.count(10 ** 17)
+
+
+###############################################################################
+# Transporte de Discord simulado
+###############################################################################
+
+class HTTPSimulado:
+    """
+    Sustituto del cliente HTTP de discord.py: cuenta los envíos y simula su latencia.
+    """
+
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self.enviados = 0
+        self.editados = 0
+        self.en_vuelo = 0
+
+    async def _esperar(self) -> None:
+        self.en_vuelo += 1
+        try:
+            if self.latencia:
+                await asyncio.sleep(random.expovariate(1 / self.latencia))
+        finally:
+            self.en_vuelo -= 1
+
+    async def send_message(self, channel_id: int, *, params: Any) -> Dict[str, Any]:
+        await self._esperar()
+        self.enviados += 1
+        return {'id': next(_ids), 'channel_id': channel_id}
+
+    async def edit_message(self, channel_id: int, message_id: int, *, params: Any) -> Dict[str, Any]:
+        await self._esperar()
+        self.editados += 1
+        return {'id': message_id, 'channel_id': channel_id}
+
+
+class MensajeEnviado:
+    """
+    Mensaje que devuelve `ctx.send` en el transporte simulado.
+    """
+
+    def __init__(self, estado: "EstadoSimulado", canal: "CanalSimulado", mensaje_id: int):
+        self._state = estado
+        self.channel = canal
+        self.id = mensaje_id
+
+    @property
+    def jump_url(self) -> str:
+        return f'https://discord.com/channels/{self.channel.guild.id}/{self.channel.id}/{self.id}'
+
+    async def edit(self, **kwargs: Any) -> "MensajeEnviado":
+        await self._state.http.edit_message(self.channel.id, self.id, params=kwargs)
+        return self
+
+    async def delete(self, *, delay: Optional[float] = None) -> None:
+        pass
+
+
+class EstadoSimulado:
+    """
+    Sustituto del estado de conexión de discord.py (sólo lo que usa `Messageable.send`).
+    """
+    allowed_mentions = None
+
+    def __init__(self, http: HTTPSimulado):
+        self.http = http
+
+    def create_message(self, *, channel: "CanalSimulado", data: Dict[str, Any]) -> MensajeEnviado:
+        return MensajeEnviado(self, channel, data['id'])
+
+    def store_view(self, view: Any, message_id: Optional[int] = None) -> None:
+        pass
+
+
+class GremioSimulado:
+    def __init__(self, gremio_id: int):
+        self.id = gremio_id
+
+
+class CanalSimulado:
+    def __init__(self, canal_id: int, gremio: GremioSimulado):
+        self.id = canal_id
+        self.guild = gremio
+
+    async def _get_channel(self) -> "CanalSimulado":
+        return self
+
+
+class AutorSimulado:
+    bot = False
+
+    def __init__(self, autor_id: int):
+        self.id = autor_id
+        self.mention = f'<@{autor_id}>'
+
+
+class MensajeSimulado:
+    """
+    Mensaje de un usuario con un comando, con los atributos que consulta `Bot.process_commands`.
+    """
+
+    def __init__(self, contenido: str, autor: AutorSimulado, canal: CanalSimulado, estado: EstadoSimulado):
+        self.id = next(_ids)
+        self.content = contenido
+        self.author = autor
+        self.channel = canal
+        self.guild = canal.guild
+        self._state = estado
+        self.interaction_metadata = None
+        self.attachments = []
+
+
+###############################################################################
+# Perfiles de carga
+###############################################################################
+
+def _mezcla_historica(azar: random.Random, actual: int) -> str:
+    año = azar.randint(1990, actual - 1)
+    comando = azar.choice(('calendario {a}', 'mundialpilotos {a}', 'constructores {a}', 'resultados monaco {a}',
+                           'resultados silverstone {a}', 'resultados monza {a}'))
+    return '!' + comando.format(a=año)
+
+
+def crear_perfiles(actual: int, ultima_carrera: str) -> Dict[str, Tuple[Callable[[float], float], List[Tuple[float, Any]]]]:
+    """
+    Perfiles de carga: (multiplicador de la tasa según la fracción de tiempo transcurrida,
+    mezcla de comandos como pares (peso, texto o función que genera el texto)).
+    """
+    normal = [
+        (0.2, '!proxima'),
+        (0.15, f'!resultados "{ultima_carrera}" {actual}'),
+        (0.15, '!mundialpilotos'),
+        (0.1, '!constructores'),
+        (0.1, f'!calendario {actual}'),
+        (0.1, lambda azar: azar.choice(('!piloto alonso', '!piloto hamilton', '!piloto max_verstappen'))),
+        (0.05, lambda azar: azar.choice(('!estadisticas alonso', '!duelo alonso hamilton', '!progresion'))),
+        (0.15, lambda azar: _mezcla_historica(azar, actual)),
+    ]
+    post_carrera = [
+        (0.55, f'!resultados "{ultima_carrera}" {actual}'),
+        (0.3, '!mundialpilotos'),
+        (0.1, '!constructores'),
+        (0.05, '!proxima'),
+    ]
+    return {
+        # Tasa constante con la mezcla habitual
+        'normal': (lambda fraccion: 1.0, normal),
+        # Tráfico tranquilo y, al terminar la carrera (20 % del tiempo), una avalancha que se va apagando
+        'post_carrera': (lambda fraccion: 0.1 if fraccion < 0.2 else max(0.2, 1.0 - (fraccion - 0.2) * 1.2),
+                         post_carrera),
+        # Consultas de temporadas antiguas: sobre todo fallos de caché
+        'historico': (lambda fraccion: 1.0, [(1.0, lambda azar: _mezcla_historica(azar, actual))]),
+    }
+
+
+def elegir(azar: random.Random, mezcla: Sequence[Tuple[float, Any]]) -> str:
+    pesos = [peso for peso, _ in mezcla]
+    _, comando = azar.choices(mezcla, weights=pesos)[0]
+    return comando(azar) if callable(comando) else comando
+
+
+def memoria_mb() -> float:
+    """
+    Memoria residente del proceso en MB (Linux), o el máximo alcanzado en otros sistemas.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+###############################################################################
+# Ejecución
+###############################################################################
+
+async def generar_carga(argumentos: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.setdefault('DISCORD_TOKEN', 'generador-de-carga')
+    os.environ['F1_SNAPSHOT'] = ''
+    os.environ['ERGAST_CACHE_DISCO'] = ''
+    os.environ['F1_SUSCRIPCIONES'] = ':memory:'
+    from cache import DURACION_CARRERA, temporada_actual
+    from discord.ext import commands
+    from enfriamiento import Enfriamientos, RespuestaCompartida
+    from f1bot.bot import FormulaBot
+    from f1bot.configuracion import Configuracion
+    logging.getLogger().setLevel(logging.WARNING)
+
+    servidor = ServidorFixtures(argumentos.fixtures, latencia=argumentos.latencia_api / 1000)
+    await servidor.iniciar()
+    bot = FormulaBot(Configuracion())
+    await bot.cargar_extensiones()
+    servicios = bot.servicios
+    cliente = servicios.cliente_ergast
+    cliente.url_base = servidor.url_base
+    if not argumentos.con_limitador:
+        cliente.limitador = None
+    await cliente.iniciar()
+    await servicios.cargar_indice_circuitos()
+    await servicios.cargar_indice_pilotos()
+    if argumentos.sin_enfriamientos:
+        servicios.enfriamientos = Enfriamientos(usuario=None, servidor=None, comandos={})
+
+    # La avalancha tras una carrera pregunta por la última carrera disputada
+    actual = temporada_actual()
+    ahora = datetime.utcnow()
+    disputadas = [c for c in await cliente.carreras(str(actual)) if c.inicio and c.inicio + DURACION_CARRERA < ahora]
+    ultima = disputadas[-1].circuito.id if disputadas else 'monaco'
+    forma, mezcla = crear_perfiles(actual, ultima)[argumentos.perfil]
+
+    # Sin conexión real no hay usuario del bot, y `get_context` lo consulta
+    bot._connection.user = AutorSimulado(next(_ids))
+    # Sin `bot.start` tampoco se asocia el bucle, y los eventos (p. ej. on_command_error) lo necesitan
+    bot.loop = asyncio.get_running_loop()
+    http = HTTPSimulado(argumentos.latencia_discord / 1000)
+    estado = EstadoSimulado(http)
+    gremios = [GremioSimulado(next(_ids)) for _ in range(argumentos.gremios)]
+    canales = [CanalSimulado(next(_ids), g) for g in gremios for _ in range(argumentos.canales)]
+    azar = random.Random(argumentos.semilla)
+
+    latencias: Dict[str, List[float]] = defaultdict(list)
+    errores: Dict[str, int] = defaultdict(int)
+    rechazados: Dict[str, int] = defaultdict(int)
+    compartidos: Dict[str, int] = defaultdict(int)
+    en_curso = 0
+    max_en_curso = 0
+    enviados = 0
+
+    async def error_de_comando(ctx: Any, error: Exception) -> None:
+        nombre = ctx.command.name if ctx.command else '?'
+        # Los enfriamientos y las respuestas compartidas son rechazos esperados, no errores
+        if isinstance(error, commands.CommandOnCooldown):
+            rechazados[nombre] += 1
+        elif isinstance(error, RespuestaCompartida):
+            compartidos[nombre] += 1
+        else:
+            errores[nombre] += 1
+
+    bot.add_listener(error_de_comando, 'on_command_error')
+
+    async def invocar(texto: str) -> None:
+        nonlocal en_curso
+        nombre = texto.split(' ', 1)[0].lstrip('!')
+        mensaje = MensajeSimulado(texto, AutorSimulado(azar.randint(1, 10 ** 6)), azar.choice(canales), estado)
+        en_curso += 1
+        inicio = time.perf_counter()
+        try:
+            await bot.process_commands(mensaje)
+        except Exception:
+            errores[nombre] += 1
+        finally:
+            en_curso -= 1
+            latencias[nombre].append(time.perf_counter() - inicio)
+
+    if argumentos.tracemalloc:
+        tracemalloc.start()
+    memoria_inicial = memoria_mb()
+    muestras = []
+    tareas = set()
+    inicio = time.perf_counter()
+    proximo_informe = argumentos.intervalo
+    ultimo_recuento = 0
+    print(f"{'t (s)':>6}{'enviados':>10}{'ejec/s':>9}{'en curso':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'errores':>9}{'API cola':>10}{'Discord':>9}{'MB':>8}")
+    try:
+        while True:
+            transcurrido = time.perf_counter() - inicio
+            if transcurrido >= argumentos.duracion:
+                break
+            tasa = argumentos.tasa * forma(transcurrido / argumentos.duracion)
+            # Llegadas de Poisson: esperas exponenciales entre comandos
+            await asyncio.sleep(random.expovariate(tasa) if tasa > 0 else 0.1)
+            tarea = asyncio.create_task(invocar(elegir(azar, mezcla)))
+            tareas.add(tarea)
+            tarea.add_done_callback(tareas.discard)
+            enviados += 1
+            max_en_curso = max(max_en_curso, en_curso)
+
+            if transcurrido >= proximo_informe:
+                proximo_informe += argumentos.intervalo
+                todas = sorted(l for lista in latencias.values() for l in lista[-2000:])
+                completados = sum(len(lista) for lista in latencias.values())
+                muestra = {
+                    't': round(transcurrido, 1),
+                    'enviados': enviados,
+                    'por_segundo': (completados - ultimo_recuento) / argumentos.intervalo,
+                    'en_curso': en_curso,
+                    'p50_ms': percentil(todas, 50) * 1000,
+                    'p95_ms': percentil(todas, 95) * 1000,
+                    'errores': sum(errores.values()),
+                    'cola_api': cliente.estadisticas()['en_cola'] + cliente.estadisticas()['en_curso'],
+                    'envios_discord': http.en_vuelo,
+                    'memoria_mb': memoria_mb(),
+                }
+                if argumentos.tracemalloc:
+                    muestra['python_mb'] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+                ultimo_recuento = completados
+                muestras.append(muestra)
+                print(f"{muestra['t']:>6}{enviados:>10}{muestra['por_segundo']:>9.0f}{en_curso:>10}"
+                      f"{muestra['p50_ms']:>9.2f}{muestra['p95_ms']:>9.2f}{muestra['errores']:>9}"
+                      f"{muestra['cola_api']:>10}{http.en_vuelo:>9}{muestra['memoria_mb']:>8.1f}")
+        # Esperar a que terminen las invocaciones pendientes
+        if tareas:
+            await asyncio.wait(tareas, timeout=argumentos.espera_final)
+    finally:
+        bot.remove_listener(error_de_comando, 'on_command_error')
+        await cliente.cerrar()
+        await servidor.detener()
+        if argumentos.tracemalloc:
+            tracemalloc.stop()
+
+    por_comando = {}
+    for nombre, lista in sorted(latencias.items()):
+        lista.sort()
+        por_comando[nombre] = {
+            'invocaciones': len(lista),
+            'errores': errores.get(nombre, 0),
+            'rechazados': rechazados.get(nombre, 0),
+            'compartidos': compartidos.get(nombre, 0),
+            'p50_ms': percentil(lista, 50) * 1000,
+            'p95_ms': percentil(lista, 95) * 1000,
+            'p99_ms': percentil(lista, 99) * 1000,
+            'max_ms': lista[-1] * 1000,
+        }
+    return {
+        'perfil': argumentos.perfil,
+        'enviados': enviados,
+        'sin_terminar': len(tareas),
+        'max_en_curso': max_en_curso,
+        'peticiones_api': servidor.peticiones,
+        'mensajes_discord': http.enviados + http.editados,
+        'memoria_inicial_mb': memoria_inicial,
+        'memoria_final_mb': memoria_mb(),
+        'comandos': por_comando,
+        'muestras': muestras,
+    }
+
+
+def imprimir_informe(informe: Dict[str, Any]) -> None:
+    print()
+    print(f"Perfil {informe['perfil']}: {informe['enviados']} comandos, {informe['sin_terminar']} sin terminar, "
+          f"máximo {informe['max_en_curso']} en curso, {informe['peticiones_api']} peticiones a la API, "
+          f"{informe['mensajes_discord']} mensajes a Discord")
+    print(f"Memoria: {informe['memoria_inicial_mb']:.1f} MB -> {informe['memoria_final_mb']:.1f} MB")
+    print(f"{'comando':<16}{'invoc.':>8}{'errores':>9}{'enfriam.':>10}{'compart.':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for nombre, r in informe['comandos'].items():
+        print(f"{nombre:<16}{r['invocaciones']:>8}{r['errores']:>9}{r['rechazados']:>10}{r['compartidos']:>10}"
+              f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generador de carga del bot de F1 (sin red ni Discord)")
+    parser.add_argument('--perfil', choices=('normal', 'post_carrera', 'historico'), default='normal')
+    parser.add_argument('--tasa', type=float, default=100, help="Comandos por segundo en el pico del perfil")
+    parser.add_argument('--duracion', type=float, default=30, help="Segundos de generación de carga")
+    parser.add_argument('--gremios', type=int, default=1000, help="Servidores de Discord simulados")
+    parser.add_argument('--canales', type=int, default=3, help="Canales por servidor")
+    parser.add_argument('--latencia-api', type=float, default=20, help="Milisegundos de latencia de la API simulada")
+    parser.add_argument('--latencia-discord', type=float, default=50, help="Milisegundos medios por envío a Discord")
+    parser.add_argument('--con-limitador', action='store_true', help="Mantiene el límite de peticiones de la API")
+    parser.add_argument('--sin-enfriamientos', action='store_true',
+                        help="Desactiva los enfriamientos por usuario, servidor y comando")
+    parser.add_argument('--intervalo', type=float, default=5, help="Segundos entre informes parciales")
+    parser.add_argument('--espera-final', type=float, default=30, help="Segundos máximos de espera a los pendientes")
+    parser.add_argument('--tracemalloc', action='store_true', help="Mide también la memoria de Python con tracemalloc")
+    parser.add_argument('--semilla', type=int, default=1, help="Semilla de la mezcla de comandos")
+    parser.add_argument('--fixtures', default=DIRECTORIO_FIXTURES, help="Directorio de respuestas grabadas")
+    parser.add_argument('--json', help="Fichero donde guardar el informe")
+    argumentos = parser.parse_args()
+
+    informe = asyncio.run(generar_carga(argumentos))
+    imprimir_informe(informe)
+    if argumentos.json:
+        with open(argumentos.json, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
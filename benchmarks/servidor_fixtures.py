@@ -0,0 +1,350 @@
+###############################################################################
+# Servidor local de respuestas grabadas de la API Ergast
+#
+# Sirve desde ficheros JSON las respuestas que usa el banco de pruebas, de
+# forma que se pueda medir el bot sin red. Cada fichero guarda la respuesta
+# completa de una ruta (todas las páginas juntas) y el servidor aplica los
+# parámetros `limit` y `offset` como lo haría la API.
+#
+# Si falta el fichero de una ruta, se genera una respuesta sintética
+# determinista con el mismo formato y un tamaño realista (24 carreras,
+# 20 pilotos, 10 equipos), para que el banco funcione sin haber grabado nada.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para simular la latencia de la API
+import hashlib               # ETag de cada respuesta
+import json                  # Para leer y escribir las respuestas
+import os                    # Para las rutas de los ficheros
+import random                # Datos sintéticos reproducibles
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web      # Servidor HTTP local
+
+# Directorio por defecto de las respuestas grabadas
+DIRECTORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Tabla y lista de registros de cada endpoint dentro de MRData
+TABLAS = {
+    'races': ('RaceTable', 'Races'),
+    'results': ('RaceTable', 'Races'),
+    'sprint': ('RaceTable', 'Races'),
+    'circuits': ('CircuitTable', 'Circuits'),
+    'drivers': ('DriverTable', 'Drivers'),
+    'constructors': ('ConstructorTable', 'Constructors'),
+    'seasons': ('SeasonTable', 'Seasons'),
+    'driverStandings': ('StandingsTable', 'StandingsLists'),
+    'constructorStandings': ('StandingsTable', 'StandingsLists'),
+}
+
+
+def tabla_de_ruta(ruta: str) -> Optional[Tuple[str, str]]:
+    """
+    Devuelve (tabla, lista) de los registros de una ruta, según su último endpoint conocido.
+    """
+    for segmento in reversed(ruta.split('/')):
+        if segmento in TABLAS:
+            return TABLAS[segmento]
+    return None
+
+
+def fichero_de_ruta(directorio: str, ruta: str) -> str:
+    """
+    Nombre del fichero que guarda la respuesta de una ruta (p. ej. "2023/races" -> "2023__races.json").
+    """
+    return os.path.join(directorio, ruta.strip('/').replace('/', '__') + '.json')
+
+
+###############################################################################
+# Datos sintéticos
+###############################################################################
+
+_CIRCUITOS = [
+    ('bahrain', 'Bahrain International Circuit', 'Sakhir', 'Bahrain', 'Bahrain Grand Prix'),
+    ('jeddah', 'Jeddah Corniche Circuit', 'Jeddah', 'Saudi Arabia', 'Saudi Arabian Grand Prix'),
+    ('albert_park', 'Albert Park Grand Prix Circuit', 'Melbourne', 'Australia', 'Australian Grand Prix'),
+    ('suzuka', 'Suzuka Circuit', 'Suzuka', 'Japan', 'Japanese Grand Prix'),
+    ('shanghai', 'Shanghai International Circuit', 'Shanghai', 'China', 'Chinese Grand Prix'),
+    ('miami', 'Miami International Autodrome', 'Miami', 'USA', 'Miami Grand Prix'),
+    ('imola', 'Autodromo Enzo e Dino Ferrari', 'Imola', 'Italy', 'Emilia Romagna Grand Prix'),
+    ('monaco', 'Circuit de Monaco', 'Monte-Carlo', 'Monaco', 'Monaco Grand Prix'),
+    ('villeneuve', 'Circuit Gilles Villeneuve', 'Montreal', 'Canada', 'Canadian Grand Prix'),
+    ('catalunya', 'Circuit de Barcelona-Catalunya', 'Montmeló', 'Spain', 'Spanish Grand Prix'),
+    ('red_bull_ring', 'Red Bull Ring', 'Spielberg', 'Austria', 'Austrian Grand Prix'),
+    ('silverstone', 'Silverstone Circuit', 'Silverstone', 'UK', 'British Grand Prix'),
+    ('hungaroring', 'Hungaroring', 'Budapest', 'Hungary', 'Hungarian Grand Prix'),
+    ('spa', 'Circuit de Spa-Francorchamps', 'Spa', 'Belgium', 'Belgian Grand Prix'),
+    ('zandvoort', 'Circuit Park Zandvoort', 'Zandvoort', 'Netherlands', 'Dutch Grand Prix'),
+    ('monza', 'Autodromo Nazionale di Monza', 'Monza', 'Italy', 'Italian Grand Prix'),
+    ('baku', 'Baku City Circuit', 'Baku', 'Azerbaijan', 'Azerbaijan Grand Prix'),
+    ('marina_bay', 'Marina Bay Street Circuit', 'Marina Bay', 'Singapore', 'Singapore Grand Prix'),
+    ('americas', 'Circuit of the Americas', 'Austin', 'USA', 'United States Grand Prix'),
+    ('rodriguez', 'Autódromo Hermanos Rodríguez', 'Mexico City', 'Mexico', 'Mexico City Grand Prix'),
+    ('interlagos', 'Autódromo José Carlos Pace', 'São Paulo', 'Brazil', 'São Paulo Grand Prix'),
+    ('vegas', 'Las Vegas Strip Street Circuit', 'Las Vegas', 'USA', 'Las Vegas Grand Prix'),
+    ('losail', 'Losail International Circuit', 'Lusail', 'Qatar', 'Qatar Grand Prix'),
+    ('yas_marina', 'Yas Marina Circuit', 'Abu Dhabi', 'UAE', 'Abu Dhabi Grand Prix'),
+]
+
+_EQUIPOS = [
+    ('red_bull', 'Red Bull', 'Austrian'), ('mercedes', 'Mercedes', 'German'), ('ferrari', 'Ferrari', 'Italian'),
+    ('mclaren', 'McLaren', 'British'), ('aston_martin', 'Aston Martin', 'British'), ('alpine', 'Alpine F1 Team', 'French'),
+    ('williams', 'Williams', 'British'), ('rb', 'RB F1 Team', 'Italian'), ('sauber', 'Sauber', 'Swiss'),
+    ('haas', 'Haas F1 Team', 'American'),
+]
+
+_PILOTOS = [
+    ('max_verstappen', 'Max', 'Verstappen', 'Dutch'), ('perez', 'Sergio', 'Pérez', 'Mexican'),
+    ('hamilton', 'Lewis', 'Hamilton', 'British'), ('russell', 'George', 'Russell', 'British'),
+    ('leclerc', 'Charles', 'Leclerc', 'Monegasque'), ('sainz', 'Carlos', 'Sainz', 'Spanish'),
+    ('norris', 'Lando', 'Norris', 'British'), ('piastri', 'Oscar', 'Piastri', 'Australian'),
+    ('alonso', 'Fernando', 'Alonso', 'Spanish'), ('stroll', 'Lance', 'Stroll', 'Canadian'),
+    ('gasly', 'Pierre', 'Gasly', 'French'), ('ocon', 'Esteban', 'Ocon', 'French'),
+    ('albon', 'Alexander', 'Albon', 'Thai'), ('sargeant', 'Logan', 'Sargeant', 'American'),
+    ('tsunoda', 'Yuki', 'Tsunoda', 'Japanese'), ('ricciardo', 'Daniel', 'Ricciardo', 'Australian'),
+    ('bottas', 'Valtteri', 'Bottas', 'Finnish'), ('zhou', 'Guanyu', 'Zhou', 'Chinese'),
+    ('hulkenberg', 'Nico', 'Hülkenberg', 'German'), ('kevin_magnussen', 'Kevin', 'Magnussen', 'Danish'),
+]
+
+
+def _circuito(indice: int) -> Dict[str, Any]:
+    circuito_id, nombre, localidad, pais, _ = _CIRCUITOS[indice]
+    return {'circuitId': circuito_id, 'circuitName': nombre,
+            'Location': {'locality': localidad, 'country': pais}}
+
+
+def _piloto(indice: int) -> Dict[str, Any]:
+    piloto_id, nombre, apellido, nacionalidad = _PILOTOS[indice]
+    nacimiento = date(1985, 1, 1) + timedelta(days=211 * indice)
+    return {'driverId': piloto_id, 'permanentNumber': str(indice + 2), 'code': apellido[:3].upper(),
+            'givenName': nombre, 'familyName': apellido, 'dateOfBirth': nacimiento.isoformat(),
+            'nationality': nacionalidad}
+
+
+def _equipo(indice: int) -> Dict[str, Any]:
+    equipo_id, nombre, nacionalidad = _EQUIPOS[indice]
+    return {'constructorId': equipo_id, 'name': nombre, 'nationality': nacionalidad}
+
+
+def _calendario(año: int) -> List[Dict[str, Any]]:
+    """
+    Carreras sintéticas de una temporada. Las de la temporada en curso y las
+    siguientes se reparten a partir de hoy, para que siempre haya una próxima carrera.
+    """
+    hoy = datetime.utcnow().date()
+    marzo = date(año, 3, 1)
+    primera = marzo + timedelta(days=6 - marzo.weekday())   # Primer domingo de marzo
+    if año == hoy.year:
+        primera = hoy - timedelta(weeks=6)
+    elif año > hoy.year:
+        primera = max(primera, hoy + timedelta(days=7))
+    carreras = []
+    for ronda in range(1, len(_CIRCUITOS) + 1):
+        dia = primera + timedelta(weeks=ronda - 1)
+        carrera = {'season': str(año), 'round': str(ronda), 'raceName': _CIRCUITOS[ronda - 1][4],
+                   'Circuit': _circuito(ronda - 1), 'date': dia.isoformat(), 'time': '13:00:00Z',
+                   'Qualifying': {'date': (dia - timedelta(days=1)).isoformat(), 'time': '14:00:00Z'}}
+        carreras.append(carrera)
+    return carreras
+
+
+def _resultados(año: int, ronda: int) -> List[Dict[str, Any]]:
+    azar = random.Random(año * 100 + ronda)
+    orden = list(range(len(_PILOTOS)))
+    azar.shuffle(orden)
+    puntos = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+    filas = []
+    for posicion, indice in enumerate(orden, start=1):
+        fila = {'number': str(indice + 2), 'position': str(posicion), 'positionText': str(posicion),
+                'points': str(puntos[posicion - 1] if posicion <= len(puntos) else 0),
+                'Driver': _piloto(indice), 'Constructor': _equipo(indice // 2),
+                'grid': str(azar.randint(1, 20)), 'laps': '57', 'status': 'Finished' if posicion <= 15 else '+1 Lap'}
+        if posicion <= 15:
+            fila['Time'] = {'millis': str(5400000 + posicion * 1500), 'time': f'+{posicion * 1.5:.3f}' if posicion > 1 else '1:30:00.000'}
+        filas.append(fila)
+    return filas
+
+
+def _clasificacion(año: int, rondas: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Suma los puntos de las primeras carreras sintéticas de la temporada.
+    """
+    puntos_pilotos, victorias, puntos_equipos = [0] * len(_PILOTOS), [0] * len(_PILOTOS), [0] * len(_EQUIPOS)
+    victorias_equipos = [0] * len(_EQUIPOS)
+    for ronda in range(1, rondas + 1):
+        for fila in _resultados(año, ronda):
+            indice = int(fila['number']) - 2
+            puntos_pilotos[indice] += int(fila['points'])
+            puntos_equipos[indice // 2] += int(fila['points'])
+            victorias[indice] += fila['position'] == '1'
+            victorias_equipos[indice // 2] += fila['position'] == '1'
+    pilotos = sorted(range(len(_PILOTOS)), key=lambda i: -puntos_pilotos[i])
+    equipos = sorted(range(len(_EQUIPOS)), key=lambda i: -puntos_equipos[i])
+    return (
+        [{'position': str(p), 'positionText': str(p), 'points': str(puntos_pilotos[i]), 'wins': str(victorias[i]),
+          'Driver': _piloto(i), 'Constructors': [_equipo(i // 2)]} for p, i in enumerate(pilotos, start=1)],
+        [{'position': str(p), 'positionText': str(p), 'points': str(puntos_equipos[i]), 'wins': str(victorias_equipos[i]),
+          'Constructor': _equipo(i)} for p, i in enumerate(equipos, start=1)],
+    )
+
+
+def respuesta_sintetica(ruta: str) -> Optional[Dict[str, Any]]:
+    """
+    Genera una respuesta con el formato de la API para las rutas que usa el bot.
+
+    Returns:
+        dict: Respuesta completa (sin paginar), None si la ruta no está soportada
+    """
+    partes = ruta.strip('/').split('/')
+    año = datetime.utcnow().year if partes[0] == 'current' else int(partes[0]) if partes[0].isdigit() else None
+    endpoint = partes[-1]
+    if endpoint == 'circuits':
+        registros = [_circuito(i) for i in range(len(_CIRCUITOS))]
+    elif endpoint == 'races' and año is not None:
+        registros = _calendario(año)
+    elif endpoint == 'results' and año is not None:
+        carreras = _calendario(año)
+        if len(partes) == 3 and partes[1].isdigit():
+            carreras = [c for c in carreras if c['round'] == partes[1]]
+        if 'circuits' in partes:
+            carreras = [c for c in carreras if c['Circuit']['circuitId'] == partes[partes.index('circuits') + 1]]
+        registros = [dict(c, Results=_resultados(año, int(c['round']))) for c in carreras]
+    elif endpoint == 'sprint' and año is not None:
+        # El calendario sintético no tiene carreras sprint
+        registros = []
+    elif partes == ['drivers']:
+        registros = [_piloto(i) for i in range(len(_PILOTOS))]
+    elif partes[0] == 'drivers' and len(partes) == 2:
+        registros = [_piloto(i) for i, p in enumerate(_PILOTOS) if p[0] == partes[1]]
+    elif partes[0] == 'drivers' and partes[-1] == 'seasons':
+        # Todos los pilotos sintéticos corren todas las temporadas desde 2018
+        registros = [{'season': str(a), 'url': ''} for a in range(2018, datetime.utcnow().year + 1)]
+    elif endpoint in ('driverStandings', 'constructorStandings') and año is not None:
+        rondas = int(partes[1]) if len(partes) == 3 and partes[1].isdigit() else len(_CIRCUITOS)
+        pilotos, equipos = _clasificacion(año, min(rondas, len(_CIRCUITOS)))
+        lista = {'season': str(año), 'round': str(rondas)}
+        lista['DriverStandings' if endpoint == 'driverStandings' else 'ConstructorStandings'] = \
+            pilotos if endpoint == 'driverStandings' else equipos
+        registros = [lista]
+    else:
+        return None
+    tabla, lista_registros = tabla_de_ruta(ruta) or ('DriverTable', 'Drivers')
+    return {'MRData': {'xmlns': '', 'series': 'f1', 'url': ruta, 'limit': str(len(registros)), 'offset': '0',
+                       'total': str(len(registros)), tabla: {lista_registros: registros}}}
+
+
+###############################################################################
+# Servidor
+###############################################################################
+
+def paginar_respuesta(respuesta: Dict[str, Any], ruta: str, limit: int, offset: int) -> Dict[str, Any]:
+    """
+    Aplica `limit` y `offset` a una respuesta completa, como haría la API.
+    """
+    tabla = tabla_de_ruta(ruta)
+    mrdata = dict(respuesta.get('MRData', {}))
+    if tabla is None or tabla[0] not in mrdata:
+        return respuesta
+    contenido = dict(mrdata[tabla[0]])
+    registros = contenido.get(tabla[1], [])
+    contenido[tabla[1]] = registros[offset:offset + limit]
+    mrdata[tabla[0]] = contenido
+    mrdata.update(limit=str(limit), offset=str(offset), total=str(len(registros)))
+    return {'MRData': mrdata}
+
+
+class ServidorFixtures:
+    """
+    Servidor HTTP local que imita la API Ergast con respuestas grabadas o sintéticas.
+
+    Args:
+        directorio (str): Directorio con los ficheros JSON grabados
+        latencia (float): Segundos de espera añadidos a cada respuesta, para simular la red
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_FIXTURES, latencia: float = 0.0):
+        self.directorio = directorio
+        self.latencia = latencia
+        self.peticiones = 0
+        self.url_base: Optional[str] = None
+        self._respuestas: Dict[str, Optional[bytes]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def _respuesta_completa(self, ruta: str) -> Optional[Dict[str, Any]]:
+        fichero = fichero_de_ruta(self.directorio, ruta)
+        if os.path.exists(fichero):
+            with open(fichero, encoding='utf-8') as f:
+                return json.load(f)
+        return respuesta_sintetica(ruta)
+
+    async def _atender(self, peticion: web.Request) -> web.Response:
+        self.peticiones += 1
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        ruta = peticion.match_info['ruta'].strip('/').removesuffix('.json')
+        limit = int(peticion.query.get('limit', 30))
+        offset = int(peticion.query.get('offset', 0))
+        clave = f'{ruta}?{limit}&{offset}'
+        if clave not in self._respuestas:
+            completa = self._respuesta_completa(ruta)
+            self._respuestas[clave] = None if completa is None else \
+                json.dumps(paginar_respuesta(completa, ruta, limit, offset)).encode()
+        cuerpo = self._respuestas[clave]
+        if cuerpo is None:
+            return web.Response(status=404, text='Not found')
+        # ETag a partir del contenido, para las peticiones condicionales del modo en directo
+        etag = f'"{hashlib.md5(cuerpo).hexdigest()}"'
+        if peticion.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=cuerpo, content_type='application/json', headers={'ETag': etag})
+
+    async def iniciar(self, host: str = '127.0.0.1', puerto: int = 0) -> str:
+        """
+        Arranca el servidor (en un puerto libre por defecto) y devuelve su URL base.
+        """
+        app = web.Application()
+        app.router.add_get('/ergast/f1/{ruta:.*}', self._atender)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, puerto).start()
+        host, puerto = self._runner.addresses[0][:2]
+        self.url_base = f'http://{host}:{puerto}/ergast/f1'
+        return self.url_base
+
+    async def detener(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def grabar(cliente: Any, rutas: Iterable[str], directorio: str = DIRECTORIO_FIXTURES) -> List[str]:
+    """
+    Descarga de la API real la respuesta completa de cada ruta y la guarda como fixture.
+
+    Args:
+        cliente (ClienteErgast): Cliente apuntando a la API real
+        rutas (list): Rutas relativas a grabar
+        directorio (str): Directorio donde guardar los ficheros
+
+    Returns:
+        list: Ficheros escritos
+    """
+    os.makedirs(directorio, exist_ok=True)
+    escritos = []
+    for ruta in rutas:
+        tabla = tabla_de_ruta(ruta)
+        primera = await cliente.obtener_json(f'{ruta}?limit=100&offset=0')
+        if tabla is not None:
+            registros = [r async for r in cliente.paginar(
+                ruta, lambda mrdata: mrdata.get(tabla[0], {}).get(tabla[1], []))]
+            mrdata = dict(primera['MRData'])
+            mrdata[tabla[0]] = dict(mrdata.get(tabla[0], {}), **{tabla[1]: registros})
+            mrdata.update(limit=str(len(registros)), offset='0', total=str(len(registros)))
+            primera = {'MRData': mrdata}
+        fichero = fichero_de_ruta(directorio, ruta)
+        with open(fichero, 'w', encoding='utf-8') as f:
+            json.dump(primera, f, ensure_ascii=False)
+        escritos.append(fichero)
+    return escritos
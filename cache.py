@@ -0,0 +1,391 @@
+###############################################################################
+# Caché de respuestas de la API Ergast
+#
+# Caché en dos niveles que se sitúa debajo del cliente HTTP:
+# - Memoria: LRU limitado por número de entradas y por tamaño total
+# - Disco (opcional): SQLite, para que los datos sobrevivan a un reinicio
+#
+# El tiempo de vida de cada entrada depende de lo "definitivos" que sean los
+# datos: las temporadas ya terminadas no cambian nunca, la temporada actual
+# caduca pronto y además se invalida cuando termina cada fin de semana de
+# carrera. Las entradas caducadas no se borran al momento: si la API no
+# responde, se pueden seguir sirviendo como último dato conocido.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para llevar la escritura en disco a un hilo aparte
+import json                  # Para serializar las respuestas en disco
+import logging               # Para registro de eventos y errores
+import sqlite3               # Almacén persistente en disco
+import threading             # Para serializar el acceso a la conexión SQLite
+import time                  # Marcas de tiempo de las entradas
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from modelos import Carrera
+
+# Valores por defecto de la política de caducidad (en segundos)
+TTL_TEMPORADA_ACTUAL = 15 * 60          # Datos de la temporada en curso
+TTL_SIN_TEMPORADA = 24 * 60 * 60        # Rutas sin año (p. ej. drivers/alonso)
+
+# Duración estimada de una carrera desde la hora de salida hasta tener resultados
+DURACION_CARRERA = timedelta(hours=3)
+
+# Segundos que se espera a que otro proceso libere la base de datos en disco
+ESPERA_BLOQUEO_DISCO = 10.0
+
+# Límites por defecto del nivel en memoria
+MAX_ENTRADAS = 2000
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def temporada_actual() -> int:
+    """
+    Devuelve el año de la temporada en curso (año UTC actual).
+    """
+    return datetime.utcnow().year
+
+
+def temporada_de_ruta(ruta: str) -> Optional[int]:
+    """
+    Extrae la temporada a la que pertenece una ruta de la API.
+
+    Args:
+        ruta (str): Ruta relativa (p. ej. "2008/driverStandings" o "current/races")
+
+    Returns:
+        int: Año de la temporada, None si la ruta no depende de una temporada
+    """
+    primer_segmento = ruta.lstrip('/').split('/', 1)[0].split('?', 1)[0]
+    if primer_segmento == 'current':
+        return temporada_actual()
+    if primer_segmento.isdigit():
+        return int(primer_segmento)
+    return None
+
+
+class _Entrada:
+    """
+    Entrada almacenada en la caché.
+    """
+    __slots__ = ('datos', 'tamaño', 'guardado', 'expira')
+
+    def __init__(self, datos: Any, tamaño: int, guardado: float, expira: Optional[float]):
+        self.datos = datos
+        self.tamaño = tamaño
+        self.guardado = guardado
+        self.expira = expira
+
+
+class AlmacenDisco:
+    """
+    Almacén persistente de respuestas en una base de datos SQLite.
+    """
+
+    def __init__(self, ruta_fichero: str):
+        self.ruta_fichero = ruta_fichero
+        self._bloqueo = threading.Lock()
+        # Varios procesos (p. ej. los de un despliegue con shards) pueden compartir el fichero
+        self._conexion = sqlite3.connect(ruta_fichero, check_same_thread=False, timeout=ESPERA_BLOQUEO_DISCO)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute('PRAGMA synchronous=NORMAL')
+        self._conexion.execute(
+            'CREATE TABLE IF NOT EXISTS respuestas ('
+            ' clave TEXT PRIMARY KEY, texto TEXT NOT NULL,'
+            ' guardado REAL NOT NULL, expira REAL)'
+        )
+        self._conexion.commit()
+
+    def leer(self, clave: str) -> Optional[Tuple[str, float, Optional[float]]]:
+        """
+        Devuelve (texto, guardado, expira) de una clave, o None si no existe.
+        """
+        with self._bloqueo:
+            fila = self._conexion.execute(
+                'SELECT texto, guardado, expira FROM respuestas WHERE clave = ?', (clave,)
+            ).fetchone()
+        return fila
+
+    def escribir(self, clave: str, texto: str, guardado: float, expira: Optional[float]) -> None:
+        """
+        Guarda (o reemplaza) la respuesta de una clave.
+        """
+        with self._bloqueo:
+            self._conexion.execute(
+                'INSERT OR REPLACE INTO respuestas (clave, texto, guardado, expira) VALUES (?, ?, ?, ?)',
+                (clave, texto, guardado, expira),
+            )
+            self._conexion.commit()
+
+    def caducar_prefijos(self, prefijos: Iterable[str]) -> None:
+        """
+        Marca como caducadas todas las claves que empiezan por alguno de los prefijos dados.
+        """
+        with self._bloqueo:
+            self._conexion.executemany(
+                'UPDATE respuestas SET expira = 0 WHERE substr(clave, 1, length(?)) = ?',
+                [(p, p) for p in prefijos],
+            )
+            self._conexion.commit()
+
+    def cerrar(self) -> None:
+        with self._bloqueo:
+            self._conexion.close()
+
+
+class CacheErgast:
+    """
+    Caché de respuestas JSON de la API Ergast con LRU en memoria y disco opcional.
+
+    Args:
+        max_entradas (int): Número máximo de respuestas en memoria
+        max_bytes (int): Tamaño máximo aproximado (bytes de JSON) en memoria
+        ruta_disco (str, opcional): Fichero SQLite para persistir las respuestas
+        ttl_actual (float): Segundos de vida de los datos de la temporada en curso
+        ttl_sin_temporada (float): Segundos de vida de rutas que no dependen de una temporada
+    """
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, max_bytes: int = MAX_BYTES,
+                 ruta_disco: Optional[str] = None, ttl_actual: float = TTL_TEMPORADA_ACTUAL,
+                 ttl_sin_temporada: float = TTL_SIN_TEMPORADA):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl_actual = ttl_actual
+        self.ttl_sin_temporada = ttl_sin_temporada
+        self._memoria: "OrderedDict[str, _Entrada]" = OrderedDict()
+        self._bytes = 0
+        self._disco = AlmacenDisco(ruta_disco) if ruta_disco else None
+        # Instantes (epoch) en que termina cada carrera de la temporada en curso
+        self._fines_carrera: list = []
+        # Contadores de aciertos y fallos; las respuestas caducadas servidas cuando la
+        # API no responde se cuentan aparte (su consulta ya contó como fallo)
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.caducadas = 0
+
+    ###########################################################################
+    # Política de caducidad
+    ###########################################################################
+
+    def ttl_para(self, ruta: str) -> Optional[float]:
+        """
+        Calcula el tiempo de vida de una ruta según lo definitivos que son sus datos.
+
+        Args:
+            ruta (str): Ruta relativa de la API
+
+        Returns:
+            float: Segundos de vida, None si la entrada es permanente
+        """
+        temporada = temporada_de_ruta(ruta)
+        if temporada is None:
+            return self.ttl_sin_temporada
+        if temporada < temporada_actual():
+            return None  # Temporada terminada: los datos ya no cambian
+        return self.ttl_actual
+
+    def registrar_calendario(self, carreras: Iterable[Carrera]) -> None:
+        """
+        Registra el calendario de la temporada en curso para invalidar sus datos
+        cuando termine cada fin de semana de carrera.
+
+        Args:
+            carreras (list): Carreras (modelos.Carrera) de la temporada
+        """
+        self._fines_carrera = sorted(
+            (carrera.inicio + DURACION_CARRERA - datetime(1970, 1, 1)).total_seconds()
+            for carrera in carreras if carrera.inicio is not None
+        )
+
+    def _ultimo_fin_carrera(self, ahora: float) -> Optional[float]:
+        """
+        Devuelve el instante en que terminó la última carrera ya disputada.
+        """
+        ultimo = None
+        for fin in self._fines_carrera:
+            if fin > ahora:
+                break
+            ultimo = fin
+        return ultimo
+
+    def _vigente(self, ruta: str, guardado: float, expira: Optional[float], ahora: float) -> bool:
+        """
+        Comprueba si una entrada sigue siendo válida.
+        """
+        if expira is not None and ahora >= expira:
+            return False
+        if temporada_de_ruta(ruta) == temporada_actual():
+            # Cualquier dato de la temporada guardado antes del final de la última
+            # carrera está desfasado aunque no haya agotado su TTL
+            ultimo_fin = self._ultimo_fin_carrera(ahora)
+            if ultimo_fin is not None and guardado < ultimo_fin:
+                return False
+        return True
+
+    ###########################################################################
+    # Lectura y escritura
+    ###########################################################################
+
+    def obtener_memoria(self, ruta: str, caducada: bool = False) -> Optional[Any]:
+        """
+        Busca una respuesta sólo en memoria, sin acceder a disco.
+
+        Args:
+            ruta (str): Ruta relativa de la API (clave de la caché)
+            caducada (bool): Si se acepta una respuesta caducada (cuando la API no responde)
+
+        Returns:
+            Respuesta JSON decodificada, None si no está o ha caducado
+        """
+        entrada = self._memoria.get(ruta)
+        if entrada is None:
+            return None
+        # La entrada caducada se queda en memoria (hasta que la sustituya otra o la expulse el LRU)
+        if not caducada and not self._vigente(ruta, entrada.guardado, entrada.expira, time.time()):
+            return None
+        self._memoria.move_to_end(ruta)
+        if caducada:
+            self.caducadas += 1
+        else:
+            self.aciertos += 1
+        return entrada.datos
+
+    async def obtener(self, ruta: str, memoria: bool = True, caducada: bool = False) -> Optional[Any]:
+        """
+        Busca una respuesta en memoria y, si no está, en disco.
+
+        Args:
+            ruta (str): Ruta relativa de la API (clave de la caché)
+            memoria (bool): Si una respuesta leída de disco se sube a la memoria
+            caducada (bool): Si se acepta una respuesta caducada (cuando la API no responde)
+
+        Returns:
+            Respuesta JSON decodificada, None si no está o ha caducado
+        """
+        datos = self.obtener_memoria(ruta, caducada)
+        if datos is not None:
+            return datos
+
+        if self._disco is not None:
+            fila = await asyncio.to_thread(self._disco.leer, ruta)
+            if fila is not None:
+                texto, guardado, expira = fila
+                if caducada or self._vigente(ruta, guardado, expira, time.time()):
+                    datos = json.loads(texto)
+                    if memoria:
+                        self._guardar_memoria(ruta, datos, len(texto), guardado, expira)
+                    if caducada:
+                        self.caducadas += 1
+                    else:
+                        self.aciertos_disco += 1
+                    return datos
+
+        if not caducada:
+            self.fallos += 1
+        return None
+
+    async def guardar(self, ruta: str, datos: Any, texto: Optional[str] = None, memoria: bool = True) -> None:
+        """
+        Guarda una respuesta en memoria y, si hay almacén en disco, también en disco.
+
+        Args:
+            ruta (str): Ruta relativa de la API (clave de la caché)
+            datos: Respuesta JSON decodificada
+            texto (str, opcional): JSON original, para no volver a serializarlo
+            memoria (bool): Si es False, la respuesta sólo se guarda en disco
+        """
+        if texto is None:
+            texto = json.dumps(datos)
+        ahora = time.time()
+        ttl = self.ttl_para(ruta)
+        expira = ahora + ttl if ttl is not None else None
+        if memoria:
+            self._guardar_memoria(ruta, datos, len(texto), ahora, expira)
+        if self._disco is not None:
+            try:
+                await asyncio.to_thread(self._disco.escribir, ruta, texto, ahora, expira)
+            except sqlite3.Error as e:
+                logging.error(f"Error al guardar '{ruta}' en la caché de disco: {e}")
+
+    def guardar_memoria(self, clave: str, datos: Any, tamaño: int, caducada: bool = False) -> None:
+        """
+        Guarda un valor ya procesado (p. ej. registros convertidos) sólo en memoria.
+
+        Args:
+            clave (str): Clave que empieza por la ruta de la API de la que procede el valor,
+                para aplicarle la misma caducidad
+            datos: Valor a guardar
+            tamaño (int): Tamaño aproximado en bytes
+            caducada (bool): Si se ha construido con respuestas caducadas (se guarda ya caducado,
+                sólo para servirlo mientras la API no responda)
+        """
+        ahora = time.time()
+        ttl = 0 if caducada else self.ttl_para(clave)
+        self._guardar_memoria(clave, datos, tamaño, ahora, ahora + ttl if ttl is not None else None)
+
+    def _guardar_memoria(self, ruta: str, datos: Any, tamaño: int, guardado: float,
+                         expira: Optional[float]) -> None:
+        """
+        Inserta una entrada en memoria y expulsa las menos usadas si se superan los límites.
+        """
+        if ruta in self._memoria:
+            self._eliminar(ruta)
+        if tamaño > self.max_bytes:
+            return  # Demasiado grande para memoria; sólo queda en disco
+        self._memoria[ruta] = _Entrada(datos, tamaño, guardado, expira)
+        self._bytes += tamaño
+        while len(self._memoria) > self.max_entradas or self._bytes > self.max_bytes:
+            _, expulsada = self._memoria.popitem(last=False)
+            self._bytes -= expulsada.tamaño
+
+    def _eliminar(self, ruta: str) -> None:
+        entrada = self._memoria.pop(ruta, None)
+        if entrada is not None:
+            self._bytes -= entrada.tamaño
+
+    def invalidar_temporada(self, temporada: int) -> None:
+        """
+        Marca como caducadas en memoria y disco todas las respuestas de una temporada
+        (se vuelven a pedir a la API, pero siguen disponibles si no responde).
+
+        Args:
+            temporada (int): Año de la temporada a invalidar
+        """
+        for ruta, entrada in self._memoria.items():
+            if temporada_de_ruta(ruta) == temporada:
+                entrada.expira = 0.0
+        if self._disco is not None:
+            prefijos = [f'{temporada}/']
+            if temporada == temporada_actual():
+                prefijos.append('current/')
+            self._disco.caducar_prefijos(prefijos)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            dict: Aciertos (memoria y disco), fallos, caducadas servidas, ratio de aciertos, entradas y bytes
+        """
+        total = self.aciertos + self.aciertos_disco + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'aciertos_disco': self.aciertos_disco,
+            'fallos': self.fallos,
+            'caducadas': self.caducadas,
+            'ratio_aciertos': (self.aciertos + self.aciertos_disco) / total if total else 0.0,
+            'entradas': len(self._memoria),
+            'bytes': self._bytes,
+        }
+
+    def cerrar(self) -> None:
+        """
+        Cierra el almacén en disco, si lo hay.
+        """
+        if self._disco is not None:
+            self._disco.cerrar()
+            self._disco = None
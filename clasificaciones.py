@@ -0,0 +1,349 @@
+###############################################################################
+# Clasificaciones del mundial calculadas a partir de los resultados
+#
+# Suma ronda a ronda los puntos y las victorias de pilotos y constructores
+# con las tablas de resultados de `analitica` (carreras y sprints) y guarda
+# la clasificación tras cada ronda: la de cualquier ronda se sirve desde
+# memoria, y cuando llega el resultado de una carrera nueva sólo se suma esa
+# ronda. Cada vez que cambia la última ronda se comprueba contra
+# driverStandings y constructorStandings de la API; si no coincide (p. ej.
+# temporadas con resultados descartados o sanciones de puntos), la temporada
+# deja de servirse desde aquí y los comandos recurren a la API.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para las comprobaciones en segundo plano
+import logging               # Para registro de eventos y errores
+from array import array      # Totales de tipo fijo
+from operator import neg
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from analitica import Analitica, Catalogo, TablaResultados
+from cache import temporada_actual
+from ergast import ClienteErgast, ErrorErgast, fijar_presupuesto
+from metricas import REGISTRO
+from modelos import ClasificacionConstructor, ClasificacionPiloto, Constructor, Piloto
+
+# Posiciones finales que se cuentan para desempatar a igualdad de puntos
+MAX_POSICIONES = 40
+
+# Discrepancias que se detallan en el log al comprobar una temporada
+MAX_DISCREPANCIAS_LOG = 5
+
+rondas_sumadas = REGISTRO.contador(
+    'f1bot_clasificacion_rondas_sumadas_total', 'Rondas sumadas a las clasificaciones calculadas')
+verificaciones = REGISTRO.contador(
+    'f1bot_clasificacion_verificaciones_total', 'Comprobaciones de las clasificaciones calculadas contra la API',
+    etiquetas=('tipo', 'resultado'))
+
+
+class Totales:
+    """
+    Puntos, victorias y recuento de posiciones acumulados de los pilotos (o
+    constructores) de una temporada, numerados en el orden en que aparecen.
+    """
+
+    def __init__(self):
+        self.indices: List[int] = []          # Número en el catálogo de cada participante
+        self._locales: Dict[int, int] = {}
+        self.puntos = array('d')
+        self.victorias = array('H')
+        self.posiciones: List[array] = []     # Veces que terminó en cada posición (para desempatar)
+        self.equipos: List[Dict[int, None]] = []   # Constructores de cada piloto, en orden
+
+    def local(self, indice: int) -> int:
+        """
+        Devuelve el número dentro de la temporada de un participante, añadiéndolo si es nuevo.
+        """
+        local = self._locales.get(indice)
+        if local is None:
+            local = self._locales[indice] = len(self.indices)
+            self.indices.append(indice)
+            self.puntos.append(0.0)
+            self.victorias.append(0)
+            self.posiciones.append(array('H', bytes(2 * MAX_POSICIONES)))
+            self.equipos.append({})
+        return local
+
+    def sumar(self, local: int, puntos: float, posicion: int = 0) -> None:
+        self.puntos[local] += puntos
+        if posicion == 1:
+            self.victorias[local] += 1
+        if 1 <= posicion <= MAX_POSICIONES:
+            self.posiciones[local][posicion - 1] += 1
+
+    def foto(self) -> "Foto":
+        """
+        Copia los totales actuales (y los equipos de cada piloto hasta ahora), ordenados
+        por puntos y, a igualdad, por mejores resultados.
+        """
+        orden = sorted(range(len(self.indices)),
+                       key=lambda i: (-self.puntos[i], tuple(map(neg, self.posiciones[i]))))
+        return Foto(array('d', self.puntos), array('H', self.victorias), array('H', orden),
+                    tuple(tuple(equipos) for equipos in self.equipos))
+
+
+class Foto(NamedTuple):
+    puntos: array
+    victorias: array
+    orden: array                 # Números locales, del primero al último
+    equipos: Tuple[Tuple[int, ...], ...]  # Constructores de cada piloto hasta esta ronda
+
+
+class EstadoRonda(NamedTuple):
+    ronda: int
+    clave: int                   # año * 100 + ronda
+    huella: bytes                # Resultados de la ronda, para detectar correcciones
+    pilotos: Foto
+    constructores: Foto
+
+
+def _puntos_api(texto: str) -> float:
+    try:
+        return float(texto)
+    except ValueError:
+        return 0.0
+
+
+class ClasificacionTemporada:
+    """
+    Clasificaciones de pilotos y constructores tras cada ronda de una temporada.
+
+    Args:
+        año (int): Año de la temporada
+    """
+
+    def __init__(self, año: int):
+        self.año = año
+        self._reiniciar()
+        self._origen: Tuple[Optional[TablaResultados], Optional[TablaResultados]] = (None, None)
+        # Última ronda comprobada contra la API y si coincidían pilotos y constructores
+        self.verificada: Optional[int] = None
+        self.pilotos_coherentes: Optional[bool] = None
+        self.constructores_coherentes: Optional[bool] = None
+
+    def _reiniciar(self) -> None:
+        self.pilotos = Totales()
+        self.constructores = Totales()
+        self.rondas: List[EstadoRonda] = []
+
+    @property
+    def ultima_ronda(self) -> Optional[int]:
+        return self.rondas[-1].ronda if self.rondas else None
+
+    @staticmethod
+    def _huella(carreras: TablaResultados, sprints: TablaResultados, clave: int) -> bytes:
+        inicio, fin = carreras.tramo_carrera(clave)
+        inicio_sprint, fin_sprint = sprints.tramo_carrera(clave)
+        return b''.join(columna[desde:hasta].tobytes()
+                        for tabla, desde, hasta in ((carreras, inicio, fin), (sprints, inicio_sprint, fin_sprint))
+                        for columna in (tabla.piloto, tabla.constructor, tabla.posicion, tabla.puntos))
+
+    def actualizar(self, carreras: TablaResultados, sprints: TablaResultados) -> int:
+        """
+        Suma las rondas nuevas de la temporada. Si alguna ronda ya sumada ha cambiado
+        (p. ej. una sanción posterior), vuelve a calcular la temporada entera.
+
+        Args:
+            carreras (TablaResultados): Resultados de carrera de la temporada
+            sprints (TablaResultados): Resultados de las sprint de la temporada
+
+        Returns:
+            int: Rondas sumadas
+        """
+        if self._origen[0] is carreras and self._origen[1] is sprints:
+            return 0
+        inicio, fin = carreras.tramo_temporada(self.año)
+        claves = list(dict.fromkeys(carreras.carrera[inicio:fin]))
+        huellas = [self._huella(carreras, sprints, clave) for clave in claves]
+
+        iguales = 0
+        for estado, clave, huella in zip(self.rondas, claves, huellas):
+            if estado.clave != clave or estado.huella != huella:
+                break
+            iguales += 1
+        if iguales < len(self.rondas):
+            logging.info(f"Han cambiado resultados ya sumados de {self.año}: se recalcula la clasificación")
+            self._reiniciar()
+            iguales = 0
+
+        for clave, huella in zip(claves[iguales:], huellas[iguales:]):
+            self._sumar_ronda(carreras, sprints, clave, huella)
+        self._origen = (carreras, sprints)
+        sumadas = len(claves) - iguales
+        rondas_sumadas.inc(sumadas)
+        return sumadas
+
+    def _sumar_ronda(self, carreras: TablaResultados, sprints: TablaResultados, clave: int, huella: bytes) -> None:
+        pilotos, constructores = self.pilotos, self.constructores
+        inicio, fin = carreras.tramo_carrera(clave)
+        for fila in range(inicio, fin):
+            piloto = pilotos.local(carreras.piloto[fila])
+            constructor = constructores.local(carreras.constructor[fila])
+            puntos, posicion = carreras.puntos[fila], carreras.posicion[fila]
+            pilotos.sumar(piloto, puntos, posicion)
+            constructores.sumar(constructor, puntos, posicion)
+            pilotos.equipos[piloto][carreras.constructor[fila]] = None
+        # Los puntos de la sprint cuentan, pero no sus victorias ni sus posiciones
+        inicio, fin = sprints.tramo_carrera(clave)
+        for fila in range(inicio, fin):
+            pilotos.sumar(pilotos.local(sprints.piloto[fila]), sprints.puntos[fila])
+            constructores.sumar(constructores.local(sprints.constructor[fila]), sprints.puntos[fila])
+        self.rondas.append(EstadoRonda(clave % 100, clave, huella, pilotos.foto(), constructores.foto()))
+
+    def estado(self, ronda: Optional[int] = None) -> Optional[EstadoRonda]:
+        """
+        Devuelve el estado tras una ronda (por defecto, la última); None si no se ha disputado.
+        """
+        if ronda is None:
+            return self.rondas[-1] if self.rondas else None
+        for estado in self.rondas:
+            if estado.ronda == ronda:
+                return estado
+        return None
+
+    def pilotos_tras(self, estado: EstadoRonda, pilotos: Catalogo[Piloto],
+                     constructores: Catalogo[Constructor]) -> List[ClasificacionPiloto]:
+        foto = estado.pilotos
+        return [ClasificacionPiloto(str(posicion), pilotos[self.pilotos.indices[i]], f"{foto.puntos[i]:g}",
+                                    str(foto.victorias[i]),
+                                    tuple(constructores[c] for c in foto.equipos[i]))
+                for posicion, i in enumerate(foto.orden, start=1)]
+
+    def constructores_tras(self, estado: EstadoRonda,
+                           constructores: Catalogo[Constructor]) -> List[ClasificacionConstructor]:
+        foto = estado.constructores
+        return [ClasificacionConstructor(str(posicion), constructores[self.constructores.indices[i]],
+                                         f"{foto.puntos[i]:g}", str(foto.victorias[i]))
+                for posicion, i in enumerate(foto.orden, start=1)]
+
+
+def comparar(propia: Sequence, api: Sequence, identificar) -> List[str]:
+    """
+    Compara puntos y victorias de una clasificación calculada con la de la API.
+
+    Args:
+        propia (list): Clasificación calculada
+        api (list): Clasificación de la API
+        identificar (callable): Devuelve el ID de cada fila (piloto o constructor)
+
+    Returns:
+        list: Descripción de cada diferencia (vacía si coinciden)
+    """
+    calculada = {identificar(f): (_puntos_api(f.puntos), int(f.victorias)) for f in propia}
+    oficial = {identificar(f): (_puntos_api(f.puntos), int(f.victorias) if f.victorias.isdigit() else 0)
+               for f in api}
+    diferencias = []
+    for identificador in calculada.keys() | oficial.keys():
+        nuestra, suya = calculada.get(identificador, (0.0, 0)), oficial.get(identificador, (0.0, 0))
+        if abs(nuestra[0] - suya[0]) > 1e-6 or nuestra[1] != suya[1]:
+            diferencias.append(f"{identificador}: {nuestra[0]:g} pts/{nuestra[1]} victorias "
+                               f"frente a {suya[0]:g}/{suya[1]} de la API")
+    return sorted(diferencias)
+
+
+class MotorClasificaciones:
+    """
+    Clasificaciones de cada temporada calculadas a partir de los resultados.
+
+    Args:
+        analitica (Analitica): Tablas de resultados en columnas
+        cliente (ClienteErgast): Cliente de la API, para comprobar las clasificaciones
+    """
+
+    def __init__(self, analitica: Analitica, cliente: ClienteErgast):
+        self.analitica = analitica
+        self.cliente = cliente
+        self._temporadas: Dict[int, ClasificacionTemporada] = {}
+        self._verificaciones: Dict[int, asyncio.Task] = {}
+
+    async def temporada(self, año: int) -> ClasificacionTemporada:
+        """
+        Carga los resultados de una temporada y suma las rondas nuevas.
+
+        La primera vez que se calcula una temporada se comprueba contra la API antes
+        de devolverla; después, cada ronda nueva se comprueba en segundo plano.
+
+        Raises:
+            CargaEnCurso: Si los resultados aún se están descargando
+            ErrorErgast: Si falla la descarga de los resultados
+        """
+        carreras, sprints = await asyncio.gather(self.analitica.temporada(año),
+                                                 self.analitica.temporada(año, sprint=True))
+        clasificacion = self._temporadas.get(año)
+        if clasificacion is None:
+            clasificacion = self._temporadas[año] = ClasificacionTemporada(año)
+        clasificacion.actualizar(carreras, sprints)
+        if clasificacion.rondas and clasificacion.verificada != clasificacion.ultima_ronda:
+            tarea = self._verificaciones.get(año)
+            if tarea is None:
+                tarea = asyncio.create_task(self._verificar(clasificacion))
+                tarea.add_done_callback(lambda _: self._verificaciones.pop(año, None))
+                self._verificaciones[año] = tarea
+            if clasificacion.verificada is None:
+                await asyncio.shield(tarea)
+        return clasificacion
+
+    async def _verificar(self, clasificacion: ClasificacionTemporada) -> None:
+        """
+        Compara la última ronda calculada con las clasificaciones de la API.
+        """
+        # La comprobación es del motor, no del comando que la provocó
+        fijar_presupuesto(None)
+        año, estado = clasificacion.año, clasificacion.estado()
+        # Las temporadas terminadas se comparan con la clasificación final (la de la copia local, si la hay)
+        ronda = estado.ronda if año >= temporada_actual() else None
+        try:
+            api_pilotos = await self.cliente.clasificacion_pilotos(str(año), ronda)
+            api_constructores = await self.cliente.clasificacion_constructores(str(año), ronda)
+        except ErrorErgast as e:
+            verificaciones.inc(tipo='pilotos', resultado='error')
+            logging.warning(f"No se pudo comprobar la clasificación calculada de {año}: {e}")
+            return
+
+        pilotos, constructores = self.analitica.pilotos, self.analitica.constructores
+        for tipo, propia, api, identificar in (
+                ('pilotos', clasificacion.pilotos_tras(estado, pilotos, constructores), api_pilotos,
+                 lambda fila: fila.piloto.id),
+                ('constructores', clasificacion.constructores_tras(estado, constructores), api_constructores,
+                 lambda fila: fila.constructor.id)):
+            # Sin clasificación oficial (p. ej. constructores antes de 1958) no se sirve la calculada
+            diferencias = comparar(propia, api, identificar) if api else ['sin clasificación en la API']
+            coherente = not diferencias
+            setattr(clasificacion, f'{tipo}_coherentes', coherente)
+            verificaciones.inc(tipo=tipo, resultado='coincide' if coherente else 'discrepancia')
+            if not coherente:
+                logging.warning(f"La clasificación de {tipo} calculada para {año} (ronda {estado.ronda}) no coincide "
+                                f"con la API en {len(diferencias)} filas: "
+                                f"{'; '.join(diferencias[:MAX_DISCREPANCIAS_LOG])}")
+        clasificacion.verificada = estado.ronda
+
+    async def pilotos(self, año: int, ronda: Optional[int] = None) -> Optional[Tuple[int, List[ClasificacionPiloto]]]:
+        """
+        Clasificación de pilotos tras una ronda (por defecto, la última disputada).
+
+        Returns:
+            tuple: (ronda, clasificación), o None si no se puede calcular o no se ha podido
+                   comprobar que coincide con la API
+        """
+        clasificacion = await self.temporada(año)
+        estado = clasificacion.estado(ronda)
+        if estado is None or not clasificacion.pilotos_coherentes:
+            return None
+        return estado.ronda, clasificacion.pilotos_tras(estado, self.analitica.pilotos, self.analitica.constructores)
+
+    async def constructores(self, año: int,
+                            ronda: Optional[int] = None) -> Optional[Tuple[int, List[ClasificacionConstructor]]]:
+        """
+        Clasificación de constructores tras una ronda (por defecto, la última disputada).
+
+        Returns:
+            tuple: (ronda, clasificación), o None si no se puede calcular o no se ha podido
+                   comprobar que coincide con la API
+        """
+        clasificacion = await self.temporada(año)
+        estado = clasificacion.estado(ronda)
+        if estado is None or not clasificacion.constructores_coherentes:
+            return None
+        return estado.ronda, clasificacion.constructores_tras(estado, self.analitica.constructores)
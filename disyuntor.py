@@ -0,0 +1,131 @@
+###############################################################################
+# Disyuntor (circuit breaker) de la API Ergast
+#
+# Cuando la API está caída o no contesta, cada petición espera su timeout
+# completo y falla por separado. El disyuntor cuenta los fallos seguidos y,
+# al llegar al umbral, se abre: durante un tiempo las peticiones se rechazan
+# al momento, sin salir a la red. Pasado ese tiempo deja pasar una sola
+# petición de prueba (semiabierto): si funciona, se cierra; si falla, vuelve
+# a abrirse el doble de tiempo (hasta un máximo).
+###############################################################################
+
+from __future__ import annotations
+
+import logging               # Para registro de eventos y errores
+import time                  # Reloj monotónico para la apertura
+from typing import Optional
+
+from metricas import REGISTRO
+
+# Estados del disyuntor (el número es el valor de la métrica)
+CERRADO = 'cerrado'
+SEMIABIERTO = 'semiabierto'
+ABIERTO = 'abierto'
+VALORES_ESTADO = {CERRADO: 0, SEMIABIERTO: 1, ABIERTO: 2}
+
+# Fallos seguidos que abren el disyuntor
+UMBRAL_FALLOS = 5
+
+# Segundos que permanece abierto antes de la primera prueba, y máximo tras pruebas fallidas
+ESPERA_APERTURA = 30.0
+ESPERA_MAXIMA = 300.0
+
+transiciones_disyuntor = REGISTRO.contador(
+    'f1bot_ergast_disyuntor_transiciones_total', 'Cambios de estado del disyuntor de la API', ('estado',))
+rechazos_disyuntor = REGISTRO.contador(
+    'f1bot_ergast_disyuntor_rechazadas_total', 'Peticiones rechazadas sin salir a la red con el disyuntor abierto')
+
+
+class Disyuntor:
+    """
+    Disyuntor de tres estados (cerrado, abierto y semiabierto).
+
+    Args:
+        nombre (str): Nombre del servicio, para los logs
+        umbral (int): Fallos seguidos que lo abren
+        espera (float): Segundos abierto antes de dejar pasar una petición de prueba
+        espera_maxima (float): Segundos máximos abierto tras varias pruebas fallidas
+    """
+
+    def __init__(self, nombre: str = 'API', umbral: int = UMBRAL_FALLOS, espera: float = ESPERA_APERTURA,
+                 espera_maxima: float = ESPERA_MAXIMA):
+        self.nombre = nombre
+        self.umbral = umbral
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.estado = CERRADO
+        self.fallos_seguidos = 0
+        self.aperturas = 0
+        self._espera_actual = espera
+        self._abierto_hasta = 0.0
+        self._prueba_en_curso = False
+
+    @property
+    def valor_estado(self) -> int:
+        return VALORES_ESTADO[self.estado]
+
+    def espera_restante(self) -> float:
+        """
+        Segundos que faltan para que deje pasar otra petición (0 si ya la deja).
+        """
+        if self.estado != ABIERTO:
+            return 0.0
+        return max(0.0, self._abierto_hasta - time.monotonic())
+
+    def permitir(self) -> bool:
+        """
+        Decide si una petición puede salir a la red. Con el disyuntor abierto y
+        pasado el tiempo de espera, la primera que llega es la de prueba.
+        """
+        if self.estado == CERRADO:
+            return True
+        if self.estado == ABIERTO and time.monotonic() >= self._abierto_hasta:
+            self._cambiar(SEMIABIERTO)
+        if self.estado == SEMIABIERTO and not self._prueba_en_curso:
+            self._prueba_en_curso = True
+            return True
+        rechazos_disyuntor.inc()
+        return False
+
+    def registrar(self, caida: Optional[bool], prueba: bool = False) -> None:
+        """
+        Anota el resultado de una petición que se dejó salir.
+
+        Args:
+            caida (bool): True si la API no respondió (timeout, error de red, 5xx o 429),
+                False si respondió (aunque sea con un error como un 404), o None si la
+                petición se canceló sin llegar a saberlo
+            prueba (bool): Si era la petición de prueba del estado semiabierto
+        """
+        if prueba:
+            self._prueba_en_curso = False
+        if caida is None:
+            return
+        if not caida:
+            self.fallos_seguidos = 0
+            if self.estado != CERRADO:
+                self._espera_actual = self.espera
+                self._cambiar(CERRADO)
+            return
+        self.fallos_seguidos += 1
+        if self.estado == SEMIABIERTO and prueba:
+            self._espera_actual = min(self._espera_actual * 2, self.espera_maxima)
+            self._abrir()
+        elif self.estado == CERRADO and self.fallos_seguidos >= self.umbral:
+            self._abrir()
+
+    def _abrir(self) -> None:
+        self._abierto_hasta = time.monotonic() + self._espera_actual
+        self.aperturas += 1
+        self._cambiar(ABIERTO)
+
+    def _cambiar(self, estado: str) -> None:
+        anterior, self.estado = self.estado, estado
+        transiciones_disyuntor.inc(estado=estado)
+        if estado == ABIERTO:
+            logging.warning(f"Disyuntor de la {self.nombre} abierto tras {self.fallos_seguidos} fallos seguidos: "
+                            f"las peticiones se rechazan durante {self._espera_actual:.0f} s")
+        elif estado == CERRADO:
+            logging.warning(f"Disyuntor de la {self.nombre} cerrado: la API vuelve a responder")
+        else:
+            logging.info(f"Disyuntor de la {self.nombre} {estado} (antes {anterior}): petición de prueba")
@@ -0,0 +1,445 @@
+###############################################################################
+# Construcción de los embeds de respuesta y caché de embeds ya renderizados
+#
+# Las consultas sobre datos que ya no cambian (temporadas terminadas, datos
+# biográficos de pilotos) se renderizan una sola vez: las siguientes veces se
+# reutilizan los embeds tal cual, sin volver a procesar ni formatear los datos.
+# Las respuestas largas (más de 25 filas) se dividen en páginas que sólo se
+# renderizan cuando alguien las muestra.
+###############################################################################
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import discord               # Biblioteca principal para interactuar con Discord
+
+from agenda import Aviso
+from analitica import CaraACara, Compañero, Progresion, ResumenPiloto
+from cache import temporada_actual
+from envivo import CambioEnVivo
+from modelos import Carrera, ClasificacionConstructor, ClasificacionPiloto, Piloto, Resultado
+from suscripciones import ZONA_POR_DEFECTO
+
+# Máximo de campos que admite un embed de Discord
+CAMPOS_POR_EMBED = 25
+
+# Número máximo de respuestas renderizadas que se guardan
+MAX_EMBEDS_CACHEADOS = 500
+
+# Diccionario que mapea nacionalidades a emojis de banderas
+BANDERAS = {
+    "British": "🇬🇧",
+    "German": "🇩🇪",
+    "Spanish": "🇪🇸",
+    "French": "🇫🇷",
+    "Italian": "🇮🇹",
+    "Dutch": "🇳🇱",
+    "Finnish": "🇫🇮",
+    "Australian": "🇦🇺",
+    "Canadian": "🇨🇦",
+    "Brazilian": "🇧🇷",
+    "Mexican": "🇲🇽",
+    "American": "🇺🇸",
+    "Russian": "🇷🇺",
+    "Japanese": "🇯🇵",
+    "Austrian": "🇦🇹",
+    "Argentinian": "🇦🇷",
+    "Argentine": "🇦🇷",
+    "Swiss": "🇨🇭",
+    "Belgian": "🇧🇪",
+    "Danish": "🇩🇰",
+    "Swedish": "🇸🇪",
+    "South African": "🇿🇦",
+    "Portuguese": "🇵🇹",
+    "New Zealander": "🇳🇿",
+    "Indian": "🇮🇳",
+    "Malaysian": "🇲🇾",
+    "Colombian": "🇨🇴",
+    "Venezuelan": "🇻🇪",
+    "Polish": "🇵🇱",
+    "Czech": "🇨🇿",
+    "Hungarian": "🇭🇺",
+    "Indonesian": "🇮🇩",
+    "Thai": "🇹🇭",
+    "Chinese": "🇨🇳",
+    "Korean": "🇰🇷",
+    "Bahraini": "🇧🇭",
+    "Qatari": "🇶🇦",
+    "Emirati": "🇦🇪",
+    "Saudi": "🇸🇦",
+    "Kuwaiti": "🇰🇼",
+    "Monegasque": "🇲🇨",
+}
+
+
+def obtener_bandera(nacionalidad):
+    """
+    Devuelve el emoji de bandera correspondiente a una nacionalidad.
+
+    Args:
+        nacionalidad (str): Nombre de la nacionalidad en inglés
+
+    Returns:
+        str: Emoji de la bandera o cadena vacía si no se encuentra
+    """
+    return BANDERAS.get(nacionalidad, '')
+
+
+def es_inmutable(año) -> bool:
+    """
+    Indica si los datos de una temporada ya no pueden cambiar (temporada terminada).
+
+    Args:
+        año: Año de la temporada (str o int) o "current"
+    """
+    return str(año).isdigit() and int(año) < temporada_actual()
+
+
+class Paginas:
+    """
+    Respuesta de varias páginas (un embed cada una) que se renderizan la primera
+    vez que se muestran y después se reutilizan.
+
+    Args:
+        total (int): Número de páginas
+        renderizar (callable): Construye el embed de la página indicada (desde 0)
+    """
+
+    def __init__(self, total: int, renderizar: Callable[[int], discord.Embed]):
+        self.total = total
+        self._renderizar = renderizar
+        self._renderizadas: Dict[int, discord.Embed] = {}
+
+    def __len__(self) -> int:
+        return self.total
+
+    def pagina(self, numero: int) -> discord.Embed:
+        """
+        Devuelve el embed de una página, renderizándolo si es la primera vez.
+        """
+        embed = self._renderizadas.get(numero)
+        if embed is None:
+            embed = self._renderizar(numero)
+            if self.total > 1:
+                embed.set_footer(text=f"Página {numero + 1}/{self.total}")
+            self._renderizadas[numero] = embed
+        return embed
+
+
+###############################################################################
+# CONSTRUCCIÓN DE EMBEDS
+###############################################################################
+
+def construir_calendario(año: str, carreras: Sequence[Carrera]) -> List[discord.Embed]:
+    """
+    Construye el embed con el calendario de una temporada.
+    """
+    embed = discord.Embed(title=f"Calendario de la temporada {año}", color=discord.Color.blue())
+    # Añadir cada carrera como un campo en el embed
+    for carrera in carreras:
+        embed.add_field(name=carrera.nombre, value=f"Circuito: {carrera.circuito.nombre}\nFecha: {carrera.fecha}", inline=False)
+    return [embed]
+
+
+def _numero_paginas(filas: Sequence) -> int:
+    return max(1, (len(filas) + CAMPOS_POR_EMBED - 1) // CAMPOS_POR_EMBED)
+
+
+def paginar_resultados(nombre_gp: str, año: str, resultados: Sequence[Resultado],
+                       titulo: Optional[str] = None) -> Paginas:
+    """
+    Prepara las páginas con los resultados de una carrera (una por cada 25 pilotos).
+    """
+    titulo = titulo or f"Resultados del Gran Premio '{nombre_gp}' en {año}"
+
+    def renderizar(numero: int) -> discord.Embed:
+        embed = discord.Embed(title=titulo, color=discord.Color.blue())
+        inicio = numero * CAMPOS_POR_EMBED
+        for resultado in resultados[inicio:inicio + CAMPOS_POR_EMBED]:
+            piloto = resultado.piloto
+            bandera = obtener_bandera(piloto.nacionalidad)
+            # Para DNF, DSQ, etc. no hay tiempo y se muestra el estado
+            tiempo = resultado.tiempo or resultado.estado
+
+            # Añadir campo con la información del piloto
+            embed.add_field(
+                name=f"Posición {resultado.posicion}",
+                value=f"Piloto: {piloto.nombre_completo}\nNacionalidad: {bandera} {piloto.nacionalidad}\nEquipo: {resultado.constructor.nombre}\nTiempo: {tiempo}",
+                inline=False
+            )
+        return embed
+
+    return Paginas(_numero_paginas(resultados), renderizar)
+
+
+def construir_resultados_en_vivo(cambio: CambioEnVivo) -> List[discord.Embed]:
+    """
+    Construye los embeds que se publican en los canales suscritos al cambiar los resultados de una sesión.
+    """
+    carrera = cambio.carrera
+    sesion = "Sprint" if cambio.sesion == 'Sprint' else "Carrera"
+    titulo = f"🏁 {sesion}: {carrera.nombre} {carrera.temporada}"
+    if cambio.correccion:
+        titulo += " (resultados actualizados)"
+    paginas = paginar_resultados(carrera.nombre, str(carrera.temporada), cambio.resultados, titulo)
+    return [paginas.pagina(numero) for numero in range(len(paginas))]
+
+
+# Nombres en español de las sesiones del fin de semana
+NOMBRES_SESION = {
+    'FirstPractice': "Libres 1",
+    'SecondPractice': "Libres 2",
+    'ThirdPractice': "Libres 3",
+    'SprintQualifying': "Clasificación sprint",
+    'SprintShootout': "Sprint Shootout",
+    'Sprint': "Sprint",
+    'Qualifying': "Clasificación",
+    'Race': "Carrera",
+}
+
+
+def formatear_hora(instante: datetime, zona: str) -> str:
+    """
+    Escribe un instante UTC en la hora local de una zona horaria.
+
+    Args:
+        instante (datetime): Instante en UTC (sin zona horaria)
+        zona (str): Zona horaria IANA (p. ej. "Europe/Madrid")
+
+    Returns:
+        str: Fecha y hora, seguidas de la zona
+    """
+    # Se importa al usarla: las zonas horarias no retrasan el arranque
+    import pytz
+    local = instante.replace(tzinfo=pytz.UTC).astimezone(pytz.timezone(zona))
+    sufijo = "hora española" if zona == ZONA_POR_DEFECTO else zona
+    return f"{local:%d/%m/%Y %H:%M} ({sufijo})"
+
+
+def construir_proxima_carrera(carrera: Carrera, zona: str) -> List[discord.Embed]:
+    """
+    Construye el embed con la próxima carrera, con la hora en la zona del canal.
+    """
+    embed = discord.Embed(title="📅 Próxima carrera", color=discord.Color.green())
+    embed.add_field(name="GP", value=carrera.nombre, inline=False)
+    embed.add_field(name="Circuito", value=carrera.circuito.nombre, inline=False)
+    embed.add_field(name="Fecha", value=formatear_hora(carrera.inicio, zona), inline=False)
+    return [embed]
+
+
+def construir_recordatorio(aviso: Aviso, zona: str) -> discord.Embed:
+    """
+    Construye el recordatorio de una sesión que está a punto de empezar.
+    """
+    sesion = aviso.sesion
+    nombre = NOMBRES_SESION.get(sesion.sesion, sesion.sesion)
+    # Discord muestra la marca de tiempo como cuenta atrás en la hora de cada usuario
+    unix = int(sesion.inicio.replace(tzinfo=timezone.utc).timestamp())
+    embed = discord.Embed(title=f"⏰ {nombre}: {sesion.carrera.nombre}",
+                          description=f"Empieza <t:{unix}:R>.", color=discord.Color.orange())
+    embed.add_field(name="Circuito", value=sesion.carrera.circuito.nombre, inline=False)
+    embed.add_field(name="Hora", value=formatear_hora(sesion.inicio, zona), inline=False)
+    return embed
+
+
+def construir_piloto(piloto: Piloto) -> List[discord.Embed]:
+    """
+    Construye el embed con la información de un piloto.
+    """
+    nombre = piloto.nombre_completo
+    embed = discord.Embed(title=f"Información de {nombre}", color=discord.Color.gold())
+    embed.add_field(name="Nombre", value=nombre, inline=False)
+    embed.add_field(name="Fecha de nacimiento", value=piloto.fecha_nacimiento, inline=False)
+    embed.add_field(name="Nacionalidad", value=piloto.nacionalidad, inline=False)
+    return [embed]
+
+
+def _tras_ronda(ronda: Optional[int]) -> str:
+    return f" tras la ronda {ronda}" if ronda is not None else ""
+
+
+def paginar_clasificacion_pilotos(año: str, clasificacion: Sequence[ClasificacionPiloto],
+                                  ronda: Optional[int] = None) -> Paginas:
+    """
+    Prepara las páginas de la clasificación de pilotos (una por cada 25 pilotos).
+    """
+    def renderizar(numero: int) -> discord.Embed:
+        embed = discord.Embed(title=f"🏆 Clasificación Mundial de Pilotos {año}{_tras_ronda(ronda)}",
+                              color=discord.Color.gold())
+        # Añadir un campo por cada piloto en esta página
+        for fila in clasificacion[numero * CAMPOS_POR_EMBED:(numero + 1) * CAMPOS_POR_EMBED]:
+            piloto = fila.piloto
+            equipo = fila.constructores[0].nombre if fila.constructores else 'N/A'
+            bandera = obtener_bandera(piloto.nacionalidad)
+            embed.add_field(
+                name=f"{fila.posicion}. {piloto.nombre_completo} {bandera}",
+                value=f"Puntos: {fila.puntos}\nEquipo: {equipo}",
+                inline=False
+            )
+        return embed
+
+    return Paginas(_numero_paginas(clasificacion), renderizar)
+
+
+def construir_clasificacion_constructores(año: str, clasificacion: Sequence[ClasificacionConstructor],
+                                          ronda: Optional[int] = None) -> List[discord.Embed]:
+    """
+    Construye el embed de la clasificación de constructores.
+    """
+    embed = discord.Embed(title=f"🏆 Clasificación Mundial de Constructores {año}{_tras_ronda(ronda)}",
+                          color=discord.Color.blue())
+    # Añadir un campo por cada constructor
+    for fila in clasificacion:
+        constructor = fila.constructor
+        bandera = obtener_bandera(constructor.nacionalidad)
+        embed.add_field(
+            name=f"{fila.posicion}. {constructor.nombre} {bandera}",
+            value=f"Puntos: {fila.puntos}",
+            inline=False
+        )
+    return [embed]
+
+
+###############################################################################
+# ESTADÍSTICAS
+###############################################################################
+
+# Aviso sobre los puntos que se suman a partir de los resultados de carrera
+NOTA_PUNTOS = "Puntos de carrera (sin sprints)"
+
+
+def formatear_puntos(puntos: float) -> str:
+    """
+    Muestra los puntos sin decimales salvo que los tengan (p. ej. medios puntos).
+    """
+    return f"{puntos:g}" if puntos == int(puntos) else f"{puntos:.1f}"
+
+
+def _porcentaje(parte: int, total: int) -> str:
+    return f"{100 * parte / total:.0f} %" if total else "-"
+
+
+def construir_estadisticas(resumen: ResumenPiloto, ambito: str) -> List[discord.Embed]:
+    """
+    Construye el embed con las estadísticas de un piloto en una temporada o en toda su trayectoria.
+    """
+    piloto = resumen.piloto
+    bandera = obtener_bandera(piloto.nacionalidad)
+    embed = discord.Embed(title=f"📊 {piloto.nombre_completo} {bandera} · {ambito}", color=discord.Color.gold())
+    embed.add_field(name="Carreras", value=str(resumen.carreras), inline=True)
+    embed.add_field(name="Victorias", value=f"{resumen.victorias} ({_porcentaje(resumen.victorias, resumen.carreras)})", inline=True)
+    embed.add_field(name="Podios", value=f"{resumen.podios} ({_porcentaje(resumen.podios, resumen.carreras)})", inline=True)
+    embed.add_field(name="Poles", value=str(resumen.poles), inline=True)
+    embed.add_field(name="Puntos", value=formatear_puntos(resumen.puntos), inline=True)
+    embed.add_field(name="Mejor resultado", value=f"P{resumen.mejor}" if resumen.mejor else "-", inline=True)
+    embed.add_field(name="Carreras terminadas", value=f"{resumen.terminadas} ({_porcentaje(resumen.terminadas, resumen.carreras)})", inline=True)
+    embed.add_field(name="Equipos", value=", ".join(e.nombre for e in resumen.equipos)[:1024], inline=False)
+    # Con varias temporadas, una línea por cada una
+    if len(resumen.temporadas) > 1:
+        embed.description = "\n".join(
+            f"**{t.año}** · {t.carreras} carreras · {t.victorias} 🏆 · {t.podios} podios · {formatear_puntos(t.puntos)} pts"
+            for t in resumen.temporadas)[:4096]
+    embed.set_footer(text=NOTA_PUNTOS)
+    return [embed]
+
+
+def construir_cara_a_cara(cara: CaraACara, ambito: str) -> List[discord.Embed]:
+    """
+    Construye el embed con el cara a cara de dos pilotos.
+    """
+    a, b = cara.piloto_a, cara.piloto_b
+    embed = discord.Embed(title=f"⚔️ {a.apellido} vs {b.apellido} · {ambito}",
+                          description=f"{cara.carreras} carreras disputadas por los dos"
+                                      + (f", {cara.compañeros} como compañeros de equipo" if cara.compañeros else ""),
+                          color=discord.Color.red())
+    embed.add_field(name="Por delante en carrera", value=f"{a.apellido} {cara.delante_a} - {cara.delante_b} {b.apellido}", inline=False)
+    embed.add_field(name="Por delante en parrilla", value=f"{a.apellido} {cara.parrilla_a} - {cara.parrilla_b} {b.apellido}", inline=False)
+    embed.add_field(name="Victorias", value=f"{a.apellido} {cara.victorias_a} - {cara.victorias_b} {b.apellido}", inline=False)
+    embed.add_field(name="Puntos", value=f"{a.apellido} {formatear_puntos(cara.puntos_a)} - {formatear_puntos(cara.puntos_b)} {b.apellido}", inline=False)
+    embed.set_footer(text=NOTA_PUNTOS)
+    return [embed]
+
+
+def paginar_compañeros(nombre: str, ambito: str, compañeros: Sequence[Compañero]) -> Paginas:
+    """
+    Prepara las páginas con la comparación de un piloto con sus compañeros de equipo.
+    """
+    def renderizar(numero: int) -> discord.Embed:
+        embed = discord.Embed(title=f"🤝 {nombre} frente a sus compañeros · {ambito}", color=discord.Color.green())
+        for fila in compañeros[numero * CAMPOS_POR_EMBED:(numero + 1) * CAMPOS_POR_EMBED]:
+            equipos = ", ".join(e.nombre for e in fila.equipos)
+            embed.add_field(
+                name=f"{fila.piloto.nombre_completo} ({equipos})"[:256],
+                value=f"Carreras: {fila.carreras}\n"
+                      f"Por delante en carrera: {fila.delante} - {fila.carreras - fila.delante}\n"
+                      f"Por delante en parrilla: {fila.parrilla} - {fila.carreras - fila.parrilla}\n"
+                      f"Puntos: {formatear_puntos(fila.puntos)} - {formatear_puntos(fila.puntos_compañero)}",
+                inline=False
+            )
+        embed.set_footer(text=NOTA_PUNTOS)
+        return embed
+
+    return Paginas(_numero_paginas(compañeros), renderizar)
+
+
+def construir_progresion(progresion: Progresion) -> List[discord.Embed]:
+    """
+    Construye el embed con los puntos acumulados ronda a ronda (una columna por piloto).
+    """
+    cabecera = "R  " + "".join(f"{(piloto.codigo or piloto.apellido[:3]).upper():>6}" for piloto, _ in progresion.series)
+    filas = [f"{ronda:<3}" + "".join(f"{formatear_puntos(serie[i]):>6}" for _, serie in progresion.series)
+             for i, ronda in enumerate(progresion.rondas)]
+    embed = discord.Embed(title=f"📈 Progresión de puntos {progresion.año}",
+                          description=f"```\n{cabecera}\n" + "\n".join(filas) + "\n```",
+                          color=discord.Color.blue())
+    embed.set_footer(text=NOTA_PUNTOS)
+    return [embed]
+
+
+###############################################################################
+# CACHÉ DE EMBEDS
+###############################################################################
+
+# Respuesta guardada: embeds ya renderizados o páginas que se renderizan al mostrarse
+Respuesta = Union[Tuple[discord.Embed, ...], Paginas]
+
+
+class CacheEmbeds:
+    """
+    LRU de respuestas ya renderizadas, indexadas por la consulta normalizada.
+
+    Sólo debe guardar respuestas de datos inmutables (ver `es_inmutable`): los
+    embeds se devuelven tal cual, sin copiarlos, así que no deben modificarse.
+    Las respuestas paginadas se guardan con sus datos y cada página se renderiza
+    la primera vez que alguien la muestra.
+    """
+
+    def __init__(self, max_entradas: int = MAX_EMBEDS_CACHEADOS):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Hashable, Respuesta]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable) -> Optional[Respuesta]:
+        """
+        Devuelve los embeds guardados para una consulta, o None si no están.
+        """
+        embeds = self._entradas.get(clave)
+        if embeds is None:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return embeds
+
+    def guardar(self, clave: Hashable, embeds: Union[Sequence[discord.Embed], Paginas]) -> None:
+        """
+        Guarda los embeds (o las páginas) de una consulta, expulsando la menos usada si se supera el límite.
+        """
+        self._entradas[clave] = embeds if isinstance(embeds, Paginas) else tuple(embeds)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
@@ -0,0 +1,264 @@
+###############################################################################
+# Enfriamientos de comandos y respuestas compartidas
+#
+# Un mismo usuario repitiendo `!resultados` con nombres distintos puede
+# provocar decenas de consultas sin caché (incluida la búsqueda en varias
+# temporadas). Aquí se limita cuántos comandos puede lanzar cada usuario,
+# cada servidor y cada usuario con cada comando caro, y se evita repetir el
+# trabajo cuando varios usuarios de un canal piden lo mismo casi a la vez:
+# se contesta una vez y los demás reciben un enlace a esa respuesta.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para esperar a una respuesta que se está calculando
+import contextvars           # Para asociar la respuesta a la invocación en curso
+import logging               # Para registro de eventos y errores
+import os                    # Para leer los límites configurados
+import time                  # Para la ventana de las respuestas compartidas
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+import discord               # Biblioteca principal para interactuar con Discord
+from discord.ext import commands  # Enfriamientos y errores de comprobación
+
+from indice_circuitos import normalizar
+from metricas import REGISTRO
+
+# Límites por defecto como (usos, periodo en segundos)
+LIMITE_USUARIO = (8, 30.0)
+LIMITE_SERVIDOR = (60, 30.0)
+
+# Comandos que pueden provocar muchas peticiones a la API: límite propio por usuario
+LIMITES_COMANDO: Dict[str, Tuple[int, float]] = {
+    'resultados': (3, 30.0),
+}
+
+# Segundos durante los que una respuesta se reutiliza para la misma consulta en el mismo canal
+VENTANA_COMPARTIR = 30.0
+
+# Respuestas recientes que se recuerdan como máximo
+MAX_RESPUESTAS_COMPARTIDAS = 1000
+
+rechazos_enfriamiento = REGISTRO.contador(
+    'f1bot_enfriamiento_rechazos_total', 'Comandos rechazados por enfriamiento', ('ambito',))
+consultas_compartidas = REGISTRO.contador(
+    'f1bot_respuestas_compartidas_total', 'Consultas contestadas con un enlace a una respuesta ya enviada')
+
+
+def leer_limite(texto: Optional[str], por_defecto: Optional[Tuple[int, float]]) -> Optional[Tuple[int, float]]:
+    """
+    Interpreta un límite con el formato "usos/segundos" (p. ej. "5/30").
+
+    Args:
+        texto (str): Valor configurado; vacío o None para usar el límite por defecto
+        por_defecto (tuple): Límite si no hay valor configurado
+
+    Returns:
+        tuple: (usos, segundos), o None si el límite está desactivado ("0" u "off")
+    """
+    if texto is None or not texto.strip():
+        return por_defecto
+    texto = texto.strip().lower()
+    if texto in ('0', 'off', 'no'):
+        return None
+    try:
+        usos, segundos = texto.split('/', 1)
+        limite = (int(usos), float(segundos))
+    except ValueError:
+        logging.warning(f"Límite de enfriamiento no válido '{texto}'; se usa {por_defecto}")
+        return por_defecto
+    return limite if limite[0] > 0 and limite[1] > 0 else None
+
+
+class Enfriamientos:
+    """
+    Enfriamientos por usuario, por servidor y por usuario en cada comando.
+
+    Un comando sólo gasta un uso de cada límite si todos lo permiten, para que
+    un rechazo del límite del servidor no consuma también el del usuario.
+
+    Args:
+        usuario (tuple): Límite de cada usuario (None para desactivarlo)
+        servidor (tuple): Límite de cada servidor (None para desactivarlo)
+        comandos (dict): Límite por usuario de cada comando, por nombre
+    """
+
+    def __init__(self, usuario: Optional[Tuple[int, float]] = LIMITE_USUARIO,
+                 servidor: Optional[Tuple[int, float]] = LIMITE_SERVIDOR,
+                 comandos: Mapping[str, Optional[Tuple[int, float]]] = LIMITES_COMANDO):
+        self._ambitos: Dict[str, commands.CooldownMapping] = {}
+        if usuario is not None:
+            self._ambitos['usuario'] = commands.CooldownMapping.from_cooldown(*usuario, commands.BucketType.user)
+        if servidor is not None:
+            self._ambitos['servidor'] = commands.CooldownMapping.from_cooldown(*servidor, commands.BucketType.guild)
+        self._comandos = {nombre: commands.CooldownMapping.from_cooldown(*limite, commands.BucketType.user)
+                          for nombre, limite in comandos.items() if limite is not None}
+
+    @classmethod
+    def desde_entorno(cls, entorno: Mapping[str, str] = os.environ) -> 'Enfriamientos':
+        """
+        Lee los límites de ENFRIAMIENTO_USUARIO, ENFRIAMIENTO_SERVIDOR y ENFRIAMIENTO_<COMANDO>.
+        """
+        comandos = dict(LIMITES_COMANDO)
+        prefijo = 'ENFRIAMIENTO_'
+        for variable, valor in entorno.items():
+            nombre = variable[len(prefijo):].lower() if variable.startswith(prefijo) else None
+            if nombre and nombre not in ('usuario', 'servidor'):
+                comandos[nombre] = leer_limite(valor, LIMITES_COMANDO.get(nombre))
+        return cls(usuario=leer_limite(entorno.get('ENFRIAMIENTO_USUARIO'), LIMITE_USUARIO),
+                   servidor=leer_limite(entorno.get('ENFRIAMIENTO_SERVIDOR'), LIMITE_SERVIDOR),
+                   comandos=comandos)
+
+    def comprobar(self, ctx: commands.Context) -> None:
+        """
+        Gasta un uso de cada límite que afecta al comando.
+
+        Raises:
+            CommandOnCooldown: Si algún límite está agotado (con los segundos que faltan)
+        """
+        mapas = list(self._ambitos.items())
+        comando = ctx.command.qualified_name if ctx.command is not None else None
+        if comando in self._comandos:
+            mapas.insert(0, ('comando', self._comandos[comando]))
+        cubos = []
+        ahora = time.time()
+        for ambito, mapa in mapas:
+            cubo = mapa.get_bucket(ctx.message, ahora)
+            if cubo is None:
+                continue
+            espera = cubo.get_retry_after(ahora)
+            if espera > 0:
+                rechazos_enfriamiento.inc(ambito=ambito)
+                raise commands.CommandOnCooldown(cubo, espera, mapa.type)
+            cubos.append(cubo)
+        for cubo in cubos:
+            cubo.update_rate_limit(ahora)
+
+
+class RespuestaCompartida(commands.CheckFailure):
+    """
+    La consulta ya se respondió en el canal y se ha contestado con un enlace a esa respuesta.
+    """
+
+
+class Turno:
+    """
+    Consulta que está calculando una invocación, para que las iguales esperen su respuesta.
+    """
+
+    __slots__ = ('clave', 'futuro', 'mensaje')
+
+    def __init__(self, clave: Hashable):
+        self.clave = clave
+        self.futuro: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.mensaje: Optional[discord.Message] = None
+
+
+_turno: contextvars.ContextVar[Optional[Turno]] = contextvars.ContextVar('turno_compartido', default=None)
+
+
+def anotar_respuesta(mensaje: Optional[discord.Message]) -> None:
+    """
+    Recuerda el primer mensaje enviado por la invocación en curso como su respuesta.
+    """
+    turno = _turno.get()
+    if turno is not None and turno.mensaje is None and mensaje is not None:
+        turno.mensaje = mensaje
+
+
+class RespuestasCompartidas:
+    """
+    Respuestas recientes por canal y consulta, para contestar con un enlace en
+    lugar de volver a calcularlas.
+
+    Sólo se comparten los comandos con prefijo: los de barra tienen que
+    responder a su propia interacción.
+
+    Args:
+        comandos (iterable): Nombres de los comandos cuyas respuestas se comparten
+        ventana (float): Segundos durante los que una respuesta se reutiliza
+        max_entradas (int): Respuestas recientes que se recuerdan como máximo
+    """
+
+    def __init__(self, comandos: Iterable[str], ventana: float = VENTANA_COMPARTIR,
+                 max_entradas: int = MAX_RESPUESTAS_COMPARTIDAS):
+        self.comandos = frozenset(comandos)
+        self.ventana = ventana
+        self.max_entradas = max_entradas
+        self._recientes: 'OrderedDict[Hashable, Tuple[discord.Message, float]]' = OrderedDict()
+        self._en_curso: Dict[Hashable, Turno] = {}
+
+    def clave(self, ctx: commands.Context) -> Optional[Hashable]:
+        if ctx.interaction is not None or ctx.command is None or ctx.command.qualified_name not in self.comandos:
+            return None
+        argumentos = ctx.message.content[ctx.view.index:] if ctx.view is not None else ''
+        return ctx.channel.id, ctx.command.qualified_name, normalizar(argumentos)
+
+    def _reciente(self, clave: Hashable) -> Optional[discord.Message]:
+        entrada = self._recientes.get(clave)
+        if entrada is None:
+            return None
+        mensaje, instante = entrada
+        if time.monotonic() - instante > self.ventana:
+            del self._recientes[clave]
+            return None
+        return mensaje
+
+    async def buscar(self, ctx: commands.Context) -> Optional[discord.Message]:
+        """
+        Busca una respuesta reciente o en curso a la misma consulta en el mismo canal.
+
+        Si no la hay, la invocación actual pasa a ser la que responde y las
+        iguales que lleguen mientras tanto esperarán a su respuesta.
+
+        Returns:
+            Message: Respuesta a la que enlazar, o None si hay que calcularla
+        """
+        clave = self.clave(ctx)
+        if clave is None:
+            return None
+        mensaje = self._reciente(clave)
+        if mensaje is not None:
+            return mensaje
+        turno = self._en_curso.get(clave)
+        if turno is not None:
+            # Si la invocación que responde falla, ésta se calcula por su cuenta
+            return await asyncio.shield(turno.futuro)
+        turno = Turno(clave)
+        self._en_curso[clave] = turno
+        _turno.set(turno)
+        return None
+
+    def terminar(self, error: bool = False) -> None:
+        """
+        Cierra el turno de la invocación en curso y guarda su respuesta si terminó bien.
+        """
+        turno = _turno.get()
+        if turno is None or turno.futuro.done():
+            return
+        mensaje = None if error else turno.mensaje
+        turno.futuro.set_result(mensaje)
+        if self._en_curso.get(turno.clave) is turno:
+            del self._en_curso[turno.clave]
+        if mensaje is not None:
+            self._recientes[turno.clave] = (mensaje, time.monotonic())
+            self._recientes.move_to_end(turno.clave)
+            while len(self._recientes) > self.max_entradas:
+                self._recientes.popitem(last=False)
+
+    async def contestar(self, ctx: commands.Context, mensaje: discord.Message, enviar: Any = None) -> None:
+        """
+        Contesta a la consulta repetida con un enlace a la respuesta ya enviada.
+
+        Args:
+            ctx: Contexto del comando
+            mensaje (Message): Respuesta ya enviada a la misma consulta
+            enviar (callable, opcional): Función de envío que recibe el contexto y el texto; por defecto, `ctx.send`
+        """
+        consultas_compartidas.inc()
+        texto = f"⬆️ Esta misma consulta se acaba de responder: {mensaje.jump_url}"
+        if enviar is None:
+            await ctx.send(texto)
+        else:
+            await enviar(ctx, texto)
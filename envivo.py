@@ -0,0 +1,269 @@
+###############################################################################
+# Modo en directo durante los fines de semana de carrera
+#
+# Mientras se disputa una sesión con resultados (sprint o carrera) y durante
+# unas horas después, que es cuando la API los publica, una única tarea
+# consulta esos resultados con peticiones condicionales (ETag /
+# If-Modified-Since) en lugar de que cada usuario repita `!resultados`. Los
+# cambios se detectan con una huella del contenido: al cambiar, se invalida
+# la temporada en la caché, se vuelven a cargar los resultados para que los
+# comandos los encuentren ya descargados y se avisa a quien escuche (los
+# canales suscritos a los resultados). Sin cambios, las consultas se
+# espacian con espera exponencial.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para la tarea en segundo plano
+import hashlib               # Huella del contenido de cada respuesta
+import logging               # Para registro de eventos y errores
+import random                # Para repartir las consultas en el tiempo
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from cache import DURACION_CARRERA, CacheErgast, temporada_actual
+from ergast import LIMITE_PAGINA, ClienteErgast, ErrorErgast, extraer_carreras, fijar_presupuesto
+from metricas import REGISTRO
+from modelos import Carrera, Resultado, ResultadosCarrera
+from planificador import DURACION_SESIONES, SESION_CARRERA
+
+# Endpoint y clave de los resultados de cada sesión que se vigila
+ENDPOINTS_SESION = {
+    'Sprint': ('sprint', 'SprintResults'),
+    SESION_CARRERA: ('results', 'Results'),
+}
+
+# Tiempo tras el final de la sesión durante el que se siguen esperando resultados
+MARGEN_RESULTADOS = timedelta(hours=4)
+
+# Segundos entre consultas: se empieza por el mínimo y se duplica mientras no haya cambios
+INTERVALO_MINIMO = 30.0
+INTERVALO_MAXIMO = 300.0
+
+# Segundos máximos entre comprobaciones del calendario fuera de las sesiones
+ESPERA_CALENDARIO = 60 * 60
+
+consultas_en_vivo = REGISTRO.contador(
+    'f1bot_envivo_consultas_total', 'Consultas del modo en directo por resultado', ('resultado',))
+
+
+class Ventana(NamedTuple):
+    inicio: datetime             # Inicio de la sesión (UTC)
+    fin: datetime                # Hasta cuándo se esperan sus resultados (UTC)
+    sesion: str
+    carrera: Carrera
+
+
+class CambioEnVivo(NamedTuple):
+    carrera: Carrera
+    sesion: str
+    resultados: Tuple[Resultado, ...]
+    correccion: bool             # True si ya había resultados de la sesión (p. ej. tras una sanción)
+
+
+# Función a la que se avisa de cada cambio
+Publicador = Callable[[CambioEnVivo], Awaitable[None]]
+
+
+def calcular_ventanas(carreras: Sequence[Carrera], margen: timedelta = MARGEN_RESULTADOS) -> List[Ventana]:
+    """
+    Calcula cuándo hay que vigilar los resultados de cada sesión del calendario.
+
+    Args:
+        carreras (list): Carreras de la temporada
+        margen (timedelta): Tiempo tras el final de cada sesión durante el que se vigila
+
+    Returns:
+        list: Ventanas ordenadas por inicio
+    """
+    ventanas = []
+    for carrera in carreras:
+        inicios = [(sesion, inicio) for sesion, inicio in carrera.sesiones if sesion in ENDPOINTS_SESION]
+        if carrera.inicio is not None:
+            inicios.append((SESION_CARRERA, carrera.inicio))
+        for sesion, inicio in inicios:
+            duracion = DURACION_CARRERA if sesion == SESION_CARRERA else DURACION_SESIONES[sesion]
+            ventanas.append(Ventana(inicio, inicio + duracion + margen, sesion, carrera))
+    ventanas.sort(key=lambda ventana: ventana.inicio)
+    return ventanas
+
+
+def huella(texto: str) -> bytes:
+    return hashlib.blake2b(texto.encode(), digest_size=16).digest()
+
+
+class SondeoEnVivo:
+    """
+    Tarea en segundo plano que vigila los resultados de cada sesión mientras se esperan.
+
+    Args:
+        cliente (ClienteErgast): Cliente de la API
+        cache (CacheErgast, opcional): Caché en la que invalidar la temporada al cambiar los resultados
+        intervalo_minimo (float): Segundos entre consultas tras un cambio
+        intervalo_maximo (float): Segundos máximos entre consultas sin cambios o con errores
+        margen (timedelta): Tiempo tras el final de cada sesión durante el que se vigila
+        tras_cambio (callable, opcional): Se espera tras recargar los resultados (p. ej. para
+            actualizar datos calculados a partir de ellos)
+    """
+
+    def __init__(self, cliente: ClienteErgast, cache: Optional[CacheErgast] = None,
+                 intervalo_minimo: float = INTERVALO_MINIMO, intervalo_maximo: float = INTERVALO_MAXIMO,
+                 margen: timedelta = MARGEN_RESULTADOS,
+                 tras_cambio: Optional[Callable[[], Awaitable[object]]] = None):
+        self.cliente = cliente
+        self.cache = cache
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_maximo = intervalo_maximo
+        self.margen = margen
+        self.tras_cambio = tras_cambio
+        self._publicadores: List[Publicador] = []
+        self._tarea: Optional[asyncio.Task] = None
+        # Sesión vigilada ahora mismo y la siguiente, para informar a los usuarios
+        self.ventana: Optional[Ventana] = None
+        self.proxima: Optional[Ventana] = None
+        self.cambios = 0
+
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+
+    def iniciar(self) -> None:
+        """
+        Arranca la tarea en segundo plano (no hace nada si ya está en marcha).
+        """
+        if not self.activo:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        """
+        Cancela la tarea en segundo plano y espera a que termine.
+        """
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+        self._tarea = None
+
+    def escuchar(self, publicador: Publicador) -> None:
+        """
+        Registra una función a la que avisar de cada cambio en los resultados.
+        """
+        self._publicadores.append(publicador)
+
+    def dejar_de_escuchar(self, publicador: Publicador) -> None:
+        if publicador in self._publicadores:
+            self._publicadores.remove(publicador)
+
+    ###########################################################################
+    # Ejecución
+    ###########################################################################
+
+    async def _bucle(self) -> None:
+        """
+        Bucle principal: espera a la siguiente sesión del calendario y la vigila.
+        """
+        # Las consultas son del modo en directo, no de ningún comando
+        fijar_presupuesto(None)
+        while True:
+            try:
+                carreras = await self.cliente.carreras(str(temporada_actual()))
+            except ErrorErgast as e:
+                logging.warning(f"Modo en directo: no se pudo cargar el calendario ({e})")
+                await asyncio.sleep(self.intervalo_maximo)
+                continue
+            ahora = datetime.utcnow()
+            ventana = next((v for v in calcular_ventanas(carreras, self.margen) if v.fin > ahora), None)
+            self.proxima = ventana
+            if ventana is None or ventana.inicio > ahora:
+                # El calendario puede cambiar: se vuelve a mirar al menos cada hora
+                espera = ESPERA_CALENDARIO if ventana is None else \
+                    min(ESPERA_CALENDARIO, (ventana.inicio - ahora).total_seconds())
+                await asyncio.sleep(espera)
+                continue
+            self.ventana = ventana
+            try:
+                await self._vigilar(ventana)
+            finally:
+                self.ventana = None
+
+    async def _vigilar(self, ventana: Ventana) -> None:
+        """
+        Consulta los resultados de una sesión hasta que termina su ventana.
+
+        La primera respuesta sólo sirve de referencia; a partir de ahí, cada
+        cambio de contenido se publica y vuelve a acercar las consultas.
+        """
+        carrera = ventana.carrera
+        endpoint, clave = ENDPOINTS_SESION[ventana.sesion]
+        ruta = f'{carrera.temporada}/{carrera.ronda}/{endpoint}?limit={LIMITE_PAGINA}'
+        logging.info(f"Modo en directo: vigilando {ventana.sesion} de {carrera.nombre} "
+                     f"hasta las {ventana.fin:%H:%M} UTC")
+        etag = modificado = anterior = None
+        publicados = False
+        intervalo = self.intervalo_minimo
+        while datetime.utcnow() < ventana.fin:
+            try:
+                respuesta = await self.cliente.obtener_condicional(ruta, etag, modificado)
+            except ErrorErgast as e:
+                consultas_en_vivo.inc(resultado='error')
+                logging.warning(f"Modo en directo: error al consultar {ruta} ({e})")
+                intervalo = min(intervalo * 2, self.intervalo_maximo)
+            else:
+                if not respuesta.modificada:
+                    resultado = 'no_modificada'
+                else:
+                    etag, modificado = respuesta.etag, respuesta.modificado
+                    actual = huella(respuesta.texto)
+                    if anterior is None:
+                        resultado = 'referencia'
+                        publicados = bool(self._resultados(respuesta.datos, clave))
+                    elif actual == anterior:
+                        resultado = 'sin_cambios'
+                    else:
+                        resultado = 'cambio'
+                        publicados = await self._cambio(ventana, self._resultados(respuesta.datos, clave),
+                                                        publicados)
+                    anterior = actual
+                consultas_en_vivo.inc(resultado=resultado)
+                intervalo = self.intervalo_minimo if resultado == 'cambio' else \
+                    min(intervalo * 2, self.intervalo_maximo)
+            # La parte aleatoria evita que varios procesos consulten a la vez
+            espera = intervalo * random.uniform(0.8, 1.2)
+            await asyncio.sleep(max(0.0, min(espera, (ventana.fin - datetime.utcnow()).total_seconds())))
+
+    @staticmethod
+    def _resultados(datos: Dict[str, Any], clave: str) -> Tuple[Resultado, ...]:
+        return tuple(resultado for carrera in extraer_carreras(datos.get('MRData', {}))
+                     for resultado in ResultadosCarrera.desde_api(carrera, clave).resultados)
+
+    async def _cambio(self, ventana: Ventana, resultados: Tuple[Resultado, ...], publicados: bool) -> bool:
+        """
+        Actualiza la caché con los resultados nuevos y avisa a quien escuche.
+
+        Returns:
+            bool: Si ya se han publicado resultados de la sesión
+        """
+        carrera = ventana.carrera
+        self.cambios += 1
+        logging.info(f"Modo en directo: han cambiado los resultados de {ventana.sesion} de {carrera.nombre}")
+        if self.cache is not None:
+            self.cache.invalidar_temporada(carrera.temporada)
+        try:
+            if ventana.sesion == SESION_CARRERA:
+                await self.cliente.resultados(str(carrera.temporada), carrera.circuito.id)
+            if self.tras_cambio is not None:
+                await self.tras_cambio()
+        except ErrorErgast as e:
+            logging.warning(f"Modo en directo: no se pudieron recargar los resultados ({e})")
+        if not resultados:
+            return publicados
+        cambio = CambioEnVivo(carrera, ventana.sesion, resultados, publicados)
+        for publicador in list(self._publicadores):
+            try:
+                await publicador(cambio)
+            except Exception as e:
+                logging.error(f"Error al publicar los resultados en directo: {e}")
+        return True
@@ -0,0 +1,872 @@
+###############################################################################
+# Cliente asíncrono para la API Ergast F1
+#
+# Centraliza todas las peticiones HTTP a api.jolpi.ca en una única sesión
+# aiohttp compartida, de forma que los comandos del bot nunca bloqueen el
+# bucle de eventos de discord.py mientras esperan a la API.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para capturar los timeouts de las peticiones
+import contextlib            # Para anotar las respuestas caducadas de una consulta
+import contextvars           # Para el presupuesto de peticiones de cada invocación
+import functools             # Para fijar los argumentos de las revalidaciones
+import json                  # Para decodificar las respuestas
+import logging               # Para registro de eventos y errores
+import time                  # Para medir la duración de las peticiones
+from collections import deque
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional,
+                    Set, Tuple)
+
+import aiohttp               # Cliente HTTP asíncrono
+
+from cache import CacheErgast, temporada_actual, temporada_de_ruta
+from disyuntor import SEMIABIERTO, Disyuntor
+from limitador import LimitadorPeticiones
+from metricas import REGISTRO, endpoint_de_ruta, fase, latencia_ergast, peticiones_ergast
+from modelos import (Carrera, Circuito, ClasificacionConstructor, ClasificacionPiloto, Piloto, Resultado,
+                     ResultadosCarrera, tamaño_aproximado)
+
+# URL base de la API (espejo de Ergast alojado en jolpi.ca)
+URL_BASE = 'https://api.jolpi.ca/ergast/f1'
+
+# Tiempo máximo por petición, en segundos
+TIMEOUT_POR_DEFECTO = 10
+
+# Número máximo de conexiones simultáneas del pool
+MAX_CONEXIONES = 20
+
+# Tamaño máximo de página que admite la API
+LIMITE_PAGINA = 100
+
+# Páginas que se piden por adelantado mientras se consume una consulta paginada
+MAX_PAGINAS_EN_VUELO = 4
+
+# Primera temporada con carreras sprint (antes, la consulta de sprints siempre está vacía)
+PRIMERA_TEMPORADA_SPRINT = 2021
+
+# Segundos mínimos entre intentos de revalidar datos caducados
+ESPERA_REVALIDACION = 5.0
+
+
+###############################################################################
+# Extractores de registros de una respuesta (reciben el contenido de MRData)
+###############################################################################
+
+def extraer_circuitos(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return mrdata.get('CircuitTable', {}).get('Circuits', [])
+
+
+def extraer_carreras(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return mrdata.get('RaceTable', {}).get('Races', [])
+
+
+def extraer_pilotos(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return mrdata.get('DriverTable', {}).get('Drivers', [])
+
+
+def extraer_constructores(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return mrdata.get('ConstructorTable', {}).get('Constructors', [])
+
+
+def extraer_temporadas(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return mrdata.get('SeasonTable', {}).get('Seasons', [])
+
+
+def extraer_listas_clasificacion(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return mrdata.get('StandingsTable', {}).get('StandingsLists', [])
+
+
+def extraer_clasificacion_pilotos(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [fila for lista in extraer_listas_clasificacion(mrdata) for fila in lista.get('DriverStandings', [])]
+
+
+def extraer_clasificacion_constructores(mrdata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [fila for lista in extraer_listas_clasificacion(mrdata)
+            for fila in lista.get('ConstructorStandings', [])]
+
+
+class ErrorErgast(Exception):
+    """
+    Error al consultar la API Ergast (timeout, error de red o código HTTP distinto de 200).
+    """
+
+    def __init__(self, mensaje: str, status: Optional[int] = None):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class PresupuestoAgotado(ErrorErgast):
+    """
+    La invocación en curso ya ha hecho todas las peticiones a la API que tenía permitidas.
+    """
+
+
+class CircuitoAbierto(ErrorErgast):
+    """
+    El disyuntor está abierto: la API no responde y la petición se rechaza sin enviarla.
+    """
+
+
+def api_no_responde(error: ErrorErgast) -> bool:
+    """
+    Indica si un error se debe a que la API no está disponible (y no, p. ej., a que
+    el dato no existe), que es cuando tiene sentido servir datos caducados.
+    """
+    if isinstance(error, PresupuestoAgotado):
+        return False
+    return error.status is None or error.status >= 500 or error.status == 429
+
+
+class RespuestaCondicional(NamedTuple):
+    modificada: bool             # False si la API contestó 304 (sin cambios)
+    datos: Optional[Dict[str, Any]]
+    texto: Optional[str]         # JSON original, para calcular su huella
+    etag: Optional[str]
+    modificado: Optional[str]    # Cabecera Last-Modified
+
+
+presupuestos_agotados = REGISTRO.contador(
+    'f1bot_ergast_presupuesto_agotado_total', 'Peticiones rechazadas por agotar el presupuesto de la invocación')
+
+
+class Presupuesto:
+    """
+    Número máximo de descargas nuevas que puede provocar una invocación de comando.
+
+    Las respuestas servidas desde la caché o agrupadas con una descarga ya en
+    curso no gastan presupuesto: sólo las peticiones que salen de verdad a la red.
+    """
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self.usadas = 0
+
+    def consumir(self, ruta: str) -> None:
+        if self.usadas >= self.maximo:
+            presupuestos_agotados.inc()
+            raise PresupuestoAgotado(f"Presupuesto de {self.maximo} peticiones agotado antes de consultar {ruta}")
+        self.usadas += 1
+
+
+_presupuesto: contextvars.ContextVar[Optional[Presupuesto]] = contextvars.ContextVar('presupuesto', default=None)
+
+
+def fijar_presupuesto(maximo: Optional[int]) -> Optional[Presupuesto]:
+    """
+    Limita las descargas que puede provocar el contexto actual (y las tareas que lance).
+
+    Args:
+        maximo (int): Descargas permitidas; None o un valor negativo quitan el límite
+
+    Returns:
+        Presupuesto: El presupuesto fijado, o None si no hay límite
+    """
+    presupuesto = Presupuesto(maximo) if maximo is not None and maximo >= 0 else None
+    _presupuesto.set(presupuesto)
+    return presupuesto
+
+
+def presupuesto_actual() -> Optional[Presupuesto]:
+    return _presupuesto.get()
+
+
+respuestas_caducadas = REGISTRO.contador(
+    'f1bot_ergast_respuestas_caducadas_total', 'Consultas servidas con datos caducados porque la API no responde')
+revalidaciones = REGISTRO.contador(
+    'f1bot_ergast_revalidaciones_total', 'Datos caducados que se han vuelto a pedir a la API', ('resultado',))
+
+# Rutas servidas con datos caducados en el contexto actual (p. ej. en un comando)
+_caducadas: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar('caducadas', default=None)
+
+
+def vigilar_caducadas() -> Set[str]:
+    """
+    Empieza a anotar las consultas que el contexto actual (y las tareas que lance)
+    recibe con datos caducados, para avisar de ello en la respuesta.
+
+    Returns:
+        set: Rutas servidas con datos caducados (se va llenando)
+    """
+    rutas: Set[str] = set()
+    _caducadas.set(rutas)
+    return rutas
+
+
+def datos_caducados() -> bool:
+    """
+    Indica si el contexto actual ha recibido datos caducados desde `vigilar_caducadas`.
+    """
+    return bool(_caducadas.get())
+
+
+@contextlib.contextmanager
+def _anotando_caducadas() -> Iterator[Set[str]]:
+    """
+    Anota aparte las rutas caducadas de un bloque (y las suma después a las del contexto).
+    """
+    exterior = _caducadas.get()
+    propias: Set[str] = set()
+    token = _caducadas.set(propias)
+    try:
+        yield propias
+    finally:
+        _caducadas.reset(token)
+        if exterior is not None:
+            exterior.update(propias)
+
+
+class ClienteErgast:
+    """
+    Cliente asíncrono de la API Ergast con una sesión HTTP compartida.
+
+    La sesión se abre con `iniciar()` (desde el setup_hook del bot) y se cierra
+    con `cerrar()` al apagar el bot. Si se usa sin iniciar, la sesión se crea
+    automáticamente en la primera petición.
+
+    Si se le pasa una caché, todas las respuestas pasan por ella antes de ir a la red.
+    Si se le pasa un snapshot (ver snapshot.py), las consultas específicas se
+    responden primero desde la copia local.
+
+    Las peticiones simultáneas a la misma ruta comparten una única descarga, y
+    si se le pasa un limitador, cada descarga espera su turno antes de salir.
+    Dentro de un comando con presupuesto (ver `fijar_presupuesto`), cada descarga
+    nueva gasta una unidad y, agotado, se lanza `PresupuestoAgotado`.
+
+    Si se le pasa un disyuntor, tras varios fallos seguidos las peticiones se
+    rechazan al momento (`CircuitoAbierto`). Mientras la API no responde, las
+    consultas que tienen datos en la caché, aunque hayan caducado, se sirven con
+    ellos (ver `vigilar_caducadas`) y se vuelven a pedir en segundo plano cuando
+    la API se recupera.
+    """
+
+    def __init__(self, url_base: str = URL_BASE, timeout: float = TIMEOUT_POR_DEFECTO,
+                 max_conexiones: int = MAX_CONEXIONES, cache: Optional[CacheErgast] = None,
+                 snapshot: Any = None, limitador: Optional[LimitadorPeticiones] = None,
+                 disyuntor: Optional[Disyuntor] = None):
+        self.url_base = url_base.rstrip('/')
+        self.timeout = timeout
+        self.max_conexiones = max_conexiones
+        self.cache = cache
+        self.snapshot = snapshot
+        self.limitador = limitador
+        self.disyuntor = disyuntor
+        self._sesion: Optional[aiohttp.ClientSession] = None
+        # Descargas en curso por ruta, para agrupar peticiones idénticas simultáneas
+        self._en_curso: Dict[str, asyncio.Future] = {}
+        # Consultas servidas con datos caducados, con la función que las vuelve a pedir
+        self._revalidaciones: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._tarea_revalidar: Optional[asyncio.Task] = None
+        self.peticiones = 0
+        self.coalescidas = 0
+
+    async def iniciar(self) -> None:
+        """
+        Abre la sesión HTTP con su pool de conexiones, si no está abierta ya.
+        """
+        if self._sesion is None or self._sesion.closed:
+            conector = aiohttp.TCPConnector(limit=self.max_conexiones)
+            self._sesion = aiohttp.ClientSession(
+                connector=conector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+    async def cerrar(self) -> None:
+        """
+        Cierra la sesión HTTP y libera las conexiones del pool.
+        """
+        # Cancelar las descargas pendientes para que no vuelvan a abrir la sesión
+        for descarga in list(self._en_curso.values()):
+            descarga.cancel()
+        if self._tarea_revalidar is not None:
+            self._tarea_revalidar.cancel()
+        if self._sesion is not None and not self._sesion.closed:
+            await self._sesion.close()
+        self._sesion = None
+        if self.cache is not None:
+            self.cache.cerrar()
+        if self.snapshot is not None:
+            self.snapshot.cerrar()
+
+    async def obtener_json(self, ruta: str, timeout: Optional[float] = None, memoria: bool = True) -> Dict[str, Any]:
+        """
+        Realiza una petición GET a la API (o la sirve desde la caché) y devuelve el JSON decodificado.
+
+        Args:
+            ruta (str): Ruta relativa a la URL base (p. ej. "2023/races")
+            timeout (float, opcional): Timeout específico para esta petición
+            memoria (bool): Si es False, la respuesta en bruto no se guarda en la caché en
+                memoria (sólo en disco), porque el llamador guardará los registros ya convertidos
+
+        Returns:
+            dict: Respuesta JSON de la API
+
+        Raises:
+            ErrorErgast: Si la petición falla, expira o no devuelve un 200 (y no hay datos caducados)
+            PresupuestoAgotado: Si hay que descargarla y la invocación ya gastó su presupuesto
+        """
+        ruta = ruta.strip('/')
+        if self.cache is not None:
+            datos = await self.cache.obtener(ruta, memoria=memoria)
+            if datos is not None:
+                return datos
+
+        # Si ya hay una descarga en curso de la misma ruta, esperar a su resultado
+        descarga = self._en_curso.get(ruta)
+        if descarga is not None:
+            self.coalescidas += 1
+        else:
+            presupuesto = _presupuesto.get()
+            if presupuesto is not None:
+                presupuesto.consumir(ruta)
+            descarga = asyncio.ensure_future(self._descargar(ruta, timeout, memoria))
+            self._en_curso[ruta] = descarga
+            descarga.add_done_callback(lambda d: self._descarga_terminada(ruta, d))
+        try:
+            # shield: si un llamador se cancela, la descarga sigue para los demás
+            return await asyncio.shield(descarga)
+        except ErrorErgast as e:
+            if self.cache is None or not api_no_responde(e):
+                raise
+            datos = await self.cache.obtener(ruta, memoria=memoria, caducada=True)
+            if datos is None:
+                raise
+            self._servir_caducada(ruta, functools.partial(self.obtener_json, ruta, timeout, memoria))
+            return datos
+
+    def _descarga_terminada(self, ruta: str, descarga: asyncio.Future) -> None:
+        if self._en_curso.get(ruta) is descarga:
+            del self._en_curso[ruta]
+        if not descarga.cancelled():
+            descarga.exception()  # Marcar el error como recogido aunque nadie espere ya
+
+    async def _descargar(self, ruta: str, timeout: Optional[float], memoria: bool) -> Dict[str, Any]:
+        """
+        Descarga una ruta de la API respetando el limitador y guarda la respuesta en la caché.
+        """
+        _, texto, _ = await self._peticion(ruta, timeout)
+        datos = self._decodificar(ruta, texto)
+        if self.cache is not None:
+            await self.cache.guardar(ruta, datos, texto, memoria=memoria)
+        return datos
+
+    async def _peticion(self, ruta: str, timeout: Optional[float] = None,
+                        cabeceras: Optional[Dict[str, str]] = None) -> Tuple[int, str, Mapping[str, str]]:
+        """
+        Hace una petición GET respetando el limitador y la registra en las métricas.
+
+        Args:
+            ruta (str): Ruta relativa a la URL base
+            timeout (float, opcional): Timeout específico para esta petición
+            cabeceras (dict, opcional): Cabeceras de una petición condicional; con ellas se acepta un 304
+
+        Returns:
+            tuple: (código, texto, cabeceras de la respuesta); el texto está vacío en un 304
+
+        Raises:
+            ErrorErgast: Si la petición falla, expira o no devuelve un 200 (o un 304 si es condicional)
+            CircuitoAbierto: Si el disyuntor está abierto (la petición no llega a enviarse)
+        """
+        prueba = False
+        if self.disyuntor is not None:
+            if not self.disyuntor.permitir():
+                raise CircuitoAbierto(f"La API no responde: consulta de {ruta} rechazada sin enviarla")
+            prueba = self.disyuntor.estado == SEMIABIERTO
+        # None mientras no se sepa si la API ha respondido (p. ej. si se cancela esperando turno)
+        caida: Optional[bool] = None
+        try:
+            if self.limitador is not None:
+                await self.limitador.adquirir()
+            await self.iniciar()
+            self.peticiones += 1
+            url = f'{self.url_base}/{ruta}'
+            limite = aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+            endpoint, estado = endpoint_de_ruta(ruta), 'error'
+            inicio = time.perf_counter()
+            try:
+                async with self._sesion.get(url, timeout=limite, headers=cabeceras) as respuesta:
+                    estado = str(respuesta.status)
+                    caida = respuesta.status >= 500 or respuesta.status == 429
+                    if respuesta.status == 304 and cabeceras:
+                        return respuesta.status, '', respuesta.headers
+                    if respuesta.status != 200:
+                        raise ErrorErgast(f"Código {respuesta.status} al consultar {url}", respuesta.status)
+                    return respuesta.status, await respuesta.text(), respuesta.headers
+            except asyncio.TimeoutError as e:
+                estado, caida = 'timeout', True
+                raise ErrorErgast(f"Tiempo de espera agotado al consultar {url}") from e
+            except aiohttp.ClientError as e:
+                caida = True
+                raise ErrorErgast(f"Error de red al consultar {url}: {e}") from e
+            finally:
+                peticiones_ergast.inc(endpoint=endpoint, status=estado)
+                latencia_ergast.observar(time.perf_counter() - inicio, endpoint=endpoint)
+        finally:
+            if self.disyuntor is not None:
+                self.disyuntor.registrar(caida, prueba)
+
+    def _decodificar(self, ruta: str, texto: str) -> Dict[str, Any]:
+        try:
+            with fase('parse'):
+                return json.loads(texto)
+        except ValueError as e:
+            raise ErrorErgast(f"Respuesta no válida de {self.url_base}/{ruta}: {e}") from e
+
+    async def obtener_condicional(self, ruta: str, etag: Optional[str] = None,
+                                  modificado: Optional[str] = None) -> RespuestaCondicional:
+        """
+        Descarga una ruta con una petición condicional, sin pasar por la caché ni
+        agruparla con otras (es para sondeos que quieren ver el dato más reciente).
+
+        Con el ETag o la fecha Last-Modified de la respuesta anterior, la API
+        contesta 304 si no ha cambiado y no se vuelve a transferir el contenido.
+
+        Args:
+            ruta (str): Ruta relativa a la URL base
+            etag (str, opcional): ETag de la respuesta anterior
+            modificado (str, opcional): Last-Modified de la respuesta anterior
+
+        Returns:
+            RespuestaCondicional: La respuesta, o sin datos si no ha cambiado
+
+        Raises:
+            ErrorErgast: Si la petición falla, expira o no devuelve un 200 ni un 304
+        """
+        ruta = ruta.strip('/')
+        cabeceras = {}
+        if etag:
+            cabeceras['If-None-Match'] = etag
+        if modificado:
+            cabeceras['If-Modified-Since'] = modificado
+        estado, texto, respuesta = await self._peticion(ruta, cabeceras=cabeceras)
+        if estado == 304:
+            return RespuestaCondicional(False, None, None, etag, modificado)
+        return RespuestaCondicional(True, self._decodificar(ruta, texto), texto,
+                                    respuesta.get('ETag'), respuesta.get('Last-Modified'))
+
+    ###########################################################################
+    # Datos caducados mientras la API no responde
+    ###########################################################################
+
+    def _servir_caducada(self, clave: str, recargar: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Anota que una consulta se ha servido con datos caducados y programa su revalidación.
+
+        Args:
+            clave (str): Ruta o clave de la caché servida caducada
+            recargar (callable): Vuelve a hacer la consulta (sin argumentos)
+        """
+        respuestas_caducadas.inc()
+        rutas = _caducadas.get()
+        if rutas is not None:
+            rutas.add(clave)
+        if clave not in self._revalidaciones:
+            logging.warning(f"La API no responde: se sirven datos caducados de {clave}")
+            self._revalidaciones[clave] = recargar
+        if self._tarea_revalidar is None or self._tarea_revalidar.done():
+            self._tarea_revalidar = asyncio.ensure_future(self._revalidar())
+
+    def _caducada_en_memoria(self, clave: str, error: ErrorErgast,
+                             recargar: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Busca en memoria los registros caducados de una consulta que ha fallado porque la API no responde.
+
+        Returns:
+            Los registros (que se sirven como caducados), o None si no hay o el error es de otro tipo
+        """
+        if self.cache is None or not api_no_responde(error):
+            return None
+        datos = self.cache.obtener_memoria(clave, caducada=True)
+        if datos is not None:
+            self._servir_caducada(clave, recargar)
+        return datos
+
+    @property
+    def revalidaciones_pendientes(self) -> int:
+        return len(self._revalidaciones)
+
+    async def _revalidar(self) -> None:
+        """
+        Vuelve a pedir, una a una, las consultas servidas con datos caducados en cuanto
+        el disyuntor deja pasar peticiones. La primera hace de petición de prueba.
+        """
+        # Las peticiones son de la revalidación, no del comando que la lanzó
+        fijar_presupuesto(None)
+        while self._revalidaciones:
+            if self.disyuntor is not None:
+                await asyncio.sleep(self.disyuntor.espera_restante())
+            clave, recargar = next(iter(self._revalidaciones.items()))
+            try:
+                with _anotando_caducadas() as caducadas:
+                    await recargar()
+            except ErrorErgast as e:
+                if not api_no_responde(e):
+                    # El dato ya no existe o no se puede pedir: no hay nada que revalidar
+                    revalidaciones.inc(resultado='descartada')
+                    self._revalidaciones.pop(clave, None)
+                    continue
+                caducadas = {clave}
+            if caducadas:
+                # Sigue sin responder: se reintenta cuando el disyuntor lo permita (y no antes de unos segundos)
+                revalidaciones.inc(resultado='error')
+                espera = self.disyuntor.espera_restante() if self.disyuntor is not None else 0.0
+                await asyncio.sleep(max(ESPERA_REVALIDACION, espera))
+                continue
+            revalidaciones.inc(resultado='ok')
+            self._revalidaciones.pop(clave, None)
+            if not self._revalidaciones:
+                logging.info("Datos caducados revalidados: la API vuelve a responder")
+
+    async def paginar(self, ruta: str, extraer: Callable[[Dict[str, Any]], List[Any]],
+                      tamaño_pagina: int = LIMITE_PAGINA, memoria: bool = True) -> AsyncIterator[Any]:
+        """
+        Recorre todas las páginas de una consulta y va entregando sus registros en orden.
+
+        Lee `total` y `limit` de la primera página y pide las siguientes de forma
+        concurrente (como mucho MAX_PAGINAS_EN_VUELO por delante de la que se está
+        consumiendo), de modo que nunca se acumulan todas las páginas en memoria.
+
+        Args:
+            ruta (str): Ruta relativa, con o sin parámetros de consulta
+            extraer (callable): Función que recibe el contenido de MRData y devuelve sus registros
+            tamaño_pagina (int): Registros por página a solicitar
+            memoria (bool): Si las páginas en bruto se guardan en la caché en memoria
+
+        Yields:
+            Cada registro devuelto por `extraer`, página a página
+        """
+        separador = '&' if '?' in ruta else '?'
+
+        def pedir_pagina(offset: int) -> asyncio.Future:
+            return asyncio.ensure_future(
+                self.obtener_json(f'{ruta}{separador}limit={tamaño_pagina}&offset={offset}', memoria=memoria))
+
+        mrdata = (await self.obtener_json(f'{ruta}{separador}limit={tamaño_pagina}&offset=0',
+                                          memoria=memoria)).get('MRData', {})
+        total = int(mrdata.get('total', 0))
+        # La API puede servir menos registros por página de los pedidos
+        paso = int(mrdata.get('limit', tamaño_pagina)) or tamaño_pagina
+        offsets = iter(range(paso, total, paso))
+        en_vuelo = deque()
+        try:
+            for offset in offsets:
+                en_vuelo.append(pedir_pagina(offset))
+                if len(en_vuelo) >= MAX_PAGINAS_EN_VUELO:
+                    break
+            for registro in extraer(mrdata):
+                yield registro
+            while en_vuelo:
+                mrdata = (await en_vuelo.popleft()).get('MRData', {})
+                siguiente = next(offsets, None)
+                if siguiente is not None:
+                    en_vuelo.append(pedir_pagina(siguiente))
+                for registro in extraer(mrdata):
+                    yield registro
+        finally:
+            # Si el llamador deja de iterar, no seguir pidiendo páginas
+            for pendiente in en_vuelo:
+                pendiente.cancel()
+
+    async def listar(self, ruta: str, extraer: Callable[[Dict[str, Any]], List[Any]]) -> List[Any]:
+        """
+        Devuelve en una lista todos los registros de una consulta paginada.
+        """
+        return [registro async for registro in self.paginar(ruta, extraer)]
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores del cliente.
+
+        Returns:
+            dict: Peticiones enviadas, peticiones agrupadas con otra en curso y peticiones en cola
+        """
+        return {
+            'peticiones': self.peticiones,
+            'coalescidas': self.coalescidas,
+            'en_curso': len(self._en_curso),
+            'en_cola': self.limitador.en_cola if self.limitador is not None else 0,
+        }
+
+    def _desde_snapshot(self, consulta: str, *args: Any) -> Any:
+        """
+        Intenta responder una consulta desde el snapshot local.
+
+        Returns:
+            Los datos de la copia local, o None si no la cubre
+        """
+        if self.snapshot is None:
+            return None
+        return getattr(self.snapshot, consulta)(*args)
+
+    async def _registros(self, ruta: str, extraer: Callable[[Dict[str, Any]], List[Any]],
+                         convertir: Callable[[Dict[str, Any]], Any]) -> List[Any]:
+        """
+        Descarga todas las páginas de una consulta y convierte cada registro a su modelo.
+
+        En la caché en memoria sólo se guardan los registros convertidos; las páginas
+        en bruto van únicamente al almacén en disco, si lo hay.
+        """
+        clave = f'{ruta}#registros'
+        if self.cache is not None:
+            registros = self.cache.obtener_memoria(clave)
+            if registros is not None:
+                return registros
+        try:
+            with _anotando_caducadas() as caducadas:
+                crudos = [r async for r in self.paginar(ruta, extraer, memoria=False)]
+        except ErrorErgast as e:
+            registros = self._caducada_en_memoria(clave, e, functools.partial(self._registros, ruta, extraer,
+                                                                               convertir))
+            if registros is None:
+                raise
+            return registros
+        with fase('parse'):
+            registros = [convertir(r) for r in crudos]
+        if self.cache is not None:
+            # Con páginas caducadas, los registros se guardan ya caducados
+            self.cache.guardar_memoria(clave, registros, tamaño_aproximado(registros), caducada=bool(caducadas))
+        return registros
+
+    ###########################################################################
+    # Consultas específicas
+    ###########################################################################
+
+    async def circuitos(self, año: str) -> List[Circuito]:
+        """
+        Devuelve los circuitos utilizados en una temporada.
+
+        Args:
+            año (str): Año de la temporada
+
+        Returns:
+            list: Lista de circuitos (vacía si no hay datos)
+        """
+        local = self._desde_snapshot('circuitos', año)
+        if local is not None:
+            return [Circuito.desde_api(c) for c in local]
+        return await self._registros(f'{año}/circuits', extraer_circuitos, Circuito.desde_api)
+
+    async def todos_los_circuitos(self) -> List[Circuito]:
+        """
+        Devuelve todos los circuitos de la historia de la F1.
+
+        Returns:
+            list: Lista de circuitos (vacía si no hay datos)
+        """
+        local = self._desde_snapshot('todos_los_circuitos')
+        if local is not None:
+            return [Circuito.desde_api(c) for c in local]
+        return await self._registros('circuits', extraer_circuitos, Circuito.desde_api)
+
+    async def todos_los_pilotos(self) -> List[Piloto]:
+        """
+        Devuelve todos los pilotos de la historia de la F1.
+
+        Returns:
+            list: Lista de pilotos (vacía si no hay datos)
+        """
+        local = self._desde_snapshot('todos_los_pilotos')
+        if local is not None:
+            return [Piloto.desde_api(p) for p in local]
+        return await self._registros('drivers', extraer_pilotos, Piloto.desde_api)
+
+    async def carreras(self, año: str) -> List[Carrera]:
+        """
+        Devuelve el calendario de carreras de una temporada.
+
+        Args:
+            año (str): Año de la temporada o "current"
+
+        Returns:
+            list: Lista de carreras (vacía si no hay datos)
+        """
+        local = self._desde_snapshot('carreras', año)
+        if local is not None:
+            return [Carrera.desde_api(c) for c in local]
+        carreras = await self._registros(f'{año}/races', extraer_carreras, Carrera.desde_api)
+        if self.cache is not None and temporada_de_ruta(str(año)) == temporada_actual():
+            # Con el calendario en curso, la caché sabe cuándo invalidar la temporada
+            self.cache.registrar_calendario(carreras)
+        return carreras
+
+    async def resultados(self, año: str, circuito_id: str) -> Optional[List[Resultado]]:
+        """
+        Devuelve los resultados de la carrera disputada en un circuito y año.
+
+        Args:
+            año (str): Año de la temporada
+            circuito_id (str): ID del circuito
+
+        Returns:
+            list: Resultados de la carrera, None si no se celebró
+        """
+        local = self._desde_snapshot('resultados', año, circuito_id)
+        if local is not None:
+            return [Resultado.desde_api(r) for r in local]
+
+        ruta = f'{año}/circuits/{circuito_id}/results'
+        clave = f'{ruta}#registros'
+        if self.cache is not None:
+            resultados = self.cache.obtener_memoria(clave)
+            if resultados is not None:
+                return resultados or None
+
+        # Una carrera puede quedar repartida entre varias páginas; si en el circuito
+        # hubo dos carreras ese año, sólo se devuelve la primera
+        ronda, resultados = None, []
+        paginas = self.paginar(ruta, extraer_carreras, memoria=False)
+        try:
+            with _anotando_caducadas() as caducadas:
+                async for carrera in paginas:
+                    if ronda is None:
+                        ronda = carrera.get('round')
+                    elif carrera.get('round') != ronda:
+                        break
+                    with fase('parse'):
+                        resultados.extend(Resultado.desde_api(r) for r in carrera.get('Results', []))
+        except ErrorErgast as e:
+            resultados = self._caducada_en_memoria(clave, e, functools.partial(self.resultados, año, circuito_id))
+            if resultados is None:
+                raise
+            return resultados or None
+        finally:
+            await paginas.aclose()
+        if self.cache is not None:
+            self.cache.guardar_memoria(clave, resultados, tamaño_aproximado(resultados), caducada=bool(caducadas))
+        return resultados or None
+
+    async def resultados_temporada(self, año: str) -> List[ResultadosCarrera]:
+        """
+        Devuelve los resultados de todas las carreras de una temporada.
+
+        Mientras la respuesta siga en la caché en memoria se devuelve la misma
+        lista, de modo que quien la procese puede reconocerla y no repetir el trabajo.
+
+        Args:
+            año (str): Año de la temporada o "current"
+
+        Returns:
+            list: Resultados de cada carrera, por ronda (vacía si no hay datos)
+        """
+        return await self._resultados_por_carrera(año, 'results', 'Results', 'resultados_temporada')
+
+    async def sprints_temporada(self, año: str) -> List[ResultadosCarrera]:
+        """
+        Devuelve los resultados de todas las carreras sprint de una temporada.
+
+        Args:
+            año (str): Año de la temporada o "current"
+
+        Returns:
+            list: Resultados de cada sprint, por ronda (vacía si no hubo sprints)
+        """
+        return await self._resultados_por_carrera(año, 'sprint', 'SprintResults', 'sprints_temporada')
+
+    async def _resultados_por_carrera(self, año: str, endpoint: str, clave_resultados: str,
+                                      consulta_snapshot: str) -> List[ResultadosCarrera]:
+        local = self._desde_snapshot(consulta_snapshot, año)
+        if local is not None:
+            return [ResultadosCarrera.desde_api(c, clave_resultados) for c in local]
+
+        ruta = f'{año}/{endpoint}'
+        clave = f'{ruta}#temporada'
+        if self.cache is not None:
+            carreras = self.cache.obtener_memoria(clave)
+            if carreras is not None:
+                return carreras
+
+        carreras: List[ResultadosCarrera] = []
+        try:
+            with _anotando_caducadas() as caducadas:
+                async for datos in self.paginar(ruta, extraer_carreras, memoria=False):
+                    with fase('parse'):
+                        parte = ResultadosCarrera.desde_api(datos, clave_resultados)
+                    # Una carrera puede quedar repartida entre dos páginas
+                    if carreras and carreras[-1].carrera.ronda == parte.carrera.ronda:
+                        carreras[-1] = carreras[-1]._replace(resultados=carreras[-1].resultados + parte.resultados)
+                    else:
+                        carreras.append(parte)
+        except ErrorErgast as e:
+            caducada = self._caducada_en_memoria(clave, e, functools.partial(
+                self._resultados_por_carrera, año, endpoint, clave_resultados, consulta_snapshot))
+            if caducada is None:
+                raise
+            return caducada
+        if self.cache is not None:
+            tamaño = tamaño_aproximado(carreras) + sum(tamaño_aproximado(list(c.resultados)) for c in carreras)
+            self.cache.guardar_memoria(clave, carreras, tamaño, caducada=bool(caducadas))
+        return carreras
+
+    async def temporadas_piloto(self, piloto_id: str) -> List[int]:
+        """
+        Devuelve las temporadas en las que corrió un piloto.
+
+        Args:
+            piloto_id (str): ID del piloto en la API (p. ej. "alonso")
+
+        Returns:
+            list: Años de las temporadas, en orden (vacía si no existe)
+        """
+        local = self._desde_snapshot('temporadas_piloto', piloto_id)
+        if local is not None:
+            return local
+        años = await self._registros(f'drivers/{piloto_id}/seasons', extraer_temporadas,
+                                     lambda temporada: int(temporada.get('season', 0)))
+        return sorted(años)
+
+    async def piloto(self, piloto_id: str) -> Optional[Piloto]:
+        """
+        Devuelve la información de un piloto.
+
+        Args:
+            piloto_id (str): ID del piloto en la API (p. ej. "alonso")
+
+        Returns:
+            Piloto: Datos del piloto, None si no existe
+        """
+        local = self._desde_snapshot('piloto', piloto_id)
+        if local is not None:
+            return Piloto.desde_api(local)
+        datos = await self.obtener_json(f'drivers/{piloto_id}')
+        pilotos = extraer_pilotos(datos.get('MRData', {}))
+        return Piloto.desde_api(pilotos[0]) if pilotos else None
+
+    async def clasificacion_pilotos(self, año: str, ronda: Optional[int] = None) -> List[ClasificacionPiloto]:
+        """
+        Devuelve la clasificación del mundial de pilotos.
+
+        Args:
+            año (str): Año de la temporada o "current"
+            ronda (int, opcional): Ronda tras la que se pide la clasificación (por defecto, la última)
+
+        Returns:
+            list: Clasificación de pilotos (vacía si no hay datos)
+        """
+        if ronda is None:
+            local = self._desde_snapshot('clasificacion_pilotos', año)
+            if local is not None:
+                return [ClasificacionPiloto.desde_api(c) for c in local]
+        prefijo = f'{año}/{ronda}' if ronda is not None else f'{año}'
+        return await self._registros(f'{prefijo}/driverStandings', extraer_clasificacion_pilotos,
+                                     ClasificacionPiloto.desde_api)
+
+    async def clasificacion_constructores(self, año: str,
+                                          ronda: Optional[int] = None) -> List[ClasificacionConstructor]:
+        """
+        Devuelve la clasificación del mundial de constructores.
+
+        Args:
+            año (str): Año de la temporada o "current"
+            ronda (int, opcional): Ronda tras la que se pide la clasificación (por defecto, la última)
+
+        Returns:
+            list: Clasificación de constructores (vacía si no hay datos)
+        """
+        if ronda is None:
+            local = self._desde_snapshot('clasificacion_constructores', año)
+            if local is not None:
+                return [ClasificacionConstructor.desde_api(c) for c in local]
+        prefijo = f'{año}/{ronda}' if ronda is not None else f'{año}'
+        return await self._registros(f'{prefijo}/constructorStandings', extraer_clasificacion_constructores,
+                                     ClasificacionConstructor.desde_api)
@@ -0,0 +1,10 @@
+###############################################################################
+# Paquete del bot de Discord para Fórmula 1
+#
+# - configuracion.py: opciones leídas de las variables de entorno
+# - servicios.py: cliente de la API, cachés, índices y cola de salida
+#   compartidos por todos los comandos
+# - bot.py: la clase del bot, sus hooks y el arranque por fases
+# - cogs/: los comandos, agrupados en extensiones de discord.py que se
+#   cargan al preparar el bot (no al importar el paquete)
+###############################################################################
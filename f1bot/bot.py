@@ -0,0 +1,158 @@
+###############################################################################
+# Clase del bot: arranque por fases y hooks comunes a todos los comandos
+#
+# El arranque se reparte para que el bot conteste cuanto antes:
+# 1. Al crear el bot sólo se leen las opciones y se crean los servicios.
+# 2. En `setup_hook` (antes del login) se abre la sesión de la API y se
+#    cargan las extensiones con los comandos.
+# 3. Tras `on_ready`, en segundo plano, se cargan los índices, se precarga
+#    la temporada en curso y se sincronizan los comandos de barra.
+# Se registra cuánto tarda cada fase y el primer comando respondido.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para tareas en segundo plano
+import logging               # Para registro de eventos y errores
+from typing import Optional
+
+import discord               # Biblioteca principal para interactuar con Discord
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from enfriamiento import RespuestaCompartida  # Consulta contestada con un enlace a otra respuesta
+from ergast import fijar_presupuesto, vigilar_caducadas  # Presupuesto de peticiones y datos caducados de cada comando
+from metricas import Arranque, iniciar_invocacion, terminar_invocacion  # Métricas y trazas
+from salida import PRIORIDAD_AVISO  # Prioridad de los avisos en la cola de salida
+
+from f1bot.cogs import EXTENSIONES
+from f1bot.configuracion import Configuracion
+from f1bot.servicios import Servicios
+
+
+class FormulaBot(commands.AutoShardedBot):
+    """
+    Bot de F1 con sus servicios compartidos.
+
+    Usa shards automáticamente: sin F1_SHARD_IDS/F1_SHARD_COUNT, Discord decide cuántos
+    hacen falta; con ellas, el proceso sólo atiende los shards indicados.
+
+    Args:
+        config (Configuracion): Opciones del bot
+        arranque (Arranque, opcional): Medición del arranque iniciada al empezar el proceso
+    """
+
+    def __init__(self, config: Configuracion, arranque: Optional[Arranque] = None):
+        # Configuración de los permisos (intents) del bot
+        intents = discord.Intents.default()
+        intents.message_content = True  # Habilitar acceso al contenido de mensajes
+        super().__init__(command_prefix='!', intents=intents,
+                         shard_ids=config.shard_ids, shard_count=config.shard_count)
+        self.config = config
+        self.arranque = arranque or Arranque()
+        self.servicios = Servicios(config)
+        self.tarea_calentamiento: Optional[asyncio.Task] = None
+        self.tarea_sincronizar: Optional[asyncio.Task] = None
+        self.check_once(self.limitar_comandos)
+        self.before_invoke(self.antes_de_comando)
+        self.after_invoke(self.despues_de_comando)
+
+    async def cargar_extensiones(self) -> None:
+        """
+        Carga las extensiones con los comandos (importa sus módulos en ese momento).
+        """
+        for extension in EXTENSIONES:
+            if extension not in self.extensions:
+                await self.load_extension(extension)
+
+    async def setup_hook(self):
+        await self.servicios.iniciar()
+        await self.cargar_extensiones()
+        logging.info(f"Bot preparado a los {self.arranque.marcar('preparado'):.2f} s del arranque")
+
+    async def on_ready(self):
+        """
+        Evento que se ejecuta cuando el bot está listo y conectado.
+        """
+        logging.info(f'Bot conectado como {self.user}')
+        # on_ready se repite en cada reconexión; el calentamiento sólo se lanza una vez
+        if self.tarea_calentamiento is not None:
+            return
+        self.arranque.marcar('conectado')
+        logging.info(f"Arranque: {self.arranque.resumen()}")
+        self.tarea_calentamiento = asyncio.create_task(self.calentar())
+        # Registrar los comandos de barra en Discord (una vez por despliegue, desde el primer proceso)
+        if self.config.proceso == 0 and self.config.sincronizar_barra:
+            self.tarea_sincronizar = asyncio.create_task(self.sincronizar_comandos_barra())
+
+    async def calentar(self) -> None:
+        await self.servicios.calentar()
+        logging.info(f"Cachés e índices listos a los {self.arranque.marcar('calentado'):.2f} s del arranque")
+
+    async def sincronizar_comandos_barra(self) -> None:
+        """
+        Registra en Discord los comandos de barra (/) del bot.
+        """
+        try:
+            comandos = await self.tree.sync()
+            logging.info(f"{len(comandos)} comandos de barra sincronizados")
+        except discord.HTTPException as e:
+            logging.error(f"No se pudieron sincronizar los comandos de barra: {e}")
+
+    async def close(self):
+        await self.servicios.detener()
+        await super().close()
+
+    ###########################################################################
+    # Hooks de los comandos
+    ###########################################################################
+
+    async def limitar_comandos(self, ctx) -> bool:
+        """
+        Aplica los enfriamientos y, si la misma consulta se acaba de responder en el
+        canal, contesta con un enlace a esa respuesta en lugar de calcularla otra vez.
+        """
+        servicios = self.servicios
+        servicios.enfriamientos.comprobar(ctx)
+        mensaje = await servicios.respuestas_compartidas.buscar(ctx)
+        if mensaje is not None:
+            await servicios.respuestas_compartidas.contestar(ctx, mensaje, enviar=servicios.salida.enviar)
+            raise RespuestaCompartida()
+        return True
+
+    async def antes_de_comando(self, ctx) -> None:
+        """
+        Empieza a medir el comando, le asigna un identificador de traza, fija
+        cuántas peticiones nuevas a la API puede hacer y empieza a anotar si
+        recibe datos caducados.
+        """
+        iniciar_invocacion(ctx.command.name)
+        fijar_presupuesto(self.config.presupuesto_comando)
+        vigilar_caducadas()
+        if self.servicios.vigilante_bucle is not None:
+            self.servicios.vigilante_bucle.registrar_comando(ctx.message.content)
+
+    async def despues_de_comando(self, ctx) -> None:
+        """
+        Registra la duración del comando y de cada una de sus fases.
+        """
+        terminar_invocacion(error=ctx.command_failed)
+        self.servicios.respuestas_compartidas.terminar(error=ctx.command_failed)
+        if self.servicios.vigilante_bucle is not None:
+            self.servicios.vigilante_bucle.olvidar_comando()
+        if not ctx.command_failed:
+            self.arranque.primer_comando(ctx.command.name)
+
+    async def on_command_error(self, ctx, error):
+        """
+        Avisa de los enfriamientos; el resto de errores se registran como siempre.
+        """
+        # Si falló antes de ejecutarse (p. ej. faltan argumentos), las consultas iguales dejan de esperarla
+        self.servicios.respuestas_compartidas.terminar(error=True)
+        if isinstance(error, RespuestaCompartida):
+            return
+        if isinstance(error, commands.CommandOnCooldown):
+            await self.servicios.salida.enviar(
+                ctx, f"⏳ Demasiados comandos seguidos: vuelve a intentarlo en {error.retry_after:.1f} s.",
+                prioridad=PRIORIDAD_AVISO, ephemeral=True)
+            return
+        await super().on_command_error(ctx, error)
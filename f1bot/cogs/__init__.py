@@ -0,0 +1,17 @@
+###############################################################################
+# Extensiones con los comandos del bot
+#
+# Cada módulo es una extensión de discord.py con un cog y su función
+# `setup`. Se cargan desde `FormulaBot.setup_hook`, así que sus importaciones
+# (embeds, zonas horarias...) no retrasan la del paquete.
+###############################################################################
+
+# Extensiones que carga el bot, en orden
+EXTENSIONES = (
+    'f1bot.cogs.carreras',
+    'f1bot.cogs.campeonato',
+    'f1bot.cogs.estadisticas',
+    'f1bot.cogs.avisos',
+    'f1bot.cogs.gifs',
+    'f1bot.cogs.ayuda',
+)
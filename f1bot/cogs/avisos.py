@@ -0,0 +1,285 @@
+###############################################################################
+# Avisos: recordatorios antes de cada sesión y resultados en cuanto se publican
+###############################################################################
+
+import logging               # Para registro de eventos y errores
+from datetime import datetime # Para manejo de fechas y horas
+
+from discord import app_commands  # Comandos de barra (/) y autocompletado
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from agenda import avisos_enviados  # Métrica de avisos enviados
+from embeds import NOMBRES_SESION, construir_recordatorio, construir_resultados_en_vivo, formatear_hora  # Embeds de los avisos
+from salida import PRIORIDAD_AVISO, DestinoCanal, agrupar_embeds  # Envíos a canales sin comando
+from suscripciones import ANTELACION_MAXIMA, ANTELACION_MINIMA, zona_valida  # Preferencias de los canales
+
+from f1bot.cogs.comun import CogF1
+
+# Tipos de aviso a los que se puede suscribir un canal
+TIPOS = ('recordatorios', 'resultados', 'todos')
+
+
+class Avisos(CogF1):
+    """
+    Suscripción de los canales a los recordatorios de cada sesión y a los resultados.
+    """
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        self.servicios.agenda.escuchar(self.publicar_recordatorio)
+        self.servicios.en_vivo.escuchar(self.publicar_resultados)
+
+    def cog_unload(self):
+        self.servicios.agenda.dejar_de_escuchar(self.publicar_recordatorio)
+        self.servicios.en_vivo.dejar_de_escuchar(self.publicar_resultados)
+
+    ###########################################################################
+    # Publicaciones
+    ###########################################################################
+
+    def canales_propios(self, canales):
+        """
+        Devuelve los canales de la lista que ve este proceso. Los demás pueden ser de
+        servidores de otro proceso, así que no se borran de las suscripciones.
+        """
+        for canal_id in canales:
+            canal = self.bot.get_channel(canal_id)
+            if canal is not None:
+                yield canal
+
+    async def publicar_recordatorio(self, aviso, canales):
+        """
+        Encola un recordatorio en cada canal suscrito, renderizado una vez por zona horaria.
+        """
+        suscripciones = self.servicios.suscripciones
+        salida = self.servicios.salida
+        embeds = {}
+        enviados = 0
+        for canal in self.canales_propios(canales):
+            zona = suscripciones.zona(canal.id, canal.guild.id)
+            embed = embeds.get(zona)
+            if embed is None:
+                embed = embeds[zona] = construir_recordatorio(aviso, zona)
+            salida.encolar(DestinoCanal(canal), embed=embed, prioridad=PRIORIDAD_AVISO)
+            enviados += 1
+        avisos_enviados.inc(enviados, tipo='recordatorio')
+        sesion = aviso.sesion
+        logging.info(f"Recordatorio de {sesion.sesion} de {sesion.carrera.nombre} encolado en {enviados} canales")
+
+    async def publicar_resultados(self, cambio):
+        """
+        Encola la publicación de unos resultados nuevos en cada canal suscrito (sin esperar a que salgan).
+        """
+        salida = self.servicios.salida
+        grupos = agrupar_embeds(construir_resultados_en_vivo(cambio))
+        enviados = 0
+        for canal in self.canales_propios(list(self.servicios.suscripciones.con_resultados)):
+            destino = DestinoCanal(canal)
+            for grupo in grupos:
+                salida.encolar(destino, embeds=grupo, prioridad=PRIORIDAD_AVISO)
+            enviados += 1
+        avisos_enviados.inc(enviados, tipo='resultados')
+        logging.info(f"Resultados de {cambio.sesion} de {cambio.carrera.nombre} publicados en {enviados} canales")
+
+    # Un canal o un servidor que desaparecen dejan de estar suscritos
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, canal):
+        await self.servicios.suscripciones.borrar_canal(canal.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, servidor):
+        await self.servicios.suscripciones.borrar_servidor(servidor.id)
+
+    ###########################################################################
+    # Comandos
+    ###########################################################################
+
+    async def autocompletar_zona(self, interaction, actual):
+        """
+        Sugiere zonas horarias que contienen lo escrito.
+        """
+        # Se importa al usarla: las zonas horarias no retrasan la carga de la extensión
+        import pytz
+        actual = actual.strip().lower().replace(' ', '_')
+        return [app_commands.Choice(name=zona, value=zona)
+                for zona in pytz.common_timezones if actual in zona.lower()][:25]
+
+    async def comprobar_permiso(self, ctx, servidor=False):
+        """
+        Comprueba que el comando se usa en un servidor y que el autor puede gestionar
+        los canales (o el servidor, si el cambio es de todo el servidor).
+
+        Returns:
+            bool: True si puede hacer el cambio (si no, ya se ha respondido)
+        """
+        salida = self.servicios.salida
+        if ctx.guild is None:
+            await salida.enviar(ctx, "❌ Los avisos sólo se pueden configurar en los canales de un servidor.")
+            return False
+        permisos = ctx.channel.permissions_for(ctx.author)
+        if servidor and not permisos.manage_guild:
+            await salida.enviar(ctx, "❌ Hace falta el permiso de gestionar el servidor para cambiar su zona horaria.")
+            return False
+        if not servidor and not permisos.manage_channels:
+            await salida.enviar(ctx, "❌ Hace falta el permiso de gestionar canales para cambiar los avisos.")
+            return False
+        return True
+
+    def estado(self, ctx):
+        """
+        Describe los avisos del canal, su zona horaria y la próxima sesión.
+        """
+        servicios = self.servicios
+        servidor_id = ctx.guild.id if ctx.guild else None
+        suscripcion = servicios.suscripciones.de_canal(ctx.channel.id, servidor_id)
+        zona = servicios.suscripciones.zona(ctx.channel.id, servidor_id)
+        lineas = [
+            f"⏰ Recordatorios: {'sí' if suscripcion.recordatorios else 'no'}"
+            + (f" ({suscripcion.antelacion} minutos antes de cada sesión)" if suscripcion.recordatorios else ""),
+            f"🏁 Resultados: {'sí' if suscripcion.resultados else 'no'}",
+            f"🕒 Zona horaria: {zona}",
+        ]
+        if suscripcion.resultados and not servicios.config.en_vivo:
+            lineas.append("(Los resultados sólo se publican si el bot tiene activado el modo en directo.)")
+        sesion = servicios.agenda.proxima_sesion(datetime.utcnow())
+        if sesion is not None:
+            nombre = NOMBRES_SESION.get(sesion.sesion, sesion.sesion)
+            lineas.append(f"Próxima sesión: {nombre} de {sesion.carrera.nombre}, {formatear_hora(sesion.inicio, zona)}.")
+        return "\n".join(lineas)
+
+    # Grupo de comandos de los avisos; sin subcomando, muestra el estado del canal
+    @commands.hybrid_group(name='avisos', fallback='estado', invoke_without_command=True)
+    async def avisos(self, ctx):
+        """
+        Muestra los avisos a los que está suscrito el canal.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        await self.servicios.salida.enviar(ctx, self.estado(ctx))
+
+    async def cambiar_tipos(self, ctx, tipo, activar):
+        """
+        Activa o desactiva los recordatorios, los resultados o ambos en el canal.
+
+        Args:
+            ctx: Contexto del comando
+            tipo (str): "recordatorios", "resultados" o "todos"
+            activar (bool): True para activarlos
+        """
+        servicios = self.servicios
+        tipo = tipo.lower()
+        if tipo not in TIPOS:
+            await servicios.salida.enviar(ctx, f"❌ '{tipo}' no es un tipo de aviso válido. Usa {', '.join(TIPOS)}.")
+            return
+        if not await self.comprobar_permiso(ctx):
+            return
+
+        suscripcion = servicios.suscripciones.de_canal(ctx.channel.id, ctx.guild.id)
+        cambios = {}
+        if tipo in ('recordatorios', 'todos'):
+            cambios['recordatorios'] = activar
+        if tipo in ('resultados', 'todos'):
+            cambios['resultados'] = activar
+        suscripcion = suscripcion._replace(servidor_id=ctx.guild.id, **cambios)
+        await servicios.suscripciones.guardar(suscripcion)
+        if suscripcion.recordatorios:
+            servicios.agenda.nueva_antelacion(suscripcion.antelacion)
+        await servicios.salida.enviar(ctx, "✅ Avisos actualizados.\n" + self.estado(ctx))
+
+    @avisos.command(name='activar')
+    @app_commands.describe(tipo="recordatorios, resultados o todos (por defecto, todos)")
+    async def activar(self, ctx, tipo: str = 'todos'):
+        """
+        Suscribe el canal a los recordatorios de cada sesión y/o a los resultados.
+
+        Args:
+            ctx: Contexto del comando
+            tipo (str, opcional): "recordatorios", "resultados" o "todos"
+        """
+        await self.cambiar_tipos(ctx, tipo, True)
+
+    @avisos.command(name='desactivar')
+    @app_commands.describe(tipo="recordatorios, resultados o todos (por defecto, todos)")
+    async def desactivar(self, ctx, tipo: str = 'todos'):
+        """
+        Deja de enviar al canal los recordatorios y/o los resultados.
+
+        Args:
+            ctx: Contexto del comando
+            tipo (str, opcional): "recordatorios", "resultados" o "todos"
+        """
+        await self.cambiar_tipos(ctx, tipo, False)
+
+    @avisos.command(name='antelacion')
+    @app_commands.describe(minutos=f"Minutos antes de cada sesión ({ANTELACION_MINIMA}-{ANTELACION_MAXIMA})")
+    async def antelacion(self, ctx, minutos: int):
+        """
+        Cambia con cuántos minutos de antelación se envían los recordatorios al canal.
+
+        Args:
+            ctx: Contexto del comando
+            minutos (int): Minutos antes del inicio de cada sesión
+        """
+        servicios = self.servicios
+        if not ANTELACION_MINIMA <= minutos <= ANTELACION_MAXIMA:
+            await servicios.salida.enviar(
+                ctx, f"❌ La antelación debe estar entre {ANTELACION_MINIMA} y {ANTELACION_MAXIMA} minutos.")
+            return
+        if not await self.comprobar_permiso(ctx):
+            return
+
+        suscripcion = servicios.suscripciones.de_canal(ctx.channel.id, ctx.guild.id)
+        suscripcion = suscripcion._replace(servidor_id=ctx.guild.id, antelacion=minutos, recordatorios=True)
+        await servicios.suscripciones.guardar(suscripcion)
+        servicios.agenda.nueva_antelacion(minutos)
+        await servicios.salida.enviar(ctx, f"✅ Los recordatorios llegarán {minutos} minutos antes de cada sesión.")
+
+    @avisos.command(name='zona')
+    @app_commands.describe(zona="Zona horaria del canal (p. ej. America/Mexico_City)")
+    @app_commands.autocomplete(zona=autocompletar_zona)
+    async def zona(self, ctx, zona: str):
+        """
+        Cambia la zona horaria en la que se muestran las horas en el canal.
+
+        Args:
+            ctx: Contexto del comando
+            zona (str): Zona horaria IANA
+        """
+        servicios = self.servicios
+        nombre = zona_valida(zona)
+        if nombre is None:
+            await servicios.salida.enviar(ctx, f"❌ '{zona}' no es una zona horaria válida (p. ej. Europe/Madrid).")
+            return
+        if not await self.comprobar_permiso(ctx):
+            return
+
+        suscripcion = servicios.suscripciones.de_canal(ctx.channel.id, ctx.guild.id)
+        await servicios.suscripciones.guardar(suscripcion._replace(servidor_id=ctx.guild.id, zona=nombre))
+        await servicios.salida.enviar(ctx, f"✅ Las horas se mostrarán en este canal en la zona {nombre}.")
+
+    @avisos.command(name='zonaservidor')
+    @app_commands.describe(zona="Zona horaria por defecto de los canales del servidor")
+    @app_commands.autocomplete(zona=autocompletar_zona)
+    async def zona_servidor(self, ctx, zona: str):
+        """
+        Cambia la zona horaria por defecto de los canales del servidor que no han elegido otra.
+
+        Args:
+            ctx: Contexto del comando
+            zona (str): Zona horaria IANA
+        """
+        servicios = self.servicios
+        nombre = zona_valida(zona)
+        if nombre is None:
+            await servicios.salida.enviar(ctx, f"❌ '{zona}' no es una zona horaria válida (p. ej. Europe/Madrid).")
+            return
+        if not await self.comprobar_permiso(ctx, servidor=True):
+            return
+
+        await servicios.suscripciones.fijar_zona_servidor(ctx.guild.id, nombre)
+        await servicios.salida.enviar(ctx, f"✅ Zona horaria del servidor: {nombre}.")
+
+
+async def setup(bot):
+    await bot.add_cog(Avisos(bot))
@@ -0,0 +1,52 @@
+###############################################################################
+# Comando de ayuda con la lista de comandos
+###############################################################################
+
+import discord               # Biblioteca principal para interactuar con Discord
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from f1bot.cogs.comun import CogF1
+
+
+class Ayuda(CogF1):
+    """
+    Lista de comandos disponibles.
+    """
+
+    #Crea un comando de Ayuda
+    @commands.hybrid_command(name='ayuda')
+    async def ayuda(self, ctx):
+        """
+        Muestra la lista de comandos disponibles.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        embed = discord.Embed(
+            title="📚 Lista de comandos",
+            description="Todos los comandos están también disponibles como comandos de barra (/), con autocompletado.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="!calendario [año]", value="Muestra el calendario de una temporada", inline=False)
+        embed.add_field(name="!resultados [nombre_gp] [año]", value="Muestra los resultados de un Gran Premio", inline=False)
+        embed.add_field(name="!proxima", value="Muestra información sobre la próxima carrera", inline=False)
+        embed.add_field(name="!piloto [nombre_piloto]", value="Muestra información de un piloto", inline=False)
+        embed.add_field(name="!mundialpilotos [año] [ronda]", value="Muestra la clasificación del mundial de pilotos (tras una ronda, si se indica)", inline=False)
+        embed.add_field(name="!constructores [año] [ronda]", value="Muestra la clasificación del mundial de constructores (tras una ronda, si se indica)", inline=False)
+        embed.add_field(name="!estadisticas [nombre_piloto] [año]", value="Muestra victorias, podios, poles y puntos de un piloto (sin año, de toda su trayectoria)", inline=False)
+        embed.add_field(name="!duelo [piloto_a] [piloto_b] [año]", value="Compara a dos pilotos en las carreras que disputaron los dos", inline=False)
+        embed.add_field(name="!compañeros [nombre_piloto] [año]", value="Compara a un piloto con sus compañeros de equipo", inline=False)
+        embed.add_field(name="!progresion [año]", value="Muestra los puntos acumulados ronda a ronda por los primeros del mundial", inline=False)
+        embed.add_field(name="!avisos", value="Muestra los avisos del canal, su zona horaria y la próxima sesión", inline=False)
+        embed.add_field(name="!avisos activar|desactivar [recordatorios|resultados|todos]", value="Envía al canal un recordatorio antes de cada sesión y/o los resultados de la sprint y de la carrera", inline=False)
+        embed.add_field(name="!avisos antelacion|zona|zonaservidor [valor]", value="Cambia los minutos de antelación de los recordatorios o la zona horaria del canal o del servidor", inline=False)
+        embed.add_field(name="!33", value="Envía un GIF de Fernando Alonso", inline=False)
+        embed.add_field(name="!smoothoperator", value="Envía un GIF de Carlos Sainz", inline=False)
+        embed.add_field(name="!totowolffdescuido", value="Envía un GIF de Toto Wolff", inline=False)
+        embed.add_field(name="!laqueriatanto", value="Envía un GIF de Fernando Alonso", inline=False)
+        embed.add_field(name="!bwoah", value="Envía un GIF de Kimi Räikkönen", inline=False)
+        await self.servicios.salida.enviar(ctx, embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Ayuda(bot))
@@ -0,0 +1,200 @@
+###############################################################################
+# Comandos del campeonato: pilotos y clasificaciones de pilotos y constructores
+###############################################################################
+
+import logging               # Para registro de eventos y errores
+
+from discord import app_commands  # Comandos de barra (/) y autocompletado
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from cache import temporada_actual  # Temporada en curso
+from embeds import (construir_clasificacion_constructores, construir_piloto, es_inmutable,  # Embeds de respuesta
+                    paginar_clasificacion_pilotos)
+from ergast import ErrorErgast  # Errores de la API Ergast
+from indice_circuitos import normalizar  # Normalización de las consultas
+from metricas import fase  # Fases de cada comando
+
+from f1bot.cogs.comun import CogF1, autocompletar_temporada, año_valido, diferir
+
+
+class Campeonato(CogF1):
+    """
+    Información de pilotos y clasificaciones del mundial.
+    """
+
+    async def clasificacion_calculada(self, tipo, año, ronda):
+        """
+        Devuelve la clasificación sumada a partir de los resultados, para la temporada
+        en curso o para una ronda concreta. Las clasificaciones finales de temporadas
+        terminadas se siguen pidiendo a la API (o a la copia local).
+
+        Args:
+            tipo (str): "pilotos" o "constructores"
+            año (str): Año de la temporada o "current"
+            ronda (int): Ronda tras la que se pide, o None para la última
+
+        Returns:
+            list: La clasificación, o None si hay que pedirla a la API
+        """
+        if ronda is None and es_inmutable(año):
+            return None
+        numero = temporada_actual() if año == 'current' else int(año)
+        try:
+            calculada = await getattr(self.servicios.clasificaciones, tipo)(numero, ronda)
+        except ErrorErgast as e:
+            logging.warning(f"No se pudo calcular la clasificación de {tipo} de {numero}: {e}")
+            return None
+        return calculada[1] if calculada else None
+
+    async def rechazar_ronda(self, ctx, ronda):
+        await self.servicios.salida.enviar(ctx, f"❌ '{ronda}' no es una ronda válida.")
+
+    # Comando para obtener información de un piloto
+    @commands.hybrid_command(name='piloto')
+    @app_commands.describe(nombre_piloto="Nombre, apellido, código o ID del piloto")
+    @app_commands.autocomplete(nombre_piloto=CogF1.autocompletar_piloto)
+    async def info_piloto(self, ctx, nombre_piloto: str):
+        """
+        Obtener información de un piloto de F1 por su nombre o código.
+
+        Args:
+            ctx: Contexto del comando
+            nombre_piloto (str): Nombre o código del piloto a buscar
+        """
+        servicios = self.servicios
+        # Los datos biográficos no cambian: se reutiliza el embed si ya se construyó
+        clave = ('piloto', normalizar(nombre_piloto))
+        renderizado = servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        # Resolver el piloto en el índice: un nombre que no existe se rechaza sin consultar la API
+        piloto_id = await self.resolver_piloto(ctx, nombre_piloto)
+        if not piloto_id:
+            return
+
+        # Consultar la API para obtener información del piloto
+        await diferir(ctx)
+        try:
+            with fase('fetch'):
+                piloto = await servicios.cliente_ergast.piloto(piloto_id)
+        except ErrorErgast as e:
+            logging.error(f"Error al obtener el piloto '{nombre_piloto}': {e}")
+            piloto = None
+
+        if not piloto:
+            await servicios.salida.enviar(ctx, f"No se encontró información para el piloto '{nombre_piloto}'.")
+            return
+
+        # Crear y enviar embed con la información
+        with fase('render'):
+            respuesta = construir_piloto(piloto)
+        servicios.cache_embeds.guardar(clave, respuesta)
+        await self.enviar_embeds(ctx, respuesta, clave=clave)
+
+    # Comando para mostrar la clasificación del mundial de pilotos
+    @commands.hybrid_command(name='mundialpilotos')
+    @app_commands.describe(año="Año de la temporada (por defecto, la actual)",
+                           ronda="Ronda tras la que mostrar la clasificación (por defecto, la última)")
+    @app_commands.autocomplete(año=autocompletar_temporada)
+    async def mundial_pilotos(self, ctx, año: str = "current", ronda: int = None):
+        """
+        Obtiene y muestra la clasificación del mundial de pilotos para un año específico.
+        Si no se especifica año, muestra la temporada actual.
+
+        Args:
+            ctx: Contexto del comando
+            año (str, opcional): Año de la temporada. Por defecto "current" (actual)
+            ronda (int, opcional): Ronda tras la que mostrar la clasificación. Por defecto, la última
+        """
+        if not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+        if ronda is not None and ronda < 1:
+            await self.rechazar_ronda(ctx, ronda)
+            return
+
+        servicios = self.servicios
+        clave = ('mundialpilotos', año, ronda)
+        renderizado = servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        await diferir(ctx)
+        try:
+            # Sumada a partir de los resultados si se puede; si no, se consulta la API
+            with fase('fetch'):
+                clasificacion = await self.clasificacion_calculada('pilotos', año, ronda)
+                if clasificacion is None:
+                    clasificacion = await servicios.cliente_ergast.clasificacion_pilotos(año, ronda)
+            if not clasificacion:
+                await servicios.salida.enviar(ctx, f"❌ No se encontró la clasificación del mundial de pilotos {año}")
+                return
+
+            # Una página por cada 25 pilotos (máximo 25 campos por embed); sólo se renderiza la primera
+            with fase('render'):
+                respuesta = paginar_clasificacion_pilotos(año, clasificacion, ronda)
+                respuesta.pagina(0)
+            if es_inmutable(año):
+                servicios.cache_embeds.guardar(clave, respuesta)
+            await self.enviar_embeds(ctx, respuesta, clave=clave)
+
+        except Exception as e:
+            logging.error(f"Error al obtener clasificación de pilotos: {e}")
+            await servicios.salida.enviar(ctx, "❌ Error al obtener la clasificación del mundial de pilotos")
+
+    # Comando para mostrar la clasificación del mundial de constructores
+    @commands.hybrid_command(name='constructores')
+    @app_commands.describe(año="Año de la temporada (por defecto, la actual)",
+                           ronda="Ronda tras la que mostrar la clasificación (por defecto, la última)")
+    @app_commands.autocomplete(año=autocompletar_temporada)
+    async def mundial_constructores(self, ctx, año: str = "current", ronda: int = None):
+        """
+        Obtiene y muestra la clasificación del mundial de constructores para un año específico.
+        Si no se especifica año, muestra la temporada actual.
+
+        Args:
+            ctx: Contexto del comando
+            año (str, opcional): Año de la temporada. Por defecto "current" (actual)
+            ronda (int, opcional): Ronda tras la que mostrar la clasificación. Por defecto, la última
+        """
+        if not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+        if ronda is not None and ronda < 1:
+            await self.rechazar_ronda(ctx, ronda)
+            return
+
+        servicios = self.servicios
+        clave = ('constructores', año, ronda)
+        renderizado = servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        await diferir(ctx)
+        try:
+            # Sumada a partir de los resultados si se puede; si no, se consulta la API
+            with fase('fetch'):
+                clasificacion = await self.clasificacion_calculada('constructores', año, ronda)
+                if clasificacion is None:
+                    clasificacion = await servicios.cliente_ergast.clasificacion_constructores(año, ronda)
+            if not clasificacion:
+                await servicios.salida.enviar(ctx, f"❌ No se encontró la clasificación del mundial de constructores {año}")
+                return
+
+            # Crear y enviar embed con la clasificación
+            with fase('render'):
+                respuesta = construir_clasificacion_constructores(año, clasificacion, ronda)
+            if es_inmutable(año):
+                servicios.cache_embeds.guardar(clave, respuesta)
+            await self.enviar_embeds(ctx, respuesta, clave=clave)
+        except Exception as e:
+            logging.error(f"Error al obtener clasificación de constructores: {e}")
+            await servicios.salida.enviar(ctx, "❌ Error al obtener la clasificación del mundial de constructores")
+
+
+async def setup(bot):
+    await bot.add_cog(Campeonato(bot))
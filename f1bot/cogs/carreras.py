@@ -0,0 +1,338 @@
+###############################################################################
+# Comandos de carreras: calendario, resultados y próxima carrera
+###############################################################################
+
+import asyncio               # Para las búsquedas simultáneas de circuitos
+import logging               # Para registro de eventos y errores
+from datetime import datetime # Para manejo de fechas y horas
+
+from discord import app_commands  # Comandos de barra (/) y autocompletado
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from cache import temporada_actual  # Temporada en curso
+from embeds import construir_calendario, construir_proxima_carrera, es_inmutable, paginar_resultados  # Embeds de respuesta
+from ergast import ErrorErgast  # Errores de la API Ergast
+from indice_circuitos import normalizar  # Normalización de las consultas
+from metricas import fase  # Fases de cada comando
+from salida import PRIORIDAD_MARCADOR  # Prioridad de los mensajes de espera
+
+from f1bot.cogs.comun import CogF1, autocompletar_temporada, año_valido, diferir
+
+# Búsqueda alternativa de circuitos: temporadas hacia atrás y peticiones simultáneas
+AÑOS_BUSQUEDA_ALTERNATIVA = 5
+MAX_BUSQUEDAS_PARALELAS = 5
+
+
+class Carreras(CogF1):
+    """
+    Calendario, resultados de un Gran Premio y próxima carrera.
+    """
+
+    ###########################################################################
+    # Funciones auxiliares para obtener datos de carreras
+    ###########################################################################
+
+    async def autocompletar_gp(self, interaction, actual):
+        """
+        Sugiere circuitos según el nombre del Gran Premio, circuito, ciudad o país.
+        """
+        return [app_commands.Choice(name=nombre[:100], value=nombre[:100])
+                for _, nombre in self.servicios.indice_circuitos.autocompletar(actual)]
+
+    async def obtener_id_circuito(self, nombre_gp, año):
+        """
+        Busca y devuelve el ID del circuito según su nombre o el nombre del Gran Premio.
+
+        Args:
+            nombre_gp (str): Nombre del circuito o Gran Premio a buscar
+            año (str): Año de la temporada
+
+        Returns:
+            str: ID del circuito si se encuentra, None en caso contrario
+        """
+        servicios = self.servicios
+        if not servicios.indice_cargado:
+            await servicios.cargar_indice_circuitos()
+
+        # Buscar en el índice en memoria (alias, nombres, IDs y localidades)
+        circuito_id = servicios.indice_circuitos.resolver(nombre_gp)
+        if circuito_id:
+            return circuito_id
+
+        # Si el índice no tiene el circuito, consultar los circuitos del año especificado
+        try:
+            circuits = await servicios.cliente_ergast.circuitos(año)
+            if not circuits:
+                logging.warning(f"No se encontraron circuitos para el año {año}")
+                # Intentar con años recientes como alternativa
+                return await self.buscar_circuito_en_años_recientes(nombre_gp)
+
+            # Incorporar los circuitos al índice y volver a buscar
+            servicios.indice_circuitos.añadir_circuitos(circuits)
+            circuito_id = servicios.indice_circuitos.resolver(nombre_gp)
+            if circuito_id:
+                return circuito_id
+
+        except ErrorErgast as e:
+            logging.error(f"Error al obtener circuitos para año {año}: {e}")
+            # En caso de error, intentar con años más recientes
+            return await self.buscar_circuito_en_años_recientes(nombre_gp)
+        except Exception as e:
+            logging.error(f"Excepción al buscar circuito '{nombre_gp}' en {año}: {e}")
+            # En caso de excepción, intentar con años más recientes
+            return await self.buscar_circuito_en_años_recientes(nombre_gp)
+
+        return None
+
+    async def buscar_circuito_en_años_recientes(self, nombre_busqueda):
+        """
+        Intenta encontrar un circuito en años recientes cuando falla la búsqueda en el año especificado.
+        Útil para circuitos que cambiaron de nombre o para temporadas antiguas con datos incompletos.
+
+        Args:
+            nombre_busqueda (str): Nombre del circuito a buscar
+
+        Returns:
+            str: ID del circuito si se encuentra, None en caso contrario
+        """
+        indice = self.servicios.indice_circuitos
+        cliente = self.servicios.cliente_ergast
+        # Años recientes para buscar de forma alternativa, contando desde la temporada actual
+        actual = temporada_actual()
+        años_a_probar = [str(actual - i) for i in range(AÑOS_BUSQUEDA_ALTERNATIVA)]
+        limite = asyncio.Semaphore(MAX_BUSQUEDAS_PARALELAS)
+
+        async def buscar_en_año(año):
+            async with limite:
+                try:
+                    circuits = await cliente.circuitos(año)
+                except Exception as e:
+                    logging.error(f"Error buscando en año alternativo {año}: {e}")
+                    return None
+
+            # Incorporar los circuitos del año al índice y comprobar si hay coincidencia
+            indice.añadir_circuitos(circuits)
+            circuito_id = indice.resolver(nombre_busqueda)
+            if circuito_id:
+                logging.info(f"Circuito encontrado en año alternativo {año}: {circuito_id}")
+            return circuito_id
+
+        # Lanzar todas las búsquedas a la vez y quedarse con la primera que encuentre el circuito
+        tareas = [asyncio.create_task(buscar_en_año(año)) for año in años_a_probar]
+        try:
+            for siguiente in asyncio.as_completed(tareas):
+                circuito_id = await siguiente
+                if circuito_id:
+                    return circuito_id
+        finally:
+            # Cancelar las peticiones que sigan en curso
+            for tarea in tareas:
+                tarea.cancel()
+
+        # Si llegamos aquí, no se encontró el circuito en ningún año
+        return None
+
+    async def obtener_resultados(self, circuito_id, año):
+        """
+        Obtiene los resultados de una carrera según el ID del circuito y año.
+
+        Args:
+            circuito_id (str): ID del circuito
+            año (str): Año de la temporada
+
+        Returns:
+            list: Lista de resultados si se encuentra, None en caso contrario
+        """
+        try:
+            # Consultar la API para obtener resultados de la carrera
+            resultados = await self.servicios.cliente_ergast.resultados(año, circuito_id)
+            if not resultados:
+                logging.warning(f"No se encontraron resultados para circuito {circuito_id} en año {año}")
+                return None
+            return resultados
+        except ErrorErgast as e:
+            logging.error(f"Error al obtener resultados: {e}")
+            return None
+        except Exception as e:
+            logging.error(f"Excepción al buscar resultados para {circuito_id} en {año}: {e}")
+            return None
+
+    ###########################################################################
+    # Comandos
+    ###########################################################################
+
+    # Comando para consultar el calendario de una temporada específica
+    @commands.hybrid_command(name='calendario')
+    @app_commands.describe(año="Año de la temporada")
+    @app_commands.autocomplete(año=autocompletar_temporada)
+    async def calendario_temporada(self, ctx, año: str):
+        """
+        Muestra el calendario completo de una temporada de F1.
+
+        Args:
+            ctx: Contexto del comando
+            año (str): Año de la temporada a consultar
+        """
+        if not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+
+        # Las temporadas pasadas se sirven directamente ya renderizadas
+        salida = self.servicios.salida
+        clave = ('calendario', año)
+        renderizado = self.servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        # Consultar la API para obtener las carreras del año
+        await diferir(ctx)
+        try:
+            with fase('fetch'):
+                carreras = await self.servicios.cliente_ergast.carreras(año)
+        except ErrorErgast as e:
+            logging.error(f"Error al obtener el calendario de {año}: {e}")
+            await salida.enviar(ctx, f"Error al obtener el calendario para la temporada {año}.")
+            return
+
+        if not carreras:
+            await salida.enviar(ctx, f"No se encontró información de carreras para la temporada {año}.")
+            return
+
+        # Crear el embed y guardarlo si la temporada ya no puede cambiar
+        with fase('render'):
+            respuesta = construir_calendario(año, carreras)
+        if es_inmutable(año):
+            self.servicios.cache_embeds.guardar(clave, respuesta)
+        await self.enviar_embeds(ctx, respuesta, clave=clave)
+
+    # Comando para obtener resultados de un Gran Premio específico
+    @commands.hybrid_command(name='resultados')
+    @app_commands.describe(nombre_gp="Gran Premio, circuito, ciudad o país", año="Año de la carrera")
+    @app_commands.autocomplete(nombre_gp=autocompletar_gp, año=autocompletar_temporada)
+    async def resultados_circuito(self, ctx, nombre_gp: str, año: str):
+        """
+        Obtiene y muestra los resultados de un Gran Premio específico.
+
+        Args:
+            ctx: Contexto del comando
+            nombre_gp (str): Nombre del Gran Premio o circuito
+            año (str): Año de la carrera
+        """
+        if not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+
+        # Si la carrera es de una temporada pasada y ya se mostró, no hace falta buscar nada
+        salida = self.servicios.salida
+        clave = ('resultados', normalizar(nombre_gp), año)
+        renderizado = self.servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        # Mensaje de espera mientras se busca (la respuesta lo sustituye al terminar)
+        marcador = salida.encolar(ctx, f"🔍 Buscando resultados para '{nombre_gp}' en {año}...",
+                                  prioridad=PRIORIDAD_MARCADOR)
+
+        # Buscar el circuito por nombre
+        with fase('resolve'):
+            circuito_id = await self.obtener_id_circuito(nombre_gp, año)
+        if not circuito_id:
+            mensaje = f"❌ No se encontró el Gran Premio '{nombre_gp}' en el año {año}. Por favor verifica el nombre del circuito o Gran Premio."
+            sugerencias = self.servicios.indice_circuitos.sugerencias(nombre_gp)
+            if sugerencias:
+                mensaje += f"\n¿Quizás quisiste decir: {', '.join(sugerencias)}?"
+            await salida.enviar(ctx, mensaje, reemplaza=marcador)
+            return
+
+        # Obtener resultados para el circuito
+        with fase('fetch'):
+            resultados = await self.obtener_resultados(circuito_id, año)
+        if not resultados:
+            await salida.enviar(ctx, f"❌ No se encontraron resultados para el Gran Premio '{nombre_gp}' en el año {año}. Puede que esta carrera no se haya celebrado o haya un error en la API.", reemplaza=marcador)
+            return
+
+        try:
+            # Una página por cada 25 resultados (límite de campos de Discord); sólo se renderiza la primera
+            with fase('render'):
+                respuesta = paginar_resultados(nombre_gp, año, resultados)
+                respuesta.pagina(0)
+            if es_inmutable(año):
+                self.servicios.cache_embeds.guardar(clave, respuesta)
+            await self.enviar_embeds(ctx, respuesta, clave=clave, reemplaza=marcador)
+        except Exception as e:
+            logging.error(f"Error al procesar resultados: {e}")
+            await salida.enviar(ctx, "❌ Se produjo un error al procesar los resultados. Por favor, inténtalo más tarde.",
+                                reemplaza=marcador)
+
+    async def buscar_proxima_carrera(self, ctx, now):
+        """
+        Busca la próxima carrera en el calendario de la API, mientras la agenda aún no lo ha cargado.
+
+        Args:
+            ctx: Contexto del comando
+            now (datetime): Instante actual (UTC)
+
+        Returns:
+            Carrera: La próxima carrera, o None si no hay (ya se ha respondido)
+        """
+        salida = self.servicios.salida
+        await diferir(ctx)
+        # Obtener datos de carreras para la temporada actual (el planificador la mantiene en caché)
+        temporada = temporada_actual()
+        with fase('fetch'):
+            races = await self.servicios.cliente_ergast.carreras(str(temporada))
+        if not races:
+            await salida.enviar(ctx, "❌ No se encontró información de carreras")
+            return None
+
+        # Calcular qué carreras están por celebrarse (la fecha ya viene convertida en el modelo)
+        upcoming = [race for race in races if race.inicio and race.inicio > now]
+
+        # Terminada la temporada, la próxima carrera es la primera de la siguiente
+        if not upcoming:
+            with fase('fetch'):
+                races = await self.servicios.cliente_ergast.carreras(str(temporada + 1))
+            upcoming = [race for race in races if race.inicio and race.inicio > now]
+
+        if not upcoming:
+            await salida.enviar(ctx, "❌ No se encontró información de la próxima carrera")
+            return None
+
+        # Seleccionar la carrera más cercana en el tiempo
+        return min(upcoming, key=lambda race: race.inicio)
+
+    # Comando para mostrar información sobre la próxima carrera
+    @commands.hybrid_command(name='proxima')
+    async def proxima_carrera(self, ctx):
+        """
+        Muestra información sobre la próxima carrera del calendario de F1.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        servicios = self.servicios
+        salida = servicios.salida
+        try:
+            # La agenda de avisos ya tiene el calendario ordenado: normalmente no hace falta consultar nada
+            now = datetime.utcnow()
+            next_race = servicios.agenda.proxima_carrera(now)
+            if next_race is None:
+                next_race = await self.buscar_proxima_carrera(ctx, now)
+            if next_race is None:
+                return
+
+            # Hora en la zona del canal (o de su servidor; si no, la española)
+            zona = servicios.suscripciones.zona(ctx.channel.id, ctx.guild.id if ctx.guild else None)
+            with fase('render'):
+                respuesta = construir_proxima_carrera(next_race, zona)
+
+            await self.enviar_embeds(ctx, respuesta, clave=('proxima',))
+        except Exception as e:
+            logging.error(f"Error al obtener información de la próxima carrera: {e}")
+            await salida.enviar(ctx, "❌ Error al obtener información de la próxima carrera")
+
+
+async def setup(bot):
+    await bot.add_cog(Carreras(bot))
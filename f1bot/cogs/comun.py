@@ -0,0 +1,129 @@
+###############################################################################
+# Utilidades comunes a los cogs de comandos
+###############################################################################
+
+from __future__ import annotations
+
+import functools             # Para fijar argumentos de los envíos
+
+from discord import app_commands  # Comandos de barra (/) y autocompletado
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from cache import temporada_actual  # Temporada en curso
+from embeds import Paginas  # Respuestas paginadas
+from ergast import datos_caducados  # Respuestas servidas con datos caducados
+from metricas import fase  # Fases de cada comando
+from paginador import enviar_paginas  # Respuestas largas en un único mensaje con botones
+from snapshot import PRIMERA_TEMPORADA  # Primera temporada con datos
+
+# Aviso que acompaña a las respuestas construidas con datos caducados (la API no responde)
+AVISO_CADUCADOS = "⚠️ La API de F1 no responde: se muestran los últimos datos guardados, que pueden estar desactualizados."
+
+
+def año_valido(año):
+    """
+    Comprueba, sin consultar la API, que un año corresponde a una temporada que puede existir.
+    
+    Args:
+        año (str): Año de la temporada o "current"
+        
+    Returns:
+        bool: True si es "current" o un año entre la primera temporada y la siguiente a la actual
+    """
+    if año == 'current':
+        return True
+    return año.isdigit() and PRIMERA_TEMPORADA <= int(año) <= temporada_actual() + 1
+
+async def diferir(ctx):
+    """
+    Con los comandos de barra, avisa a Discord de que la respuesta llegará más tarde
+    (si no, la interacción caduca a los 3 segundos). Con el prefijo no hace nada.
+    
+    Args:
+        ctx: Contexto del comando
+    """
+    if ctx.interaction is not None and not ctx.interaction.response.is_done():
+        await ctx.defer()
+
+async def autocompletar_temporada(interaction, actual):
+    """
+    Sugiere temporadas, de la más reciente a la más antigua, que empiezan por lo escrito.
+    """
+    años = [str(año) for año in range(temporada_actual(), PRIMERA_TEMPORADA - 1, -1)]
+    return [app_commands.Choice(name=año, value=año) for año in años if año.startswith(actual.strip())][:25]
+
+
+class CogF1(commands.Cog):
+    """
+    Cog con acceso a los servicios del bot y a las respuestas comunes.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.servicios = bot.servicios
+
+    async def autocompletar_piloto(self, interaction, actual):
+        """
+        Sugiere pilotos por nombre, apellido, código o ID.
+        """
+        return [app_commands.Choice(name=nombre[:100], value=piloto_id)
+                for piloto_id, nombre in self.servicios.indice_pilotos.autocompletar(actual)]
+
+    async def resolver_piloto(self, ctx, nombre_piloto):
+        """
+        Resuelve un piloto en el índice: un nombre que no existe se rechaza sin
+        consultar la API (respondiendo con sugerencias). Mientras el índice no
+        esté cargado, el nombre se usa directamente como ID.
+
+        Args:
+            ctx: Contexto del comando
+            nombre_piloto (str): Nombre, apellido, código o ID del piloto
+
+        Returns:
+            str: ID del piloto, o None si no existe (ya se ha respondido)
+        """
+        servicios = self.servicios
+        if not servicios.indice_pilotos_cargado:
+            return nombre_piloto.lower()
+        with fase('resolve'):
+            piloto_id = servicios.indice_pilotos.resolver(nombre_piloto)
+        if not piloto_id:
+            mensaje = f"No se encontró información para el piloto '{nombre_piloto}'."
+            sugerencias = servicios.indice_pilotos.sugerencias(nombre_piloto)
+            if sugerencias:
+                mensaje += f"\n¿Quizás quisiste decir: {', '.join(sugerencias)}?"
+            await servicios.salida.enviar(ctx, mensaje)
+        return piloto_id
+
+    async def rechazar_año(self, ctx, año):
+        """
+        Responde que el año no es válido.
+        
+        Args:
+            ctx: Contexto del comando
+            año (str): Año recibido
+        """
+        await self.servicios.salida.enviar(
+            ctx, f"❌ '{año}' no es una temporada válida. Usa un año entre {PRIMERA_TEMPORADA} y {temporada_actual() + 1}.")
+
+    async def enviar_embeds(self, ctx, lista, clave=None, reemplaza=None):
+        """
+        Envía una respuesta por la cola de salida del canal: una lista de embeds
+        (agrupados en el menor número de mensajes) o unas páginas (un único mensaje
+        con botones para pasar de página). Si se ha construido con datos caducados
+        porque la API no responde, el mensaje lo avisa.
+        
+        Args:
+            ctx: Contexto del comando
+            lista (list o Paginas): Embeds o páginas a enviar
+            clave (tuple, opcional): Consulta a la que responde, para no repetir la misma respuesta en el canal
+            reemplaza (Envio, opcional): Mensaje de espera que la respuesta sustituye
+        """
+        salida = self.servicios.salida
+        aviso = AVISO_CADUCADOS if datos_caducados() else None
+        with fase('send'):
+            if isinstance(lista, Paginas):
+                await enviar_paginas(ctx, lista, enviar=functools.partial(salida.enviar, content=aviso, clave=clave,
+                                                                          reemplaza=reemplaza))
+                return
+            await salida.enviar_embeds(ctx, lista, clave=clave, reemplaza=reemplaza, content=aviso)
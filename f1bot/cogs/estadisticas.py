@@ -0,0 +1,224 @@
+###############################################################################
+# Comandos de estadísticas: resumen de un piloto, cara a cara, compañeros de
+# equipo y progresión de puntos, calculados sobre los resultados en columnas
+###############################################################################
+
+import logging               # Para registro de eventos y errores
+
+from discord import app_commands  # Comandos de barra (/) y autocompletado
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from analitica import CargaEnCurso  # Temporadas que aún se están descargando
+from cache import temporada_actual  # Temporada en curso
+from embeds import (construir_cara_a_cara, construir_estadisticas, construir_progresion,  # Embeds de respuesta
+                    es_inmutable, paginar_compañeros)
+from ergast import ErrorErgast  # Errores de la API Ergast
+from metricas import fase  # Fases de cada comando
+
+from f1bot.cogs.comun import CogF1, autocompletar_temporada, año_valido, diferir
+
+
+class Estadisticas(CogF1):
+    """
+    Estadísticas de pilotos en una temporada o en toda su trayectoria.
+    """
+
+    async def cargar_tabla(self, ctx, año, *pilotos_id):
+        """
+        Carga los resultados de una temporada o, sin año, de la trayectoria de los pilotos.
+
+        Args:
+            ctx: Contexto del comando
+            año (str): Año de la temporada, "current" o None para la trayectoria
+            pilotos_id (str): IDs de los pilotos
+
+        Returns:
+            TablaResultados: La tabla, o None si no se pudo cargar (ya se ha respondido)
+        """
+        analitica = self.servicios.analitica
+        try:
+            with fase('fetch'):
+                if año is None:
+                    return await analitica.trayectoria(*pilotos_id)
+                return await analitica.temporada(temporada_actual() if año == 'current' else int(año))
+        except CargaEnCurso as e:
+            await self.servicios.salida.enviar(
+                ctx, f"⏳ Cargando los resultados de {e.pendientes} de {e.total} temporadas; "
+                     f"vuelve a intentarlo en unos segundos.")
+        except ErrorErgast as e:
+            logging.error(f"Error al cargar los resultados para las estadísticas: {e}")
+            await self.servicios.salida.enviar(ctx, "❌ Error al obtener los resultados para las estadísticas")
+        return None
+
+    @staticmethod
+    def ambito(año):
+        if año is None:
+            return "trayectoria"
+        return f"temporada {temporada_actual() if año == 'current' else año}"
+
+    async def responder(self, ctx, clave, año, construir):
+        """
+        Renderiza una respuesta, la guarda si los datos ya no cambian y la envía.
+        """
+        with fase('render'):
+            respuesta = construir()
+        if año is not None and es_inmutable(año):
+            self.servicios.cache_embeds.guardar(clave, respuesta)
+        await self.enviar_embeds(ctx, respuesta, clave=clave)
+
+    # Comando con el resumen de un piloto
+    @commands.hybrid_command(name='estadisticas')
+    @app_commands.describe(nombre_piloto="Nombre, apellido, código o ID del piloto",
+                           año="Año de la temporada (por defecto, toda su trayectoria)")
+    @app_commands.autocomplete(nombre_piloto=CogF1.autocompletar_piloto, año=autocompletar_temporada)
+    async def estadisticas_piloto(self, ctx, nombre_piloto: str, año: str = None):
+        """
+        Muestra carreras, victorias, podios, poles y puntos de un piloto en una temporada o en toda su trayectoria.
+
+        Args:
+            ctx: Contexto del comando
+            nombre_piloto (str): Nombre o código del piloto
+            año (str, opcional): Año de la temporada. Por defecto, toda su trayectoria
+        """
+        if año is not None and not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+        piloto_id = await self.resolver_piloto(ctx, nombre_piloto)
+        if not piloto_id:
+            return
+
+        clave = ('estadisticas', piloto_id, año)
+        renderizado = self.servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        await diferir(ctx)
+        tabla = await self.cargar_tabla(ctx, año, piloto_id)
+        if tabla is None:
+            return
+        resumen = self.servicios.analitica.resumen(tabla, piloto_id)
+        if resumen is None:
+            await self.servicios.salida.enviar(ctx, f"No hay resultados de '{nombre_piloto}' en la {self.ambito(año)}.")
+            return
+        await self.responder(ctx, clave, año, lambda: construir_estadisticas(resumen, self.ambito(año)))
+
+    # Comando con el cara a cara de dos pilotos
+    @commands.hybrid_command(name='duelo')
+    @app_commands.describe(piloto_a="Primer piloto", piloto_b="Segundo piloto",
+                           año="Año de la temporada (por defecto, todas las que coincidieron)")
+    @app_commands.autocomplete(piloto_a=CogF1.autocompletar_piloto, piloto_b=CogF1.autocompletar_piloto,
+                               año=autocompletar_temporada)
+    async def duelo(self, ctx, piloto_a: str, piloto_b: str, año: str = None):
+        """
+        Compara a dos pilotos en las carreras que disputaron los dos.
+
+        Args:
+            ctx: Contexto del comando
+            piloto_a (str): Nombre o código del primer piloto
+            piloto_b (str): Nombre o código del segundo piloto
+            año (str, opcional): Año de la temporada. Por defecto, todas las que coincidieron
+        """
+        if año is not None and not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+        id_a = await self.resolver_piloto(ctx, piloto_a)
+        if not id_a:
+            return
+        id_b = await self.resolver_piloto(ctx, piloto_b)
+        if not id_b:
+            return
+
+        clave = ('duelo', id_a, id_b, año)
+        renderizado = self.servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        await diferir(ctx)
+        tabla = await self.cargar_tabla(ctx, año, id_a, id_b)
+        if tabla is None:
+            return
+        cara = self.servicios.analitica.cara_a_cara(tabla, id_a, id_b)
+        if cara is None or not cara.carreras:
+            await self.servicios.salida.enviar(
+                ctx, f"'{piloto_a}' y '{piloto_b}' no coincidieron en ninguna carrera de la {self.ambito(año)}.")
+            return
+        await self.responder(ctx, clave, año, lambda: construir_cara_a_cara(cara, self.ambito(año)))
+
+    # Comando con la comparación de un piloto y sus compañeros de equipo
+    @commands.hybrid_command(name='compañeros', aliases=['companeros'])
+    @app_commands.describe(nombre_piloto="Nombre, apellido, código o ID del piloto",
+                           año="Año de la temporada (por defecto, toda su trayectoria)")
+    @app_commands.autocomplete(nombre_piloto=CogF1.autocompletar_piloto, año=autocompletar_temporada)
+    async def compañeros(self, ctx, nombre_piloto: str, año: str = None):
+        """
+        Compara a un piloto con cada uno de sus compañeros de equipo.
+
+        Args:
+            ctx: Contexto del comando
+            nombre_piloto (str): Nombre o código del piloto
+            año (str, opcional): Año de la temporada. Por defecto, toda su trayectoria
+        """
+        if año is not None and not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+        piloto_id = await self.resolver_piloto(ctx, nombre_piloto)
+        if not piloto_id:
+            return
+
+        clave = ('compañeros', piloto_id, año)
+        renderizado = self.servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        await diferir(ctx)
+        tabla = await self.cargar_tabla(ctx, año, piloto_id)
+        if tabla is None:
+            return
+        analitica = self.servicios.analitica
+        compañeros = analitica.compañeros(tabla, piloto_id)
+        if not compañeros:
+            await self.servicios.salida.enviar(
+                ctx, f"No hay compañeros de equipo de '{nombre_piloto}' en la {self.ambito(año)}.")
+            return
+        nombre = analitica.pilotos[analitica.pilotos.buscar(piloto_id)].nombre_completo
+        await self.responder(ctx, clave, año, lambda: paginar_compañeros(nombre, self.ambito(año), compañeros))
+
+    # Comando con la progresión de puntos de una temporada
+    @commands.hybrid_command(name='progresion')
+    @app_commands.describe(año="Año de la temporada (por defecto, la actual)")
+    @app_commands.autocomplete(año=autocompletar_temporada)
+    async def progresion(self, ctx, año: str = "current"):
+        """
+        Muestra los puntos acumulados ronda a ronda por los primeros pilotos de una temporada.
+
+        Args:
+            ctx: Contexto del comando
+            año (str, opcional): Año de la temporada. Por defecto "current" (actual)
+        """
+        if not año_valido(año):
+            await self.rechazar_año(ctx, año)
+            return
+
+        clave = ('progresion', año)
+        renderizado = self.servicios.cache_embeds.obtener(clave)
+        if renderizado:
+            await self.enviar_embeds(ctx, renderizado, clave=clave)
+            return
+
+        await diferir(ctx)
+        tabla = await self.cargar_tabla(ctx, año)
+        if tabla is None:
+            return
+        numero = temporada_actual() if año == 'current' else int(año)
+        progresion = self.servicios.analitica.progresion(tabla, numero)
+        if progresion is None:
+            await self.servicios.salida.enviar(ctx, f"❌ No hay resultados de la temporada {numero}")
+            return
+        await self.responder(ctx, clave, año, lambda: construir_progresion(progresion))
+
+
+async def setup(bot):
+    await bot.add_cog(Estadisticas(bot))
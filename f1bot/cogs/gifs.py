@@ -0,0 +1,82 @@
+###############################################################################
+# Comandos de GIFs de pilotos y jefes de equipo
+###############################################################################
+
+import random                # Para selección aleatoria de GIFs
+
+from discord.ext import commands  # Extensión para comandos de Discord
+
+from f1bot.cogs.comun import CogF1
+
+
+class Gifs(CogF1):
+    """
+    GIFs de Fernando Alonso, Carlos Sainz, Toto Wolff y Kimi Räikkönen.
+    """
+
+    # Comando para mandar un gif de Fernando Alonso
+    @commands.hybrid_command(name='33')
+    async def nano(self, ctx):
+        """
+        Envía un GIF de Fernando Alonso.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        gifs = [
+            "https://i.pinimg.com/736x/35/0c/bf/350cbfa78e4806cefeaf23892ac46c65.jpg",
+        ]
+        gif = random.choice(gifs)
+        await self.servicios.salida.enviar(ctx, gif)
+
+    @commands.hybrid_command(name='smoothoperator')
+    async def smoothoperator(self, ctx):
+        """
+        Envía un GIF de Carlos Sainz.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        gif = ["https://media1.tenor.com/m/aFg7WRHu9gAAAAAd/f1-carlos-sainz.gif"]
+        gifs = random.choice(gif)
+        await self.servicios.salida.enviar(ctx, gifs)
+
+    @commands.hybrid_command(name='totowolffdescuido')
+    async def toto(self, ctx):
+        """
+        Envía un GIF de Toto Wolff.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        gif = ["https://media1.tenor.com/m/xDF917mITKkAAAAd/totowolff-toto.gif"]
+        gifs = random.choice(gif)
+        await self.servicios.salida.enviar(ctx, gifs)
+
+    @commands.hybrid_command(name='laqueriatanto')
+    async def alonsostare(self, ctx):
+        """
+        Envía un GIF de Fernando Alonso.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        gif = ["https://media1.tenor.com/m/l4hNoe4ig-0AAAAC/alonso-gif.gif"]
+        gifs = random.choice(gif)
+        await self.servicios.salida.enviar(ctx, gifs)
+
+    @commands.hybrid_command(name='bwoah')
+    async def bwoah(self, ctx):
+        """
+        Envía un GIF de Kimi Räikkönen.
+
+        Args:
+            ctx: Contexto del comando
+        """
+        gif = ["https://media1.tenor.com/m/tudJo6DsrG4AAAAC/kimi-r%C3%A4ikk%C3%B6nen-raikkonen.gif", "https://media1.tenor.com/m/wRg7qgCknqAAAAAC/kimi-raikonnen.gif", ]
+        gifs = random.choice(gif)
+        await self.servicios.salida.enviar(ctx, gifs)
+
+
+async def setup(bot):
+    await bot.add_cog(Gifs(bot))
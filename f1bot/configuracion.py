@@ -0,0 +1,75 @@
+###############################################################################
+# Configuración del bot a partir de las variables de entorno
+#
+# Se lee una sola vez al arrancar (no al importar ningún módulo), de modo que
+# los benchmarks y las pruebas pueden ajustar el entorno antes de crear el bot.
+###############################################################################
+
+from __future__ import annotations
+
+import os                    # Para interactuar con variables de entorno
+from typing import List, Mapping, Optional
+
+
+def activado(valor: Optional[str]) -> bool:
+    """
+    Interpreta una variable de entorno booleana ("1", "true", "si", "sí").
+    """
+    return (valor or '').lower() in ('1', 'true', 'si', 'sí')
+
+
+class Configuracion:
+    """
+    Opciones del bot.
+
+    Args:
+        entorno (dict): Variables de entorno de las que leerlas (por defecto, las del proceso)
+    """
+
+    def __init__(self, entorno: Mapping[str, str] = os.environ):
+        self.entorno = entorno
+        self.token = entorno.get('DISCORD_TOKEN')
+        self.log_json = activado(entorno.get('LOG_JSON'))
+
+        # Caché de respuestas de la API (en memoria y, opcionalmente, en disco) y copia local
+        self.cache_max_entradas = int(entorno.get('ERGAST_CACHE_MAX_ENTRADAS', '2000'))
+        self.cache_disco = entorno.get('ERGAST_CACHE_DISCO') or None
+        self.snapshot = entorno.get('F1_SNAPSHOT') or None
+
+        # Disyuntor de la API: fallos seguidos que lo abren y segundos abierto antes de volver a probar
+        self.disyuntor_umbral = int(entorno.get('ERGAST_DISYUNTOR_UMBRAL', '5'))
+        self.disyuntor_espera = float(entorno.get('ERGAST_DISYUNTOR_ESPERA', '30'))
+
+        # Despliegue en varios procesos (ver supervisor.py): shards de este proceso y número de procesos
+        self.shard_ids: Optional[List[int]] = [
+            int(i) for i in entorno.get('F1_SHARD_IDS', '').split(',') if i.strip()] or None
+        self.shard_count = int(entorno['F1_SHARD_COUNT']) if entorno.get('F1_SHARD_COUNT') else None
+        self.procesos = int(entorno.get('F1_PROCESOS', '1'))
+        self.proceso = int(entorno.get('F1_PROCESO', '0'))
+
+        # Precarga de la temporada en curso tras cada sesión
+        self.precarga_retrasos = entorno.get('F1_PRECARGA_RETRASOS')
+        self.precarga_intervalo_calendario = float(entorno.get('F1_PRECARGA_INTERVALO_CALENDARIO', '21600'))
+
+        # Modo en directo: vigilancia de los resultados durante cada sesión (opcional)
+        self.en_vivo = activado(entorno.get('F1_EN_VIVO'))
+        self.en_vivo_intervalo_minimo = float(entorno.get('F1_EN_VIVO_INTERVALO_MINIMO', '30'))
+        self.en_vivo_intervalo_maximo = float(entorno.get('F1_EN_VIVO_INTERVALO_MAXIMO', '300'))
+
+        # Suscripciones de los canales a los avisos (":memory:" para no guardarlas en disco)
+        self.suscripciones = entorno.get('F1_SUSCRIPCIONES') or 'suscripciones.sqlite3'
+
+        # Límites de uso: presupuesto de peticiones por comando y respuestas compartidas
+        self.presupuesto_comando = int(entorno.get('ERGAST_PRESUPUESTO_COMANDO', '10'))
+        self.compartir_ventana = float(entorno.get('COMPARTIR_VENTANA', '30'))
+
+        # Métricas y diagnóstico
+        self.metricas_puerto = int(entorno['METRICAS_PUERTO']) if entorno.get('METRICAS_PUERTO') else None
+        self.metricas_host = entorno.get('METRICAS_HOST', '127.0.0.1')
+        self.vigilante = activado(entorno.get('VIGILANTE_BUCLE'))
+        self.vigilante_umbral = float(entorno.get('VIGILANTE_UMBRAL', '0.25'))
+        self.asyncio_depuracion = activado(entorno.get('ASYNCIO_DEPURACION'))
+        self.asyncio_callback_lento = float(entorno.get('ASYNCIO_CALLBACK_LENTO', '0.1'))
+
+        # Comandos de barra: se registran en Discord una vez por despliegue, desde el primer proceso
+        self.sincronizar_barra = entorno.get('SLASH_SINCRONIZAR', '1').lower() not in ('0', 'false', 'no')
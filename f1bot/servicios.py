@@ -0,0 +1,232 @@
+###############################################################################
+# Servicios compartidos por los comandos del bot
+#
+# Cliente de la API, cachés, índices de nombres, cola de salida, límites de
+# uso y métricas. Crearlos es barato (no hay red ni lecturas grandes): lo
+# costoso, como cargar los índices o precargar la temporada, se hace en
+# `calentar()`, en segundo plano una vez conectado el bot.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para tareas en segundo plano y bloqueos
+import logging               # Para registro de eventos y errores
+import os                    # Para comprobar si existe la copia local
+
+from agenda import AgendaAvisos  # Recordatorios antes de cada sesión
+from analitica import Analitica  # Estadísticas sobre los resultados en columnas
+from cache import CacheErgast, temporada_actual  # Caché de respuestas de la API
+from clasificaciones import MotorClasificaciones  # Clasificaciones calculadas ronda a ronda
+from disyuntor import Disyuntor  # Disyuntor de la API para fallar rápido si no responde
+from embeds import CacheEmbeds  # Respuestas ya renderizadas
+from enfriamiento import Enfriamientos, RespuestasCompartidas  # Límites por usuario y respuestas compartidas
+from envivo import SondeoEnVivo  # Resultados en directo durante cada sesión
+from ergast import ClienteErgast, ErrorErgast  # Cliente asíncrono de la API Ergast
+from indice_circuitos import IndiceCircuitos, IndicePilotos  # Índices en memoria de circuitos y pilotos
+from limitador import LIMITES_ERGAST, LimitadorPeticiones, repartir_limites  # Límite de peticiones de la API
+from metricas import REGISTRO, MonitorBucle, ServidorMetricas  # Métricas
+from paginador import VistaPaginada  # Respuestas paginadas (para las métricas)
+from planificador import PlanificadorPrecarga, leer_retrasos  # Precarga alrededor de las carreras
+from salida import ColaSalida  # Envíos a Discord por canal, con prioridad y agrupados
+from suscripciones import Suscripciones  # Preferencias de avisos de los canales
+
+from f1bot.configuracion import Configuracion
+
+# Comandos cuyas respuestas se comparten si se repite la consulta en el mismo canal
+COMANDOS_COMPARTIDOS = ('calendario', 'resultados', 'proxima', 'piloto', 'mundialpilotos', 'constructores',
+                        'estadisticas', 'duelo', 'compañeros', 'progresion')
+
+
+class Servicios:
+    """
+    Estado compartido del bot.
+
+    Args:
+        config (Configuracion): Opciones del bot
+    """
+
+    def __init__(self, config: Configuracion):
+        self.config = config
+
+        # Caché de respuestas de la API (en memoria y, si se configura ERGAST_CACHE_DISCO, en disco)
+        self.cache_ergast = CacheErgast(max_entradas=config.cache_max_entradas, ruta_disco=config.cache_disco)
+
+        # Copia local de los datos (opcional, generada con `python snapshot.py descargar`)
+        self.snapshot = None
+        if config.snapshot and os.path.exists(config.snapshot):
+            from snapshot import SnapshotF1
+            self.snapshot = SnapshotF1.abrir(config.snapshot)
+
+        # Cliente HTTP compartido por todos los comandos (sesión única con pool de conexiones).
+        # Con varios procesos, cada uno recibe una parte de los límites de la API. Si la API
+        # deja de responder, el disyuntor corta las peticiones y se sirven los datos caducados
+        self.cliente_ergast = ClienteErgast(
+            cache=self.cache_ergast, snapshot=self.snapshot,
+            limitador=LimitadorPeticiones(repartir_limites(LIMITES_ERGAST, config.procesos)),
+            disyuntor=Disyuntor('API Ergast', umbral=config.disyuntor_umbral, espera=config.disyuntor_espera))
+
+        # Índice de circuitos: empieza con la tabla de alias y se completa con la API al calentar
+        self.indice_circuitos = IndiceCircuitos()
+        self.indice_cargado = False
+        self._bloqueo_indice = asyncio.Lock()
+
+        # Índice de pilotos: resuelve nombres y códigos a IDs sin consultar la API
+        self.indice_pilotos = IndicePilotos()
+        self.indice_pilotos_cargado = False
+        self._bloqueo_indice_pilotos = asyncio.Lock()
+
+        # Resultados de las temporadas en columnas para los comandos de estadísticas
+        self.analitica = Analitica(self.cliente_ergast)
+
+        # Clasificaciones del mundial sumadas ronda a ronda a partir de los resultados
+        self.clasificaciones = MotorClasificaciones(self.analitica, self.cliente_ergast)
+
+        # Precarga de la temporada en curso tras cada sesión; al terminar, se suman las rondas nuevas
+        self.planificador_precarga = PlanificadorPrecarga(
+            self.cliente_ergast,
+            cache=self.cache_ergast,
+            retrasos=leer_retrasos(config.precarga_retrasos),
+            intervalo_calendario=config.precarga_intervalo_calendario,
+            tras_precarga=lambda: self.clasificaciones.temporada(temporada_actual()),
+        )
+
+        # Modo en directo (F1_EN_VIVO): una sola tarea vigila los resultados de la sesión en curso
+        self.en_vivo = SondeoEnVivo(
+            self.cliente_ergast,
+            cache=self.cache_ergast,
+            intervalo_minimo=config.en_vivo_intervalo_minimo,
+            intervalo_maximo=config.en_vivo_intervalo_maximo,
+            tras_cambio=lambda: self.clasificaciones.temporada(temporada_actual()),
+        )
+
+        # Suscripciones de los canales a los avisos y agenda con los recordatorios de todas las sesiones
+        self.suscripciones = Suscripciones(config.suscripciones)
+        self.agenda = AgendaAvisos(self.cliente_ergast, self.suscripciones)
+
+        # Respuestas ya renderizadas de consultas cuyos datos no cambian (temporadas pasadas)
+        self.cache_embeds = CacheEmbeds()
+
+        # Cola de salida: todos los mensajes a Discord pasan por ella, canal a canal
+        self.salida = ColaSalida()
+
+        # Enfriamientos por usuario, servidor y comando (configurables con ENFRIAMIENTO_*)
+        self.enfriamientos = Enfriamientos.desde_entorno(config.entorno)
+
+        # Consultas repetidas en un canal: se contesta con un enlace a la respuesta reciente
+        self.respuestas_compartidas = RespuestasCompartidas(comandos=COMANDOS_COMPARTIDOS,
+                                                            ventana=config.compartir_ventana)
+
+        # Métricas (se publican en /metrics si se configura METRICAS_PUERTO) y diagnóstico del bucle
+        self.monitor_bucle = MonitorBucle()
+        self.servidor_metricas = ServidorMetricas(host=config.metricas_host, puerto=config.metricas_puerto) \
+            if config.metricas_puerto else None
+        self.vigilante_bucle = None
+        if config.vigilante:
+            from vigilante import VigilanteBucle
+            self.vigilante_bucle = VigilanteBucle(umbral=config.vigilante_umbral)
+        self._registrar_metricas()
+
+    def _registrar_metricas(self) -> None:
+        REGISTRO.medidor('f1bot_cache_ratio_aciertos', 'Proporción de aciertos de la caché de la API',
+                         funcion=lambda: self.cache_ergast.estadisticas()['ratio_aciertos'])
+        REGISTRO.medidor('f1bot_cache_entradas', 'Respuestas guardadas en la caché en memoria',
+                         funcion=lambda: self.cache_ergast.estadisticas()['entradas'])
+        REGISTRO.medidor('f1bot_cache_embeds_aciertos', 'Respuestas servidas ya renderizadas',
+                         funcion=lambda: self.cache_embeds.aciertos)
+        REGISTRO.medidor('f1bot_ergast_coalescidas', 'Peticiones agrupadas con una descarga ya en curso',
+                         funcion=lambda: self.cliente_ergast.coalescidas)
+        REGISTRO.medidor('f1bot_ergast_en_cola', 'Peticiones esperando turno en el limitador',
+                         funcion=lambda: self.cliente_ergast.estadisticas()['en_cola'])
+        REGISTRO.medidor('f1bot_ergast_disyuntor_estado', 'Estado del disyuntor de la API (0 cerrado, 1 semiabierto, 2 abierto)',
+                         funcion=lambda: self.cliente_ergast.disyuntor.valor_estado)
+        REGISTRO.medidor('f1bot_ergast_revalidaciones_pendientes', 'Consultas servidas caducadas pendientes de revalidar',
+                         funcion=lambda: self.cliente_ergast.revalidaciones_pendientes)
+        REGISTRO.medidor('f1bot_analitica_temporadas', 'Temporadas cargadas en columnas para las estadísticas',
+                         funcion=lambda: self.analitica.temporadas_cargadas)
+        REGISTRO.medidor('f1bot_envivo_canales', 'Canales suscritos a los resultados en directo',
+                         funcion=lambda: len(self.suscripciones.con_resultados))
+        REGISTRO.medidor('f1bot_avisos_canales', 'Canales con alguna suscripción a los avisos',
+                         funcion=lambda: len(self.suscripciones))
+        REGISTRO.medidor('f1bot_avisos_pendientes', 'Recordatorios programados en la agenda',
+                         funcion=lambda: self.agenda.pendientes)
+        REGISTRO.medidor('f1bot_salida_pendientes', 'Mensajes esperando turno en las colas de salida',
+                         funcion=lambda: self.salida.pendientes)
+        REGISTRO.medidor('f1bot_vistas_paginadas_activas', 'Respuestas paginadas con botones todavía activos',
+                         funcion=lambda: VistaPaginada.activas)
+        REGISTRO.medidor('f1bot_bucle_ultimo_retraso_segundos', 'Último retraso medido del bucle de eventos',
+                         funcion=lambda: self.monitor_bucle.ultimo_retraso)
+
+    async def iniciar(self) -> None:
+        """
+        Abre la sesión de la API y arranca las métricas y el diagnóstico (antes del login).
+        """
+        await self.cliente_ergast.iniciar()
+        self.monitor_bucle.iniciar()
+        if self.vigilante_bucle is not None:
+            self.vigilante_bucle.iniciar()
+        if self.config.asyncio_depuracion:
+            from vigilante import activar_depuracion_asyncio
+            activar_depuracion_asyncio(self.config.asyncio_callback_lento)
+        if self.servidor_metricas is not None:
+            await self.servidor_metricas.iniciar()
+
+    async def detener(self) -> None:
+        await self.planificador_precarga.detener()
+        await self.en_vivo.detener()
+        await self.agenda.detener()
+        await self.monitor_bucle.detener()
+        if self.vigilante_bucle is not None:
+            await self.vigilante_bucle.detener()
+        if self.servidor_metricas is not None:
+            await self.servidor_metricas.detener()
+        await self.cliente_ergast.cerrar()
+        self.suscripciones.cerrar()
+
+    async def calentar(self) -> None:
+        """
+        Carga los índices y arranca la precarga de la temporada en curso.
+
+        Se lanza en segundo plano tras conectarse, para no competir con el login.
+        Los comandos que llegan antes no esperan: cargan el índice que necesitan
+        al usarlo, o consultan directamente a la API.
+        """
+        await asyncio.gather(self.cargar_indice_circuitos(), self.cargar_indice_pilotos())
+        # Con varios procesos, sólo precarga el primero: los demás leen la caché en disco compartida
+        if self.config.proceso == 0:
+            self.planificador_precarga.iniciar()
+        # En cambio, cada proceso avisa y vigila en directo para publicar en los canales de sus servidores
+        self.agenda.iniciar()
+        if self.config.en_vivo:
+            self.en_vivo.iniciar()
+
+    async def cargar_indice_circuitos(self) -> None:
+        """
+        Carga en el índice todos los circuitos de la historia y los nombres de los
+        Grandes Premios de la temporada en curso. Si la API no responde, el índice
+        sigue funcionando con la tabla de alias.
+        """
+        async with self._bloqueo_indice:
+            if self.indice_cargado:
+                return
+            try:
+                self.indice_circuitos.añadir_circuitos(await self.cliente_ergast.todos_los_circuitos())
+                self.indice_circuitos.añadir_carreras(await self.cliente_ergast.carreras(str(temporada_actual())))
+                self.indice_cargado = True
+                logging.info(f"Índice de circuitos cargado con {len(self.indice_circuitos)} circuitos")
+            except ErrorErgast as e:
+                logging.error(f"No se pudo cargar el índice de circuitos: {e}")
+
+    async def cargar_indice_pilotos(self) -> None:
+        """
+        Carga en el índice todos los pilotos de la historia. Mientras no esté cargado,
+        los nombres de piloto se consultan directamente a la API como ID.
+        """
+        async with self._bloqueo_indice_pilotos:
+            if self.indice_pilotos_cargado:
+                return
+            try:
+                self.indice_pilotos.añadir_pilotos(await self.cliente_ergast.todos_los_pilotos())
+                self.indice_pilotos_cargado = True
+                logging.info(f"Índice de pilotos cargado con {len(self.indice_pilotos)} pilotos")
+            except ErrorErgast as e:
+                logging.error(f"No se pudo cargar el índice de pilotos: {e}")
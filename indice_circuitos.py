@@ -0,0 +1,363 @@
+###############################################################################
+# Índices de nombres para resolver Grandes Premios y pilotos
+#
+# Se construyen una sola vez a partir de la tabla de alias y de las listas
+# históricas de circuitos y pilotos de la API. Resolver un nombre es una
+# búsqueda en memoria (sin peticiones HTTP), lo bastante rápida para el
+# autocompletado de los comandos de barra, que combina:
+# - Coincidencia exacta sobre textos normalizados (sin acentos ni mayúsculas)
+# - Búsqueda por prefijo de palabra (lista ordenada + bisect)
+# - Similitud por trigramas para tolerar erratas
+###############################################################################
+
+from __future__ import annotations
+
+import re                    # Para separar palabras al normalizar
+import unicodedata           # Para eliminar acentos
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from modelos import Carrera, Circuito, Piloto
+
+# Nombres alternativos de circuitos
+# Mapea nombres comunes o variaciones a los IDs estándar de la API
+ALIAS_CIRCUITOS = {
+    "mexico": "rodriguez",
+    "interlagos": "interlagos",
+    "brasil": "interlagos",
+    "brazilian": "interlagos",
+    "albert park": "albert_park",
+    "australia": "albert_park",
+    "melbourne": "albert_park",
+    "americas": "americas",
+    "usa": "americas",
+    "united states": "americas",
+    "cota": "americas",
+    "austin": "americas",
+    "abu dhabi": "yas_marina",
+    "arabia": "jeddah",
+    "saudi": "jeddah",
+    "jeddah": "jeddah",
+    "las vegas": "vegas",
+    "monaco": "monaco",
+    "mexican": "rodriguez",
+    "silverstone": "silverstone",
+    "britain": "silverstone",
+    "british": "silverstone",
+    "monza": "monza",
+    "italy": "monza",
+    "italian": "monza",
+    "spa": "spa",
+    "belgium": "spa",
+    "belgian": "spa",
+    "hungaroring": "hungaroring",
+    "hungary": "hungaroring",
+    "hungarian": "hungaroring",
+    "zandvoort": "zandvoort",
+    "netherlands": "zandvoort",
+    "dutch": "zandvoort",
+    "suzuka": "suzuka",
+    "japan": "suzuka",
+    "japanese": "suzuka",
+    "barcelona": "catalunya",
+    "catalunya": "catalunya",
+    "spain": "catalunya",
+    "spanish": "catalunya",
+    "baku": "baku",
+    "azerbaijan": "baku",
+    "shanghai": "shanghai",
+    "china": "shanghai",
+    "chinese": "shanghai",
+    "bahrain": "bahrain",
+    "sakhir": "bahrain",
+    "imola": "imola",
+    "emilia": "imola",
+    "romagna": "imola",
+    "portugal": "portimao",
+    "portimao": "portimao",
+    "singapore": "marina_bay",
+    "marina bay": "marina_bay",
+    "montreal": "villeneuve",
+    "canada": "villeneuve",
+    "canadian": "villeneuve",
+    "villeneuve": "villeneuve",
+    "istanbul": "istanbul",
+    "turkey": "istanbul",
+    "turkish": "istanbul",
+    "sochi": "sochi",
+    "russia": "sochi",
+    "russian": "sochi",
+    "austria": "red_bull_ring",
+    "red bull ring": "red_bull_ring",
+    "styrian": "red_bull_ring",
+    "sepang": "sepang",
+    "malaysia": "sepang",
+    "malaysian": "sepang",
+    "nurburgring": "nurburgring",
+    "germany": "nurburgring",
+    "german": "nurburgring",
+    "hockenheim": "hockenheimring",
+    "france": "paul_ricard",
+    "french": "paul_ricard",
+    "paul ricard": "paul_ricard",
+    "hanoi": "hanoi",
+    "vietnam": "hanoi",
+    "vietnamese": "hanoi",
+    "losail": "losail",
+    "qatar": "losail",
+    "qatari": "losail",
+    "miami": "miami",
+    "yas marina": "yas_marina",
+}
+
+# Puntuación mínima para dar por buena una coincidencia
+UMBRAL_COINCIDENCIA = 0.5
+
+# Diferencia mínima entre el primer y el segundo candidato para no considerar ambigua
+# una coincidencia que no es exacta
+MARGEN_AMBIGUEDAD = 0.02
+
+# Máximo de opciones que admite el autocompletado de Discord
+MAX_OPCIONES = 25
+
+# Puntuaciones de cada tipo de coincidencia
+PUNTOS_EXACTA = 1.0
+PUNTOS_PREFIJO = 0.85
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar(texto: str) -> str:
+    """
+    Normaliza un texto para comparar: sin acentos, en minúsculas y con las
+    palabras separadas por un único espacio.
+
+    Args:
+        texto (str): Texto a normalizar (p. ej. "São Paulo" o "red_bull_ring")
+
+    Returns:
+        str: Texto normalizado (p. ej. "sao paulo" o "red bull ring")
+    """
+    sin_acentos = unicodedata.normalize('NFKD', texto)
+    sin_acentos = ''.join(c for c in sin_acentos if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(' ', sin_acentos.lower()).strip()
+
+
+def trigramas(texto: str) -> Set[str]:
+    """
+    Devuelve el conjunto de trigramas de un texto normalizado (con relleno en los extremos).
+    """
+    relleno = f'  {texto} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceNombres:
+    """
+    Índice en memoria de los textos (nombres, IDs, alias...) que identifican entidades.
+
+    Args:
+        alias (dict): Textos adicionales que apuntan a un ID
+    """
+
+    def __init__(self, alias: Optional[Dict[str, str]] = None):
+        # Claves normalizadas: cada una apunta a una entidad
+        self._claves: List[Tuple[str, str, Set[str]]] = []   # (texto, entidad_id, trigramas)
+        self._exactas: Dict[str, str] = {}                    # texto -> entidad_id
+        self._por_trigrama: Dict[str, List[int]] = defaultdict(list)
+        self._palabras: List[Tuple[str, int]] = []            # (palabra, índice de clave), ordenada
+        self._palabras_ordenadas = True
+        self.nombres: Dict[str, str] = {}                     # ID -> nombre legible
+        for texto, entidad_id in (alias or {}).items():
+            self._añadir_clave(texto, entidad_id)
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def _añadir_clave(self, texto: str, entidad_id: str) -> None:
+        """
+        Añade un texto que identifica a una entidad.
+        """
+        clave = normalizar(texto)
+        if not clave or self._exactas.get(clave) == entidad_id:
+            return
+        self._exactas.setdefault(clave, entidad_id)
+        indice = len(self._claves)
+        tris = trigramas(clave)
+        self._claves.append((clave, entidad_id, tris))
+        for tri in tris:
+            self._por_trigrama[tri].append(indice)
+        for palabra in clave.split():
+            self._palabras.append((palabra, indice))
+        self._palabras_ordenadas = False
+
+    def añadir(self, entidad_id: str, nombre: str, textos: Iterable[Optional[str]]) -> None:
+        """
+        Añade una entidad con su nombre legible y los textos que la identifican.
+
+        Args:
+            entidad_id (str): ID de la entidad en la API
+            nombre (str): Nombre que se muestra en sugerencias y autocompletado
+            textos (iterable): Textos por los que se puede buscar (se ignoran los vacíos y "N/A")
+        """
+        if not entidad_id or entidad_id in self.nombres:
+            return
+        self.nombres[entidad_id] = nombre
+        for texto in (entidad_id, nombre, *textos):
+            if texto and texto != 'N/A':
+                self._añadir_clave(texto, entidad_id)
+
+    def _candidatos_por_prefijo(self, palabra: str) -> Set[int]:
+        """
+        Devuelve las claves que contienen alguna palabra que empieza por `palabra`.
+        """
+        if not self._palabras_ordenadas:
+            self._palabras.sort()
+            self._palabras_ordenadas = True
+        encontrados = set()
+        posicion = bisect_left(self._palabras, (palabra, -1))
+        while posicion < len(self._palabras) and self._palabras[posicion][0].startswith(palabra):
+            encontrados.add(self._palabras[posicion][1])
+            posicion += 1
+        return encontrados
+
+    def buscar(self, consulta: str, limite: int = 5) -> List[Tuple[str, float]]:
+        """
+        Busca las entidades que mejor encajan con una consulta.
+
+        Args:
+            consulta (str): Texto a buscar (p. ej. nombre del circuito, Gran Premio, ciudad o país)
+            limite (int): Número máximo de candidatos a devolver
+
+        Returns:
+            list: Pares (ID, puntuación entre 0 y 1), de mejor a peor
+        """
+        texto = normalizar(consulta)
+        if not texto:
+            return []
+
+        puntuaciones: Dict[str, float] = {}
+        exacta = self._exactas.get(texto)
+        if exacta is not None:
+            puntuaciones[exacta] = PUNTOS_EXACTA
+
+        # Coincidencias por prefijo de palabra: todas las palabras de la consulta
+        # deben ser prefijo de alguna palabra de la clave
+        palabras = texto.split()
+        por_prefijo = None
+        for palabra in palabras:
+            encontrados = self._candidatos_por_prefijo(palabra)
+            por_prefijo = encontrados if por_prefijo is None else por_prefijo & encontrados
+        for indice in por_prefijo or ():
+            clave, entidad_id, _ = self._claves[indice]
+            # Cuanto más parte de la clave cubre la consulta, mejor
+            puntos = PUNTOS_PREFIJO + (PUNTOS_EXACTA - PUNTOS_PREFIJO) * 0.9 * len(texto) / len(clave)
+            if puntos > puntuaciones.get(entidad_id, 0.0):
+                puntuaciones[entidad_id] = puntos
+
+        # Similitud por trigramas (coeficiente de Dice) para tolerar erratas
+        tris_consulta = trigramas(texto)
+        compartidos: Dict[int, int] = defaultdict(int)
+        for tri in tris_consulta:
+            for indice in self._por_trigrama.get(tri, ()):
+                compartidos[indice] += 1
+        for indice, comunes in compartidos.items():
+            _, entidad_id, tris_clave = self._claves[indice]
+            puntos = 2 * comunes / (len(tris_consulta) + len(tris_clave)) * PUNTOS_PREFIJO
+            if puntos > puntuaciones.get(entidad_id, 0.0):
+                puntuaciones[entidad_id] = puntos
+
+        ordenados = sorted(puntuaciones.items(), key=lambda par: (-par[1], par[0]))
+        return ordenados[:limite]
+
+    def resolver(self, consulta: str) -> Optional[str]:
+        """
+        Devuelve el ID de la entidad que mejor encaja, si supera el umbral de coincidencia
+        y no es ambiguo.
+
+        Args:
+            consulta (str): Texto a buscar
+
+        Returns:
+            str: ID encontrado, None si no hay ninguna coincidencia suficiente o
+                varias entidades encajan casi igual de bien
+        """
+        candidatos = self.buscar(consulta, limite=2)
+        if not candidatos or candidatos[0][1] < UMBRAL_COINCIDENCIA:
+            return None
+        if (candidatos[0][1] < PUNTOS_EXACTA and len(candidatos) > 1
+                and candidatos[0][1] - candidatos[1][1] < MARGEN_AMBIGUEDAD):
+            return None
+        return candidatos[0][0]
+
+    def sugerencias(self, consulta: str, limite: int = 3) -> List[str]:
+        """
+        Devuelve nombres legibles de las entidades más parecidas a una consulta.
+        """
+        return [self.nombres.get(entidad_id, entidad_id) for entidad_id, _ in self.buscar(consulta, limite)]
+
+    def autocompletar(self, consulta: str, limite: int = MAX_OPCIONES) -> List[Tuple[str, str]]:
+        """
+        Opciones de autocompletado para lo que el usuario lleva escrito (sin red).
+
+        Args:
+            consulta (str): Texto escrito hasta el momento (puede estar vacío)
+            limite (int): Número máximo de opciones
+
+        Returns:
+            list: Pares (ID, nombre legible); sin texto, los primeros por orden alfabético
+        """
+        if not normalizar(consulta):
+            ids = self.nombres or {entidad_id: entidad_id for entidad_id in self._exactas.values()}
+            return sorted(((entidad_id, ids[entidad_id]) for entidad_id in ids), key=lambda par: par[1])[:limite]
+        return [(entidad_id, self.nombres.get(entidad_id, entidad_id))
+                for entidad_id, puntos in self.buscar(consulta, limite) if puntos >= UMBRAL_COINCIDENCIA / 2]
+
+
+class IndiceCircuitos(IndiceNombres):
+    """
+    Índice en memoria de nombres, IDs, localidades y alias de circuitos, y de los
+    nombres de los Grandes Premios que se disputan en ellos.
+    """
+
+    def __init__(self, alias: Optional[Dict[str, str]] = None):
+        super().__init__(alias if alias is not None else ALIAS_CIRCUITOS)
+
+    def añadir_circuitos(self, circuitos: Iterable[Circuito]) -> None:
+        """
+        Añade circuitos al índice.
+
+        Args:
+            circuitos (list): Circuitos (modelos.Circuito) devueltos por el cliente de la API
+        """
+        for circuito in circuitos:
+            self.añadir(circuito.id, circuito.nombre, (circuito.localidad, circuito.pais))
+
+    def añadir_carreras(self, carreras: Iterable[Carrera]) -> None:
+        """
+        Añade los nombres de los Grandes Premios (p. ej. "Monaco Grand Prix") y sus circuitos.
+
+        Args:
+            carreras (list): Carreras (modelos.Carrera) de un calendario
+        """
+        carreras = list(carreras)
+        self.añadir_circuitos(carrera.circuito for carrera in carreras)
+        for carrera in carreras:
+            if carrera.nombre != 'N/A':
+                self._añadir_clave(carrera.nombre, carrera.circuito.id)
+
+
+class IndicePilotos(IndiceNombres):
+    """
+    Índice en memoria de pilotos por ID, nombre, apellido y código de tres letras.
+    """
+
+    def añadir_pilotos(self, pilotos: Iterable[Piloto]) -> None:
+        """
+        Añade pilotos al índice.
+
+        Args:
+            pilotos (list): Pilotos (modelos.Piloto) devueltos por el cliente de la API
+        """
+        for piloto in pilotos:
+            self.añadir(piloto.id, piloto.nombre_completo, (piloto.apellido, piloto.codigo))
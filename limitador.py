@@ -0,0 +1,112 @@
+###############################################################################
+# Limitador de peticiones a la API Ergast
+#
+# Cubos de tokens que reproducen los límites publicados por api.jolpi.ca
+# (4 peticiones por segundo en ráfaga y 500 por hora sostenidas). Cuando no
+# quedan tokens, las peticiones esperan su turno en orden de llegada en lugar
+# de fallar.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para esperar sin bloquear el bucle de eventos
+import time                  # Reloj monotónico para reponer tokens
+from typing import Iterable, Optional, Tuple
+
+# Límites publicados por la API: (capacidad del cubo, periodo en segundos)
+LIMITES_ERGAST = ((4, 1.0), (500, 3600.0))
+
+
+def repartir_limites(limites: Iterable[Tuple[int, float]], procesos: int) -> Tuple[Tuple[int, float], ...]:
+    """
+    Reparte los límites de la API entre varios procesos que la consultan a la vez.
+
+    Cada proceso recibe una fracción de cada cubo (al menos un token), de forma que
+    entre todos no superen los límites publicados.
+
+    Args:
+        limites (iterable): Pares (capacidad, periodo en segundos)
+        procesos (int): Número de procesos que comparten los límites
+
+    Returns:
+        tuple: Límites para cada proceso
+    """
+    procesos = max(1, procesos)
+    return tuple((max(1, capacidad // procesos), periodo * max(1, capacidad // procesos) * procesos / capacidad)
+                 for capacidad, periodo in limites)
+
+
+class CuboTokens:
+    """
+    Cubo de tokens que se repone de forma continua.
+
+    Args:
+        capacidad (int): Número máximo de tokens (tamaño de la ráfaga)
+        periodo (float): Segundos que tarda en reponerse el cubo completo
+    """
+
+    def __init__(self, capacidad: int, periodo: float):
+        self.capacidad = capacidad
+        self.tasa = capacidad / periodo
+        self._tokens = float(capacidad)
+        self._ultima = time.monotonic()
+
+    def _reponer(self) -> None:
+        ahora = time.monotonic()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultima) * self.tasa)
+        self._ultima = ahora
+
+    def espera_necesaria(self) -> float:
+        """
+        Devuelve los segundos que faltan para que haya un token disponible (0 si ya lo hay).
+        """
+        self._reponer()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.tasa
+
+    def consumir(self) -> None:
+        self._tokens -= 1
+
+    def lleno(self) -> bool:
+        """
+        Indica si el cubo se ha repuesto del todo (como si nunca se hubiera usado).
+        """
+        self._reponer()
+        return self._tokens >= self.capacidad
+
+
+class LimitadorPeticiones:
+    """
+    Limitador con varios cubos de tokens y cola de espera en orden de llegada.
+
+    Args:
+        limites (iterable): Pares (capacidad, periodo en segundos) de cada cubo
+    """
+
+    def __init__(self, limites: Iterable[Tuple[int, float]] = LIMITES_ERGAST):
+        self._cubos = [CuboTokens(capacidad, periodo) for capacidad, periodo in limites]
+        self._turno: Optional[asyncio.Lock] = None
+        self.en_cola = 0
+        self.esperas = 0
+
+    async def adquirir(self) -> None:
+        """
+        Espera hasta que todos los cubos tengan un token y lo consume.
+        """
+        if self._turno is None:
+            self._turno = asyncio.Lock()
+        self.en_cola += 1
+        try:
+            # El bloqueo hace de cola: sólo la primera petición en espera mira los cubos
+            async with self._turno:
+                while True:
+                    espera = max(cubo.espera_necesaria() for cubo in self._cubos)
+                    if espera <= 0:
+                        break
+                    self.esperas += 1
+                    await asyncio.sleep(espera)
+                for cubo in self._cubos:
+                    cubo.consumir()
+        finally:
+            self.en_cola -= 1
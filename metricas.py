@@ -0,0 +1,466 @@
+###############################################################################
+# Métricas del bot en formato de texto de Prometheus
+#
+# Contadores, medidores e histogramas en memoria, sin dependencias externas,
+# que se publican en un endpoint HTTP local `/metrics`. Incluye:
+# - Duración de cada comando, desglosada por fases (resolve, fetch, parse,
+#   render, send), y un identificador de traza por invocación
+# - Peticiones a la API Ergast por endpoint y código de estado
+# - Retraso del bucle de eventos
+# - Formato JSON opcional para los logs, con el identificador de traza
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para la tarea que mide el retraso del bucle
+import contextvars           # Para asociar fases y logs a la invocación en curso
+import json                  # Para los logs estructurados
+import logging               # Para registro de eventos y errores
+import time                  # Reloj de alta resolución para medir fases
+import uuid                  # Identificadores de traza
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from aiohttp import web  # Sólo se importa al arrancar el servidor de métricas
+
+
+# Límites (en segundos) de los cubos de los histogramas de latencia
+CUBOS_LATENCIA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Cada cuánto se mide el retraso del bucle de eventos, en segundos
+INTERVALO_RETRASO_BUCLE = 0.5
+
+# Endpoints de la API que se distinguen en las métricas (el resto de segmentos son años o IDs)
+ENDPOINTS_ERGAST = ('seasons', 'races', 'results', 'qualifying', 'sprint', 'circuits', 'drivers',
+                    'constructors', 'driverStandings', 'constructorStandings', 'status', 'laps', 'pitstops')
+
+
+def _etiquetas(nombres: Sequence[str], valores: Tuple[str, ...], extra: str = '') -> str:
+    """
+    Formatea las etiquetas de una serie (p. ej. '{comando="resultados",fase="fetch"}').
+    """
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return '{' + ','.join(partes) + '}' if partes else ''
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Metrica:
+    """
+    Base común: nombre, descripción y nombres de las etiquetas.
+    """
+    tipo = ''
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+
+    def _clave(self, valores: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(valores.get(nombre, '')) for nombre in self.etiquetas)
+
+    def exponer(self) -> List[str]:
+        return [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+
+
+class Contador(_Metrica):
+    """
+    Valor que sólo crece (peticiones, errores...).
+    """
+    tipo = 'counter'
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, valor: float = 1.0, **etiquetas: str) -> None:
+        self._valores[self._clave(etiquetas)] += valor
+
+    def valor(self, **etiquetas: str) -> float:
+        return self._valores.get(self._clave(etiquetas), 0.0)
+
+    def exponer(self) -> List[str]:
+        lineas = super().exponer()
+        for clave, valor in sorted(self._valores.items()):
+            lineas.append(f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {valor:g}')
+        return lineas
+
+
+class Medidor(_Metrica):
+    """
+    Valor que sube y baja; puede fijarse a mano o calcularse al exponer con una función.
+    """
+    tipo = 'gauge'
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 funcion: Optional[Callable[[], float]] = None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.funcion = funcion
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def fijar(self, valor: float, **etiquetas: str) -> None:
+        self._valores[self._clave(etiquetas)] = valor
+
+    def exponer(self) -> List[str]:
+        lineas = super().exponer()
+        valores = dict(self._valores)
+        if self.funcion is not None:
+            try:
+                valores[()] = float(self.funcion())
+            except Exception as e:
+                logging.error(f"Error al calcular la métrica {self.nombre}: {e}")
+        for clave, valor in sorted(valores.items()):
+            lineas.append(f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {valor:g}')
+        return lineas
+
+
+class Histograma(_Metrica):
+    """
+    Distribución de valores (latencias) en cubos acumulados.
+    """
+    tipo = 'histogram'
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 cubos: Sequence[float] = CUBOS_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubos = tuple(sorted(cubos))
+        # Por serie: recuentos por cubo (el último es +Inf), suma y total
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observar(self, valor: float, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        serie = self._series.get(clave)
+        if serie is None:
+            serie = self._series[clave] = [[0] * (len(self.cubos) + 1), 0.0, 0]
+        serie[0][bisect_left(self.cubos, valor)] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+    def recuento(self, **etiquetas: str) -> int:
+        serie = self._series.get(self._clave(etiquetas))
+        return serie[2] if serie else 0
+
+    def exponer(self) -> List[str]:
+        lineas = super().exponer()
+        for clave, (recuentos, suma, total) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, recuento in zip(self.cubos + (float('inf'),), recuentos):
+                acumulado += recuento
+                le = '+Inf' if limite == float('inf') else f'{limite:g}'
+                etiquetas = _etiquetas(self.etiquetas, clave, f'le="{le}"')
+                lineas.append(f'{self.nombre}_bucket{etiquetas} {acumulado}')
+            lineas.append(f'{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {suma:g}')
+            lineas.append(f'{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {total}')
+        return lineas
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas que se publican juntas.
+    """
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nombre in self._metricas:
+            raise ValueError(f"La métrica {metrica.nombre} ya está registrada")
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                funcion: Optional[Callable[[], float]] = None) -> Medidor:
+        """
+        Registra un medidor. Si ya existe (p. ej. al crear de nuevo los servicios
+        del bot en el mismo proceso), se reutiliza y su función pasa a ser la nueva.
+        """
+        existente = self._metricas.get(nombre)
+        if isinstance(existente, Medidor):
+            existente.funcion = funcion
+            return existente
+        return self._registrar(Medidor(nombre, ayuda, etiquetas, funcion))
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                   cubos: Sequence[float] = CUBOS_LATENCIA) -> Histograma:
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, cubos))
+
+    def exponer(self) -> str:
+        """
+        Devuelve todas las métricas en el formato de texto de Prometheus.
+        """
+        lineas = []
+        for metrica in self._metricas.values():
+            lineas.extend(metrica.exponer())
+        return '\n'.join(lineas) + '\n'
+
+
+# Registro global y métricas comunes del bot
+REGISTRO = RegistroMetricas()
+
+duracion_comandos = REGISTRO.histograma(
+    'f1bot_comando_segundos', 'Duración total de cada comando', ('comando',))
+fases_comandos = REGISTRO.histograma(
+    'f1bot_comando_fase_segundos', 'Duración de cada fase de un comando', ('comando', 'fase'))
+comandos_ejecutados = REGISTRO.contador(
+    'f1bot_comandos_total', 'Comandos ejecutados por resultado', ('comando', 'resultado'))
+peticiones_ergast = REGISTRO.contador(
+    'f1bot_ergast_peticiones_total', 'Peticiones a la API Ergast por endpoint y estado', ('endpoint', 'status'))
+latencia_ergast = REGISTRO.histograma(
+    'f1bot_ergast_peticion_segundos', 'Duración de las peticiones a la API Ergast', ('endpoint',))
+retraso_bucle = REGISTRO.histograma(
+    'f1bot_bucle_retraso_segundos', 'Retraso del bucle de eventos sobre lo programado')
+
+
+def endpoint_de_ruta(ruta: str) -> str:
+    """
+    Reduce una ruta de la API a su endpoint, sin años ni IDs (p. ej. "2023/circuits/monaco/results" -> "results").
+    """
+    segmentos = ruta.split('?', 1)[0].strip('/').split('/')
+    for segmento in reversed(segmentos):
+        if segmento in ENDPOINTS_ERGAST:
+            return segmento
+    return 'otro'
+
+
+###############################################################################
+# Invocaciones de comandos: fases y trazas
+###############################################################################
+
+class Invocacion:
+    """
+    Datos de medición de una invocación de comando en curso.
+    """
+
+    def __init__(self, comando: str):
+        self.comando = comando
+        self.traza = uuid.uuid4().hex[:16]
+        self.inicio = time.perf_counter()
+        self.fases: Dict[str, float] = defaultdict(float)
+        # Tiempo ya atribuido a alguna fase, para no contar dos veces las fases anidadas
+        self._atribuido = 0.0
+
+
+_invocacion: contextvars.ContextVar[Optional[Invocacion]] = contextvars.ContextVar('invocacion', default=None)
+
+
+def iniciar_invocacion(comando: str) -> Invocacion:
+    """
+    Empieza a medir una invocación de comando en el contexto actual.
+    """
+    invocacion = Invocacion(comando)
+    _invocacion.set(invocacion)
+    return invocacion
+
+
+def terminar_invocacion(error: bool = False) -> Optional[Invocacion]:
+    """
+    Registra la duración total y las fases de la invocación en curso.
+    """
+    invocacion = _invocacion.get()
+    if invocacion is None:
+        return None
+    _invocacion.set(None)
+    duracion_comandos.observar(time.perf_counter() - invocacion.inicio, comando=invocacion.comando)
+    for nombre, duracion in invocacion.fases.items():
+        fases_comandos.observar(duracion, comando=invocacion.comando, fase=nombre)
+    comandos_ejecutados.inc(comando=invocacion.comando, resultado='error' if error else 'ok')
+    return invocacion
+
+
+def traza_actual() -> Optional[str]:
+    invocacion = _invocacion.get()
+    return invocacion.traza if invocacion is not None else None
+
+
+@contextmanager
+def fase(nombre: str) -> Iterator[None]:
+    """
+    Mide una fase de la invocación en curso (no hace nada fuera de un comando).
+
+    Las fases anidadas se descuentan de la que las contiene: el tiempo de "parse"
+    medido dentro de un "fetch" no se cuenta también como "fetch".
+    """
+    invocacion = _invocacion.get()
+    if invocacion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    atribuido_antes = invocacion._atribuido
+    try:
+        yield
+    finally:
+        propio = max(0.0, time.perf_counter() - inicio - (invocacion._atribuido - atribuido_antes))
+        invocacion.fases[nombre] += propio
+        invocacion._atribuido += propio
+
+
+class FiltroTraza(logging.Filter):
+    """
+    Añade a cada registro de log el identificador de traza de la invocación en curso.
+    """
+
+    def filter(self, registro: logging.LogRecord) -> bool:
+        invocacion = _invocacion.get()
+        registro.traza = invocacion.traza if invocacion is not None else None
+        registro.comando = invocacion.comando if invocacion is not None else None
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+    """
+    Formatea los logs como una línea JSON por evento.
+    """
+
+    def format(self, registro: logging.LogRecord) -> str:
+        datos = {
+            'ts': round(registro.created, 3),
+            'nivel': registro.levelname,
+            'logger': registro.name,
+            'mensaje': registro.getMessage(),
+        }
+        if getattr(registro, 'traza', None):
+            datos['traza'] = registro.traza
+            datos['comando'] = registro.comando
+        if registro.exc_info:
+            datos['excepcion'] = self.formatException(registro.exc_info)
+        return json.dumps(datos, ensure_ascii=False)
+
+
+def configurar_logs_json() -> None:
+    """
+    Sustituye el formato de los manejadores del logger raíz por JSON con traza.
+    """
+    raiz = logging.getLogger()
+    if not raiz.handlers:
+        raiz.addHandler(logging.StreamHandler())
+    for manejador in raiz.handlers:
+        manejador.setFormatter(FormatoJSON())
+        manejador.addFilter(FiltroTraza())
+
+
+###############################################################################
+# Tiempos de arranque
+###############################################################################
+
+tiempos_arranque = REGISTRO.medidor(
+    'f1bot_arranque_segundos', 'Segundos desde el inicio del proceso hasta cada hito del arranque', ('hito',))
+
+
+class Arranque:
+    """
+    Hitos del arranque del proceso (importaciones, preparación, conexión...) y
+    el tiempo hasta el primer comando respondido.
+
+    Args:
+        inicio (float): Instante de inicio según `time.perf_counter()` (por defecto, ahora)
+    """
+
+    def __init__(self, inicio: Optional[float] = None):
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.hitos: Dict[str, float] = {}
+
+    def marcar(self, hito: str) -> float:
+        """
+        Registra un hito la primera vez que se alcanza y devuelve sus segundos desde el inicio.
+        """
+        if hito not in self.hitos:
+            self.hitos[hito] = time.perf_counter() - self.inicio
+            tiempos_arranque.fijar(self.hitos[hito], hito=hito)
+        return self.hitos[hito]
+
+    def primer_comando(self, comando: str) -> None:
+        """
+        Registra (sólo la primera vez) el tiempo hasta el primer comando respondido.
+        """
+        if 'primer_comando' in self.hitos:
+            return
+        segundos = self.marcar('primer_comando')
+        logging.info(f"Primer comando ({comando}) respondido a los {segundos:.2f} s del arranque")
+
+    def resumen(self) -> str:
+        return ', '.join(f'{hito} {segundos:.2f} s' for hito, segundos in self.hitos.items())
+
+
+###############################################################################
+# Retraso del bucle de eventos y servidor HTTP
+###############################################################################
+
+class MonitorBucle:
+    """
+    Tarea que duerme a intervalos fijos y mide cuánto se retrasa en despertar.
+
+    Un retraso alto significa que algo está bloqueando el bucle de eventos.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_RETRASO_BUCLE):
+        self.intervalo = intervalo
+        self.ultimo_retraso = 0.0
+        self._tarea: Optional[asyncio.Task] = None
+
+    def iniciar(self) -> None:
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.create_task(self._medir())
+
+    async def detener(self) -> None:
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+        self._tarea = None
+
+    async def _medir(self) -> None:
+        bucle = asyncio.get_running_loop()
+        while True:
+            previsto = bucle.time() + self.intervalo
+            await asyncio.sleep(self.intervalo)
+            self.ultimo_retraso = max(0.0, bucle.time() - previsto)
+            retraso_bucle.observar(self.ultimo_retraso)
+
+
+class ServidorMetricas:
+    """
+    Servidor HTTP local que publica las métricas en `/metrics`.
+
+    Args:
+        registro (RegistroMetricas): Métricas a publicar
+        host (str): Dirección en la que escuchar
+        puerto (int): Puerto en el que escuchar
+    """
+
+    def __init__(self, registro: RegistroMetricas = REGISTRO, host: str = '127.0.0.1', puerto: int = 9108):
+        self.registro = registro
+        self.host = host
+        self.puerto = puerto
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _metricas(self, peticion: web.Request) -> web.Response:
+        from aiohttp import web
+        return web.Response(text=self.registro.exponer(), content_type='text/plain', charset='utf-8')
+
+    async def iniciar(self) -> None:
+        # aiohttp.web tarda en importarse y sólo hace falta si se publican las métricas
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get('/metrics', self._metricas)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.puerto).start()
+        logging.info(f"Métricas disponibles en http://{self.host}:{self.puerto}/metrics")
+
+    async def detener(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,203 @@
+###############################################################################
+# Modelos compactos de los datos de la API Ergast
+#
+# Las respuestas JSON se convierten una sola vez, en el cliente, a tuplas con
+# nombre que sólo guardan los campos que usa el bot. Los textos repetidos
+# (nacionalidades, equipos, estados...) se internan y los pilotos,
+# constructores y circuitos se comparten entre todas las carreras, de forma
+# que una temporada en memoria ocupa mucho menos que los diccionarios anidados.
+###############################################################################
+
+from __future__ import annotations
+
+import sys                   # Para internar cadenas y estimar tamaños
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+def _texto(valor: Any, por_defecto: str = 'N/A') -> str:
+    """
+    Devuelve el valor como cadena internada (o el valor por defecto si falta).
+    """
+    if valor is None or valor == '':
+        return por_defecto
+    return sys.intern(str(valor))
+
+
+class Circuito(NamedTuple):
+    id: str
+    nombre: str
+    localidad: str
+    pais: str
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "Circuito":
+        circuito_id = datos.get('circuitId', '')
+        existente = _circuitos.get(circuito_id)
+        localizacion = datos.get('Location', {})
+        nuevo = cls(_texto(circuito_id), _texto(datos.get('circuitName')),
+                    _texto(localizacion.get('locality')), _texto(localizacion.get('country')))
+        if existente == nuevo:
+            return existente
+        _circuitos[circuito_id] = nuevo
+        return nuevo
+
+
+class Piloto(NamedTuple):
+    id: str
+    nombre: str
+    apellido: str
+    fecha_nacimiento: str
+    nacionalidad: str
+    codigo: Optional[str]
+    numero: Optional[str]
+
+    @property
+    def nombre_completo(self) -> str:
+        return f"{self.nombre} {self.apellido}"
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "Piloto":
+        piloto_id = datos.get('driverId', '')
+        existente = _pilotos.get(piloto_id)
+        nuevo = cls(_texto(piloto_id), _texto(datos.get('givenName')), _texto(datos.get('familyName')),
+                    _texto(datos.get('dateOfBirth')), _texto(datos.get('nationality')),
+                    datos.get('code'), datos.get('permanentNumber'))
+        if existente == nuevo:
+            return existente
+        _pilotos[piloto_id] = nuevo
+        return nuevo
+
+
+class Constructor(NamedTuple):
+    id: str
+    nombre: str
+    nacionalidad: str
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "Constructor":
+        constructor_id = datos.get('constructorId', '')
+        existente = _constructores.get(constructor_id)
+        nuevo = cls(_texto(constructor_id), _texto(datos.get('name')), _texto(datos.get('nationality')))
+        if existente == nuevo:
+            return existente
+        _constructores[constructor_id] = nuevo
+        return nuevo
+
+
+# Sesiones del fin de semana que publica la API junto a cada carrera
+SESIONES = ('FirstPractice', 'SecondPractice', 'ThirdPractice', 'SprintQualifying', 'SprintShootout',
+            'Sprint', 'Qualifying')
+
+
+def _instante(fecha: str, hora: Optional[str]) -> Optional[datetime]:
+    """
+    Convierte la fecha y hora de la API a un datetime UTC (sin zona horaria).
+    """
+    try:
+        return datetime.strptime(f"{fecha} {hora or '00:00:00Z'}", "%Y-%m-%d %H:%M:%SZ")
+    except ValueError:
+        return None
+
+
+class Carrera(NamedTuple):
+    temporada: int
+    ronda: int
+    nombre: str
+    fecha: str
+    hora: Optional[str]
+    circuito: Circuito
+    inicio: Optional[datetime]   # Fecha y hora de salida en UTC (sin zona horaria)
+    sesiones: Tuple[Tuple[str, datetime], ...] = ()   # (sesión, inicio UTC) del resto del fin de semana
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "Carrera":
+        fecha, hora = datos.get('date', ''), datos.get('time')
+        sesiones = []
+        for sesion in SESIONES:
+            horario = datos.get(sesion)
+            inicio_sesion = _instante(horario.get('date', ''), horario.get('time')) if horario else None
+            if inicio_sesion is not None:
+                sesiones.append((sys.intern(sesion), inicio_sesion))
+        return cls(int(datos.get('season', 0)), int(datos.get('round', 0)), _texto(datos.get('raceName')),
+                   fecha, hora, Circuito.desde_api(datos.get('Circuit', {})), _instante(fecha, hora),
+                   tuple(sesiones))
+
+
+class Resultado(NamedTuple):
+    posicion: str
+    piloto: Piloto
+    constructor: Constructor
+    puntos: str
+    parrilla: str
+    vueltas: str
+    estado: str
+    tiempo: Optional[str]
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "Resultado":
+        return cls(_texto(datos.get('position')), Piloto.desde_api(datos.get('Driver', {})),
+                   Constructor.desde_api(datos.get('Constructor', {})), _texto(datos.get('points'), '0'),
+                   _texto(datos.get('grid')), _texto(datos.get('laps')), _texto(datos.get('status')),
+                   (datos.get('Time') or {}).get('time'))
+
+
+class ResultadosCarrera(NamedTuple):
+    carrera: Carrera
+    resultados: Tuple[Resultado, ...]
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any], clave: str = 'Results') -> "ResultadosCarrera":
+        # Las carreras sprint traen sus resultados en "SprintResults"
+        return cls(Carrera.desde_api(datos), tuple(Resultado.desde_api(r) for r in datos.get(clave, [])))
+
+
+class ClasificacionPiloto(NamedTuple):
+    posicion: str
+    piloto: Piloto
+    puntos: str
+    victorias: str
+    constructores: Tuple[Constructor, ...]
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "ClasificacionPiloto":
+        return cls(_texto(datos.get('position', datos.get('positionText'))),
+                   Piloto.desde_api(datos.get('Driver', {})), _texto(datos.get('points'), '0'),
+                   _texto(datos.get('wins'), '0'),
+                   tuple(Constructor.desde_api(c) for c in datos.get('Constructors', [])))
+
+
+class ClasificacionConstructor(NamedTuple):
+    posicion: str
+    constructor: Constructor
+    puntos: str
+    victorias: str
+
+    @classmethod
+    def desde_api(cls, datos: Dict[str, Any]) -> "ClasificacionConstructor":
+        return cls(_texto(datos.get('position', datos.get('positionText'))),
+                   Constructor.desde_api(datos.get('Constructor', {})), _texto(datos.get('points'), '0'),
+                   _texto(datos.get('wins'), '0'))
+
+
+# Registros compartidos: cada piloto, constructor y circuito existe una sola vez en memoria
+_pilotos: Dict[str, Piloto] = {}
+_constructores: Dict[str, Constructor] = {}
+_circuitos: Dict[str, Circuito] = {}
+
+
+def tamaño_aproximado(registros: Any) -> int:
+    """
+    Estima los bytes que ocupa una lista de registros (sin contar los objetos compartidos).
+
+    Args:
+        registros: Lista de registros o un único registro
+
+    Returns:
+        int: Tamaño aproximado en bytes
+    """
+    if isinstance(registros, list):
+        return sys.getsizeof(registros) + sum(tamaño_aproximado(r) for r in registros)
+    if registros is None:
+        return 0
+    return sys.getsizeof(registros)
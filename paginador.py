@@ -0,0 +1,105 @@
+###############################################################################
+# Vista paginada para respuestas de más de 25 filas
+#
+# En lugar de mandar varios embeds seguidos (un mensaje y una llamada a la
+# API de Discord por cada uno), se envía un único mensaje con la primera
+# página y botones para moverse. Las demás páginas se renderizan al pulsar,
+# a partir de los datos ya descargados. Pasado un tiempo sin uso, la vista
+# quita los botones y suelta los datos para que no se acumulen en memoria.
+###############################################################################
+
+from __future__ import annotations
+
+import logging               # Para registro de eventos y errores
+from typing import Awaitable, Callable, Optional
+
+import discord               # Biblioteca principal para interactuar con Discord
+
+from embeds import Paginas
+
+# Segundos sin pulsar ningún botón tras los que la vista se desactiva
+TIEMPO_VISTA = 180.0
+
+
+class VistaPaginada(discord.ui.View):
+    """
+    Botones de anterior/siguiente sobre una respuesta paginada.
+
+    Args:
+        paginas (Paginas): Páginas de la respuesta
+        timeout (float): Segundos sin uso tras los que se desactiva
+    """
+
+    # Vistas con botones activos (para las métricas)
+    activas = 0
+
+    def __init__(self, paginas: Paginas, timeout: float = TIEMPO_VISTA):
+        super().__init__(timeout=timeout)
+        self.paginas: Optional[Paginas] = paginas
+        self.actual = 0
+        self.mensaje: Optional[discord.Message] = None
+        self._actualizar_botones()
+
+    def _actualizar_botones(self) -> None:
+        self.anterior.disabled = self.actual == 0
+        self.siguiente.disabled = self.actual >= len(self.paginas) - 1
+        self.contador.label = f"{self.actual + 1}/{len(self.paginas)}"
+
+    async def _mostrar(self, interaction: discord.Interaction, numero: int) -> None:
+        """
+        Cambia el mensaje a otra página (renderizándola si es la primera vez que se ve).
+        """
+        if self.paginas is None:
+            await interaction.response.defer()
+            return
+        self.actual = max(0, min(numero, len(self.paginas) - 1))
+        self._actualizar_botones()
+        await interaction.response.edit_message(embed=self.paginas.pagina(self.actual), view=self)
+
+    @discord.ui.button(emoji='◀️', style=discord.ButtonStyle.secondary)
+    async def anterior(self, interaction: discord.Interaction, boton: discord.ui.Button) -> None:
+        await self._mostrar(interaction, self.actual - 1)
+
+    @discord.ui.button(label='1/1', style=discord.ButtonStyle.secondary, disabled=True)
+    async def contador(self, interaction: discord.Interaction, boton: discord.ui.Button) -> None:
+        pass
+
+    @discord.ui.button(emoji='▶️', style=discord.ButtonStyle.secondary)
+    async def siguiente(self, interaction: discord.Interaction, boton: discord.ui.Button) -> None:
+        await self._mostrar(interaction, self.actual + 1)
+
+    async def on_timeout(self) -> None:
+        """
+        Quita los botones del mensaje y suelta las páginas y el mensaje.
+        """
+        mensaje, self.mensaje, self.paginas = self.mensaje, None, None
+        VistaPaginada.activas -= 1
+        if mensaje is not None:
+            try:
+                await mensaje.edit(view=None)
+            except discord.HTTPException as e:
+                logging.debug(f"No se pudieron quitar los botones de la vista paginada: {e}")
+
+
+async def enviar_paginas(ctx, paginas: Paginas,
+                         enviar: Optional[Callable[..., Awaitable[Optional[discord.Message]]]] = None) -> None:
+    """
+    Envía una respuesta paginada en un único mensaje (con botones si tiene más de una página).
+
+    Args:
+        ctx: Contexto del comando
+        paginas (Paginas): Páginas de la respuesta
+        enviar (callable, opcional): Función de envío que recibe el contexto y los argumentos
+            de `send` (p. ej. la de la cola de salida); por defecto, `ctx.send`
+    """
+    if enviar is None:
+        enviar = lambda ctx, **argumentos: ctx.send(**argumentos)
+    if len(paginas) == 1:
+        await enviar(ctx, embed=paginas.pagina(0))
+        return
+    vista = VistaPaginada(paginas)
+    mensaje = await enviar(ctx, embed=paginas.pagina(0), view=vista)
+    # Si la respuesta se fusionó con otra igual, esta vista no llegó a usarse
+    if mensaje is not None and not vista.is_finished():
+        vista.mensaje = mensaje
+        VistaPaginada.activas += 1
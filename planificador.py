@@ -0,0 +1,246 @@
+###############################################################################
+# Precarga programada de datos alrededor de los fines de semana de carrera
+#
+# Los picos de uso llegan justo al terminar la clasificación, el sprint o la
+# carrera, que es cuando los datos de la caché acaban de quedar desfasados.
+# El planificador mantiene cargado el calendario de la temporada en curso,
+# calcula cuándo termina cada sesión y, pasado un rato, vuelve a descargar
+# resultados y clasificaciones para que la caché ya esté caliente cuando los
+# usuarios pregunten.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para la tarea en segundo plano
+import logging               # Para registro de eventos y errores
+import random                # Para repartir los reintentos en el tiempo
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Sequence
+
+import aiohttp               # Errores de red durante la precarga
+
+from cache import DURACION_CARRERA, CacheErgast, temporada_actual
+from ergast import ClienteErgast, ErrorErgast
+from modelos import Carrera
+
+# Minutos tras el final de cada sesión en los que se repite la precarga
+# (la API suele tardar en publicar los datos definitivos)
+RETRASOS_PRECARGA = (10, 30, 90)
+
+# Cada cuánto se recarga el calendario aunque no haya sesiones (en segundos)
+INTERVALO_CALENDARIO = 6 * 60 * 60
+
+# Reintentos de cada precarga ante errores de la API
+MAX_REINTENTOS = 4
+ESPERA_REINTENTO = 5.0       # Segundos de la primera espera; se duplica en cada intento
+
+# Duración estimada de las sesiones que cambian los datos que muestra el bot
+DURACION_SESIONES = {
+    'Qualifying': timedelta(hours=1),
+    'Sprint': timedelta(hours=1),
+}
+
+# Nombre con el que se identifica la carrera entre las sesiones
+SESION_CARRERA = 'Race'
+
+
+class Precarga(NamedTuple):
+    instante: datetime       # Momento (UTC) en que toca precargar
+    sesion: str              # Sesión que acaba de terminar
+    carrera: Carrera
+
+
+def leer_retrasos(texto: Optional[str]) -> Sequence[int]:
+    """
+    Interpreta una lista de minutos separados por comas (p. ej. "10,30,90").
+
+    Args:
+        texto (str): Valor de la variable de entorno, o None
+
+    Returns:
+        tuple: Minutos ordenados, o los valores por defecto si el texto no es válido
+    """
+    if not texto:
+        return RETRASOS_PRECARGA
+    try:
+        retrasos = sorted(int(parte) for parte in texto.split(',') if parte.strip())
+    except ValueError:
+        logging.warning(f"Lista de retrasos de precarga no válida: '{texto}'")
+        return RETRASOS_PRECARGA
+    return tuple(retrasos) or RETRASOS_PRECARGA
+
+
+def calcular_precargas(carreras: Sequence[Carrera], retrasos: Sequence[int]) -> List[Precarga]:
+    """
+    Calcula los instantes de precarga de un calendario, ordenados en el tiempo.
+
+    Args:
+        carreras (list): Carreras de la temporada
+        retrasos (list): Minutos tras el final de cada sesión en los que precargar
+
+    Returns:
+        list: Precargas ordenadas por instante
+    """
+    precargas = []
+    for carrera in carreras:
+        finales = [(sesion, inicio + DURACION_SESIONES[sesion])
+                   for sesion, inicio in carrera.sesiones if sesion in DURACION_SESIONES]
+        if carrera.inicio is not None:
+            finales.append((SESION_CARRERA, carrera.inicio + DURACION_CARRERA))
+        for sesion, fin in finales:
+            for minutos in retrasos:
+                precargas.append(Precarga(fin + timedelta(minutes=minutos), sesion, carrera))
+    precargas.sort(key=lambda precarga: precarga.instante)
+    return precargas
+
+
+class PlanificadorPrecarga:
+    """
+    Tarea en segundo plano que mantiene caliente la caché de la temporada en curso.
+
+    Args:
+        cliente (ClienteErgast): Cliente de la API
+        cache (CacheErgast, opcional): Caché a invalidar antes de cada precarga
+        retrasos (list): Minutos tras el final de cada sesión en los que precargar
+        intervalo_calendario (float): Segundos máximos entre recargas del calendario
+        max_reintentos (int): Reintentos de cada precarga ante errores de la API
+        espera_reintento (float): Segundos de espera antes del primer reintento
+        tras_precarga (callable, opcional): Se espera tras descargar las clasificaciones y
+            los resultados (p. ej. para actualizar datos calculados a partir de ellos)
+    """
+
+    def __init__(self, cliente: ClienteErgast, cache: Optional[CacheErgast] = None,
+                 retrasos: Sequence[int] = RETRASOS_PRECARGA,
+                 intervalo_calendario: float = INTERVALO_CALENDARIO,
+                 max_reintentos: int = MAX_REINTENTOS, espera_reintento: float = ESPERA_REINTENTO,
+                 tras_precarga: Optional[Callable[[], Awaitable[object]]] = None):
+        self.cliente = cliente
+        self.tras_precarga = tras_precarga
+        self.cache = cache
+        self.retrasos = tuple(retrasos)
+        self.intervalo_calendario = intervalo_calendario
+        self.max_reintentos = max_reintentos
+        self.espera_reintento = espera_reintento
+        self.carreras: List[Carrera] = []
+        self._precargas: List[Precarga] = []
+        self._tarea: Optional[asyncio.Task] = None
+        # Las precargas anteriores a este instante ya se hicieron (o eran de antes de arrancar)
+        self._hecho_hasta = datetime.utcnow()
+        self.precargas_hechas = 0
+        self.fallos = 0
+
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+
+    def iniciar(self) -> None:
+        """
+        Arranca la tarea en segundo plano (no hace nada si ya está en marcha).
+        """
+        if not self.activo:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        """
+        Cancela la tarea en segundo plano y espera a que termine.
+        """
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+        self._tarea = None
+
+    def siguiente_precarga(self) -> Optional[Precarga]:
+        """
+        Devuelve la próxima precarga pendiente, si la hay.
+        """
+        for precarga in self._precargas:
+            if precarga.instante > self._hecho_hasta:
+                return precarga
+        return None
+
+    ###########################################################################
+    # Ejecución
+    ###########################################################################
+
+    async def _con_reintentos(self, descripcion: str, operacion: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Ejecuta una operación reintentándola con espera exponencial y aleatoria.
+
+        Returns:
+            bool: True si la operación terminó bien
+        """
+        for intento in range(self.max_reintentos + 1):
+            try:
+                await operacion()
+                return True
+            except (ErrorErgast, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if intento == self.max_reintentos:
+                    logging.error(f"Precarga de {descripcion} abandonada tras {intento + 1} intentos: {e}")
+                    break
+                # La parte aleatoria evita que varias instancias reintenten a la vez
+                espera = self.espera_reintento * 2 ** intento * random.uniform(0.5, 1.5)
+                logging.warning(f"Error en la precarga de {descripcion} ({e}); reintento en {espera:.1f} s")
+                await asyncio.sleep(espera)
+        self.fallos += 1
+        return False
+
+    async def _cargar_calendario(self) -> None:
+        """
+        Descarga el calendario de la temporada en curso y recalcula las precargas.
+        """
+        self.carreras = await self.cliente.carreras(str(temporada_actual()))
+        self._precargas = calcular_precargas(self.carreras, self.retrasos)
+
+    async def _calentar(self) -> None:
+        """
+        Descarga las clasificaciones de la temporada en curso y los resultados de la
+        última carrera disputada, y después ejecuta `tras_precarga`, si se indicó.
+        """
+        await self.cliente.clasificacion_pilotos('current')
+        await self.cliente.clasificacion_constructores('current')
+        ahora = datetime.utcnow()
+        disputadas = [c for c in self.carreras if c.inicio is not None and c.inicio + DURACION_CARRERA <= ahora]
+        if disputadas:
+            ultima = disputadas[-1]
+            await self.cliente.resultados(str(ultima.temporada), ultima.circuito.id)
+        if self.tras_precarga is not None:
+            await self.tras_precarga()
+
+    async def _precargar(self, precarga: Precarga) -> None:
+        """
+        Vuelve a descargar los datos que cambian al terminar una sesión.
+        """
+        # Lo guardado hasta ahora de la temporada está desfasado
+        if self.cache is not None:
+            self.cache.invalidar_temporada(precarga.carrera.temporada)
+        await self._con_reintentos('calendario', self._cargar_calendario)
+        # Tras la clasificación sólo cambia la parrilla: basta con el calendario
+        if precarga.sesion != 'Qualifying':
+            await self._con_reintentos('clasificaciones', self._calentar)
+        self.precargas_hechas += 1
+        logging.info(f"Precarga tras {precarga.sesion} de {precarga.carrera.nombre} completada")
+
+    async def _bucle(self) -> None:
+        """
+        Bucle principal: calienta la caché al arrancar y después espera a cada precarga.
+        """
+        await self._con_reintentos('calendario', self._cargar_calendario)
+        await self._con_reintentos('clasificaciones', self._calentar)
+        ultima_carga = datetime.utcnow()
+        while True:
+            ahora = datetime.utcnow()
+            recarga = ultima_carga + timedelta(seconds=self.intervalo_calendario)
+            precarga = self.siguiente_precarga()
+            if precarga is not None and precarga.instante <= recarga:
+                await asyncio.sleep(max(0.0, (precarga.instante - ahora).total_seconds()))
+                self._hecho_hasta = precarga.instante
+                await self._precargar(precarga)
+            else:
+                await asyncio.sleep(max(0.0, (recarga - ahora).total_seconds()))
+                # Puede haber cambiado la temporada o el calendario
+                await self._con_reintentos('calendario', self._cargar_calendario)
+            ultima_carga = datetime.utcnow()
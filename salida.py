@@ -0,0 +1,364 @@
+###############################################################################
+# Capa de salida: envíos a Discord por canal, con prioridad y agrupados
+#
+# Todo lo que el bot manda a un canal pasa por una cola propia de ese canal
+# que respeta su límite de mensajes (así no se provocan respuestas 429) y
+# atiende antes las respuestas que los mensajes de espera. Además:
+# - Los embeds de una respuesta se agrupan en el menor número de mensajes
+#   posible (hasta 10 embeds y 6000 caracteres por mensaje).
+# - La respuesta final edita el mensaje de "Buscando..." en lugar de publicar
+#   otro; si ese mensaje aún no había salido, ya no se envía.
+# - Si en un canal ya espera turno la misma respuesta, no se repite: quien la
+#   pidió después recibe el mismo mensaje.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Colas y trabajadores por canal
+import heapq                 # Cola de prioridad de cada canal
+import itertools             # Orden de llegada para desempatar prioridades
+import logging               # Para registro de eventos y errores
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import discord               # Biblioteca principal para interactuar con Discord
+
+from enfriamiento import anotar_respuesta
+from limitador import CuboTokens
+from metricas import REGISTRO
+
+# Límite de mensajes por canal que aplica Discord: (capacidad, periodo en segundos)
+LIMITE_CANAL = (5, 5.0)
+
+# Límites de Discord para un único mensaje
+MAX_EMBEDS_MENSAJE = 10
+MAX_CARACTERES_MENSAJE = 6000
+
+# Prioridades (menor sale antes)
+PRIORIDAD_RESPUESTA = 0
+PRIORIDAD_MARCADOR = 1
+PRIORIDAD_AVISO = 2
+
+# Mensajes pendientes por canal a partir de los cuales se descartan los menos prioritarios
+MAX_PENDIENTES_CANAL = 50
+
+envios_salida = REGISTRO.contador(
+    'f1bot_salida_mensajes_total', 'Mensajes de salida por resultado', ('resultado',))
+
+
+def agrupar_embeds(embeds: Sequence[discord.Embed]) -> List[List[discord.Embed]]:
+    """
+    Reparte los embeds de una respuesta en mensajes que respetan los límites de Discord.
+
+    Args:
+        embeds (list): Embeds en el orden en que deben mostrarse
+
+    Returns:
+        list: Grupos de embeds, uno por mensaje
+    """
+    grupos: List[List[discord.Embed]] = []
+    actual: List[discord.Embed] = []
+    caracteres = 0
+    for embed in embeds:
+        tamaño = len(embed)
+        if actual and (len(actual) == MAX_EMBEDS_MENSAJE or caracteres + tamaño > MAX_CARACTERES_MENSAJE):
+            grupos.append(actual)
+            actual, caracteres = [], 0
+        actual.append(embed)
+        caracteres += tamaño
+    if actual:
+        grupos.append(actual)
+    return grupos
+
+
+class DestinoCanal:
+    """
+    Canal al que se envían mensajes que no responden a ningún comando (p. ej. las
+    publicaciones del modo en directo), con la misma interfaz que un contexto.
+
+    Args:
+        canal: Canal de Discord
+    """
+
+    __slots__ = ('channel',)
+    interaction = None
+
+    def __init__(self, canal: Any):
+        self.channel = canal
+
+    async def send(self, **argumentos: Any) -> discord.Message:
+        return await self.channel.send(**argumentos)
+
+
+class Envio:
+    """
+    Mensaje pendiente de salir por un canal.
+
+    Args:
+        ctx: Contexto del comando (o cualquier objeto con `send`)
+        argumentos (dict): Argumentos de `send`
+        prioridad (int): Prioridad del mensaje (menor sale antes)
+        clave: Identifica respuestas iguales para no repetirlas (None si no se fusiona)
+        reemplaza (Envio): Mensaje de espera que esta respuesta debe sustituir
+    """
+
+    __slots__ = ('ctx', 'argumentos', 'prioridad', 'clave', 'reemplaza', 'futuro', 'esperando')
+
+    def __init__(self, ctx: Any, argumentos: Dict[str, Any], prioridad: int, clave: Optional[Hashable],
+                 reemplaza: Optional["Envio"]):
+        self.ctx = ctx
+        self.argumentos = argumentos
+        self.prioridad = prioridad
+        self.clave = clave
+        self.reemplaza = reemplaza
+        self.futuro: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.esperando = True
+
+    def cancelar(self) -> None:
+        """
+        Retira el mensaje de la cola sin enviarlo.
+        """
+        self.esperando = False
+        if not self.futuro.done():
+            self.futuro.set_result(None)
+
+
+class ColaSalida:
+    """
+    Colas de salida por canal con límite de envíos, prioridades y fusión de duplicados.
+
+    Args:
+        limite (tuple): (capacidad, periodo en segundos) del límite de cada canal
+        max_pendientes (int): Mensajes pendientes por canal antes de descartar los menos prioritarios
+    """
+
+    def __init__(self, limite: Tuple[int, float] = LIMITE_CANAL, max_pendientes: int = MAX_PENDIENTES_CANAL):
+        self.limite = limite
+        self.max_pendientes = max_pendientes
+        self._colas: Dict[Hashable, List[Tuple[int, int, Envio]]] = {}
+        self._cubos: Dict[Hashable, CuboTokens] = {}
+        self._trabajadores: Dict[Hashable, asyncio.Task] = {}
+        self._orden = itertools.count()
+
+    @property
+    def pendientes(self) -> int:
+        return sum(len(cola) for cola in self._colas.values())
+
+    @staticmethod
+    def _canal(ctx: Any) -> Tuple[Hashable, bool]:
+        """
+        Clave de la cola de un contexto y si se le aplica el límite del canal.
+
+        Las respuestas a una interacción (comandos de barra) no cuentan para el
+        límite del canal, así que tienen su propia cola sin límite.
+        """
+        interaccion = getattr(ctx, 'interaction', None)
+        if interaccion is not None:
+            return ('interaccion', interaccion.id), False
+        return ctx.channel.id, True
+
+    def encolar(self, ctx: Any, content: Optional[str] = None, *, prioridad: int = PRIORIDAD_RESPUESTA,
+                clave: Optional[Hashable] = None, reemplaza: Optional[Envio] = None, **argumentos: Any) -> Envio:
+        """
+        Pone un mensaje en la cola de su canal sin esperar a que salga.
+
+        Args:
+            ctx: Contexto del comando
+            content (str): Texto del mensaje
+            prioridad (int): PRIORIDAD_RESPUESTA, PRIORIDAD_MARCADOR o PRIORIDAD_AVISO
+            clave: Identifica la respuesta para fusionarla con otra igual pendiente en el canal
+            reemplaza (Envio): Mensaje de espera que se edita (o se descarta si aún no salió)
+            **argumentos: Resto de argumentos de `send` (embeds, view...)
+
+        Returns:
+            Envio: Mensaje encolado, o el pendiente con el que se ha fusionado
+        """
+        if content is not None:
+            argumentos['content'] = content
+        canal, limitado = self._canal(ctx)
+        cola = self._colas.setdefault(canal, [])
+
+        # La misma respuesta ya espera turno en el canal: se comparte en lugar de repetirla
+        if clave is not None:
+            for _, _, pendiente in cola:
+                if pendiente.clave == clave and pendiente.esperando:
+                    envios_salida.inc(resultado='fusionado')
+                    vista = argumentos.get('view')
+                    if vista is not None:
+                        vista.stop()
+                    if reemplaza is not None:
+                        self._retirar_marcador(reemplaza)
+                    return pendiente
+
+        # Si el mensaje de espera aún no ha salido, la respuesta ocupa su lugar
+        if reemplaza is not None and reemplaza.esperando:
+            reemplaza.cancelar()
+            envios_salida.inc(resultado='sustituido')
+            reemplaza = None
+
+        envio = Envio(ctx, argumentos, prioridad, clave, reemplaza)
+        heapq.heappush(cola, (prioridad, next(self._orden), envio))
+        self._descartar_exceso(cola)
+        if limitado and canal not in self._cubos:
+            self._cubos[canal] = CuboTokens(*self.limite)
+        if canal not in self._trabajadores:
+            self._trabajadores[canal] = asyncio.create_task(self._trabajar(canal))
+        return envio
+
+    async def enviar(self, ctx: Any, content: Optional[str] = None, **argumentos: Any) -> Optional[discord.Message]:
+        """
+        Encola un mensaje y espera a que salga (mismos argumentos que `encolar`).
+
+        Returns:
+            Message: Mensaje enviado o editado, None si se descartó
+        """
+        # Sin nada pendiente en el canal y con turno libre, se envía directamente sin pasar por la cola
+        canal, limitado = self._canal(ctx)
+        if canal not in self._colas and self._turno_libre(canal, limitado):
+            reemplaza = argumentos.pop('reemplaza', None)
+            argumentos.pop('prioridad', None)
+            argumentos.pop('clave', None)
+            if content is not None:
+                argumentos['content'] = content
+            envio = Envio(ctx, argumentos, PRIORIDAD_RESPUESTA, None, reemplaza)
+            envio.esperando = False
+            try:
+                mensaje = await self._realizar(envio)
+            except Exception:
+                envios_salida.inc(resultado='error')
+                raise
+        else:
+            envio = self.encolar(ctx, content, **argumentos)
+            # El futuro puede ser compartido por varias peticiones: cancelar una no debe cancelarlo
+            mensaje = await asyncio.shield(envio.futuro)
+        # Primer mensaje de la invocación: al que se enlaza si otro usuario repite la consulta
+        anotar_respuesta(mensaje)
+        return mensaje
+
+    async def enviar_embeds(self, ctx: Any, embeds: Sequence[discord.Embed], *, clave: Optional[Hashable] = None,
+                            reemplaza: Optional[Envio] = None, prioridad: int = PRIORIDAD_RESPUESTA,
+                            content: Optional[str] = None) -> None:
+        """
+        Envía los embeds de una respuesta en el menor número de mensajes posible.
+
+        El primer mensaje sustituye al de espera (`reemplaza`), si lo hay, y lleva el texto (`content`).
+        """
+        for numero, grupo in enumerate(agrupar_embeds(embeds)):
+            await self.enviar(ctx, content if numero == 0 else None, embeds=grupo, prioridad=prioridad,
+                              clave=(clave, numero) if clave is not None else None,
+                              reemplaza=reemplaza if numero == 0 else None)
+
+    def _turno_libre(self, canal: Hashable, limitado: bool) -> bool:
+        """
+        Consume un turno del canal si lo hay en este momento.
+        """
+        if not limitado:
+            return True
+        cubo = self._cubos.get(canal)
+        if cubo is None:
+            cubo = self._cubos[canal] = CuboTokens(*self.limite)
+            asyncio.get_running_loop().call_later(self.limite[1], self._olvidar_cubo, canal)
+        if cubo.espera_necesaria() > 0:
+            return False
+        cubo.consumir()
+        return True
+
+    def _retirar_marcador(self, marcador: Envio) -> None:
+        """
+        Quita un mensaje de espera que ya no hace falta: si no ha salido, no sale; si salió, se borra.
+        """
+        if marcador.esperando:
+            marcador.cancelar()
+            return
+
+        async def borrar() -> None:
+            mensaje = await asyncio.shield(marcador.futuro)
+            if mensaje is not None:
+                try:
+                    await mensaje.delete()
+                except discord.HTTPException as e:
+                    logging.debug(f"No se pudo borrar el mensaje de espera: {e}")
+
+        asyncio.create_task(borrar())
+
+    def _descartar_exceso(self, cola: List[Tuple[int, int, Envio]]) -> None:
+        """
+        Con demasiados mensajes pendientes, descarta los menos prioritarios (nunca respuestas).
+        """
+        while len(cola) > self.max_pendientes:
+            peor = max(cola)
+            if peor[0] == PRIORIDAD_RESPUESTA:
+                return
+            cola.remove(peor)
+            heapq.heapify(cola)
+            peor[2].cancelar()
+            envios_salida.inc(resultado='descartado')
+
+    async def _trabajar(self, canal: Hashable) -> None:
+        """
+        Envía por orden de prioridad los mensajes de un canal, respetando su límite.
+        """
+        cola = self._colas[canal]
+        try:
+            while cola:
+                # Los mensajes descartados o sustituidos no gastan turno
+                if not cola[0][2].esperando:
+                    heapq.heappop(cola)
+                    continue
+                cubo = self._cubos.get(canal)
+                if cubo is not None:
+                    espera = cubo.espera_necesaria()
+                    if espera > 0:
+                        await asyncio.sleep(espera)
+                        continue
+                _, _, envio = heapq.heappop(cola)
+                envio.esperando = False
+                if cubo is not None:
+                    cubo.consumir()
+                try:
+                    envio.futuro.set_result(await self._realizar(envio))
+                except Exception as e:
+                    envios_salida.inc(resultado='error')
+                    envio.futuro.set_exception(e)
+                    # Evita el aviso de excepción no recuperada si ya nadie espera el futuro
+                    envio.futuro.exception()
+        finally:
+            del self._trabajadores[canal]
+            if not cola:
+                del self._colas[canal]
+            # El cubo se olvida cuando ya se ha repuesto del todo
+            if canal in self._cubos:
+                asyncio.get_running_loop().call_later(self.limite[1], self._olvidar_cubo, canal)
+
+    def _olvidar_cubo(self, canal: Hashable) -> None:
+        """
+        Libera el cubo de un canal inactivo; si aún se está reponiendo, lo vuelve a intentar más tarde.
+        """
+        cubo = self._cubos.get(canal)
+        if cubo is None or canal in self._trabajadores:
+            return
+        if cubo.lleno():
+            del self._cubos[canal]
+        else:
+            asyncio.get_running_loop().call_later(self.limite[1], self._olvidar_cubo, canal)
+
+    async def _realizar(self, envio: Envio) -> Optional[discord.Message]:
+        """
+        Envía un mensaje o, si sustituye a uno de espera ya enviado, lo edita.
+        """
+        if envio.reemplaza is not None:
+            try:
+                anterior = await envio.reemplaza.futuro
+            except Exception:
+                anterior = None
+            if anterior is not None:
+                cambios = dict(envio.argumentos)
+                cambios.setdefault('content', None)
+                try:
+                    await anterior.edit(**cambios)
+                    envios_salida.inc(resultado='editado')
+                    return anterior
+                except discord.HTTPException as e:
+                    logging.warning(f"No se pudo editar el mensaje de espera, se envía uno nuevo: {e}")
+        mensaje = await envio.ctx.send(**envio.argumentos)
+        envios_salida.inc(resultado='enviado')
+        return mensaje
@@ -0,0 +1,642 @@
+###############################################################################
+# Copia local de los datos de F1 (snapshot) y consultas sin conexión
+#
+# Descarga en una base de datos SQLite las temporadas, carreras, resultados
+# (también los de las sprint), clasificaciones, pilotos, constructores y
+# circuitos de la API Ergast. El cliente de la API consulta primero esta
+# copia, de modo que las temporadas ya terminadas se responden sin red
+# aunque la API esté caída.
+#
+# Uso:
+#   python snapshot.py descargar --ruta f1.sqlite [--desde 1950] [--hasta 2024]
+#   python snapshot.py actualizar --ruta f1.sqlite
+#   python snapshot.py comprobar --ruta f1.sqlite --desde 2020 --hasta 2021
+###############################################################################
+
+from __future__ import annotations
+
+import argparse              # Para la línea de comandos
+import asyncio               # Para ejecutar la descarga asíncrona
+import logging               # Para registro de eventos y errores
+import sqlite3               # Almacén local
+import time                  # Marca de tiempo de cada actualización
+from typing import Any, Dict, List, Optional
+
+from cache import temporada_actual
+from ergast import (PRIMERA_TEMPORADA_SPRINT, ClienteErgast, ErrorErgast, extraer_carreras, extraer_circuitos, extraer_constructores,
+                    extraer_listas_clasificacion, extraer_pilotos)
+from limitador import LimitadorPeticiones
+from modelos import Resultado
+
+# Primera temporada del campeonato del mundo
+PRIMERA_TEMPORADA = 1950
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS temporadas (
+    año INTEGER PRIMARY KEY,
+    completa INTEGER NOT NULL,
+    actualizada REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS circuitos (
+    circuito_id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    localidad TEXT,
+    pais TEXT
+);
+CREATE TABLE IF NOT EXISTS pilotos (
+    piloto_id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    apellido TEXT NOT NULL,
+    fecha_nacimiento TEXT,
+    nacionalidad TEXT,
+    codigo TEXT,
+    numero TEXT
+);
+CREATE TABLE IF NOT EXISTS constructores (
+    constructor_id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nacionalidad TEXT
+);
+CREATE TABLE IF NOT EXISTS carreras (
+    año INTEGER NOT NULL,
+    ronda INTEGER NOT NULL,
+    nombre TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    hora TEXT,
+    circuito_id TEXT NOT NULL,
+    PRIMARY KEY (año, ronda)
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    año INTEGER NOT NULL,
+    ronda INTEGER NOT NULL,
+    orden INTEGER NOT NULL,
+    posicion TEXT NOT NULL,
+    piloto_id TEXT NOT NULL,
+    constructor_id TEXT NOT NULL,
+    puntos TEXT,
+    parrilla TEXT,
+    vueltas TEXT,
+    estado TEXT,
+    tiempo TEXT,
+    PRIMARY KEY (año, ronda, orden)
+);
+CREATE INDEX IF NOT EXISTS resultados_piloto ON resultados (piloto_id);
+CREATE TABLE IF NOT EXISTS sprints (
+    año INTEGER NOT NULL,
+    ronda INTEGER NOT NULL,
+    orden INTEGER NOT NULL,
+    posicion TEXT NOT NULL,
+    piloto_id TEXT NOT NULL,
+    constructor_id TEXT NOT NULL,
+    puntos TEXT,
+    parrilla TEXT,
+    vueltas TEXT,
+    estado TEXT,
+    tiempo TEXT,
+    PRIMARY KEY (año, ronda, orden)
+);
+CREATE TABLE IF NOT EXISTS clasificacion_pilotos (
+    año INTEGER NOT NULL,
+    ronda INTEGER NOT NULL,
+    posicion TEXT NOT NULL,
+    piloto_id TEXT NOT NULL,
+    puntos TEXT,
+    victorias TEXT,
+    constructores TEXT,
+    PRIMARY KEY (año, piloto_id)
+);
+CREATE TABLE IF NOT EXISTS clasificacion_constructores (
+    año INTEGER NOT NULL,
+    ronda INTEGER NOT NULL,
+    posicion TEXT NOT NULL,
+    constructor_id TEXT NOT NULL,
+    puntos TEXT,
+    victorias TEXT,
+    PRIMARY KEY (año, constructor_id)
+);
+'''
+
+
+def conectar(ruta: str) -> sqlite3.Connection:
+    """
+    Abre (o crea) la base de datos del snapshot con su esquema.
+
+    Args:
+        ruta (str): Fichero SQLite
+
+    Returns:
+        sqlite3.Connection: Conexión abierta
+    """
+    conexion = sqlite3.connect(ruta)
+    conexion.row_factory = sqlite3.Row
+    conexion.execute('PRAGMA journal_mode=WAL')
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+
+###############################################################################
+# CONSULTAS SIN CONEXIÓN
+###############################################################################
+
+class SnapshotF1:
+    """
+    Consultas sobre la copia local con la misma forma que las respuestas de la API.
+
+    Cada método devuelve None cuando la copia no cubre la consulta (por ejemplo,
+    la temporada en curso), para que el llamador recurra a la red.
+    """
+
+    def __init__(self, conexion: sqlite3.Connection):
+        self._conexion = conexion
+        self._completas = set()
+        self.recargar()
+
+    @classmethod
+    def abrir(cls, ruta: str) -> "SnapshotF1":
+        """
+        Abre un snapshot existente.
+
+        Args:
+            ruta (str): Fichero SQLite generado con `python snapshot.py descargar`
+        """
+        return cls(conectar(ruta))
+
+    def recargar(self) -> None:
+        """
+        Vuelve a leer qué temporadas están completas (tras una actualización).
+        """
+        filas = self._conexion.execute('SELECT año FROM temporadas WHERE completa = 1')
+        self._completas = {fila['año'] for fila in filas}
+
+    def cerrar(self) -> None:
+        self._conexion.close()
+
+    def cubre(self, año: Any) -> bool:
+        """
+        Indica si la copia local tiene una temporada completa y definitiva.
+
+        Args:
+            año: Año de la temporada (str o int); "current" nunca está cubierta
+        """
+        return str(año).isdigit() and int(año) in self._completas
+
+    ###########################################################################
+    # Conversión de filas al formato de la API
+    ###########################################################################
+
+    @staticmethod
+    def _circuito(fila: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'circuitId': fila['circuito_id'],
+            'circuitName': fila['circuito_nombre'],
+            'Location': {'locality': fila['localidad'], 'country': fila['pais']},
+        }
+
+    @staticmethod
+    def _piloto(fila: sqlite3.Row) -> Dict[str, Any]:
+        piloto = {
+            'driverId': fila['piloto_id'],
+            'givenName': fila['nombre'],
+            'familyName': fila['apellido'],
+            'dateOfBirth': fila['fecha_nacimiento'],
+            'nationality': fila['nacionalidad'],
+        }
+        if fila['codigo']:
+            piloto['code'] = fila['codigo']
+        if fila['numero']:
+            piloto['permanentNumber'] = fila['numero']
+        return piloto
+
+    @staticmethod
+    def _constructor(fila: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'constructorId': fila['constructor_id'],
+            'name': fila['constructor_nombre'],
+            'nationality': fila['constructor_nacionalidad'],
+        }
+
+    @classmethod
+    def _resultado(cls, fila: sqlite3.Row) -> Dict[str, Any]:
+        resultado = {
+            'position': fila['posicion'],
+            'points': fila['puntos'],
+            'grid': fila['parrilla'],
+            'laps': fila['vueltas'],
+            'status': fila['estado'],
+            'Driver': cls._piloto(fila),
+            'Constructor': cls._constructor(fila),
+        }
+        if fila['tiempo']:
+            resultado['Time'] = {'time': fila['tiempo']}
+        return resultado
+
+    ###########################################################################
+    # Consultas equivalentes a las del cliente de la API
+    ###########################################################################
+
+    def todos_los_circuitos(self) -> Optional[List[Dict[str, Any]]]:
+        filas = self._conexion.execute(
+            'SELECT circuito_id, nombre AS circuito_nombre, localidad, pais FROM circuitos'
+        ).fetchall()
+        return [self._circuito(f) for f in filas] or None
+
+    def todos_los_pilotos(self) -> Optional[List[Dict[str, Any]]]:
+        filas = self._conexion.execute('SELECT * FROM pilotos').fetchall()
+        return [self._piloto(f) for f in filas] or None
+
+    def circuitos(self, año: Any) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        filas = self._conexion.execute(
+            'SELECT DISTINCT c.circuito_id, c.nombre AS circuito_nombre, c.localidad, c.pais '
+            'FROM carreras r JOIN circuitos c ON c.circuito_id = r.circuito_id WHERE r.año = ?',
+            (int(año),),
+        ).fetchall()
+        return [self._circuito(f) for f in filas]
+
+    def carreras(self, año: Any) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        filas = self._conexion.execute(
+            'SELECT r.año, r.ronda, r.nombre, r.fecha, r.hora, c.circuito_id, '
+            'c.nombre AS circuito_nombre, c.localidad, c.pais '
+            'FROM carreras r JOIN circuitos c ON c.circuito_id = r.circuito_id '
+            'WHERE r.año = ? ORDER BY r.ronda',
+            (int(año),),
+        ).fetchall()
+        carreras = []
+        for fila in filas:
+            carrera = {
+                'season': str(fila['año']),
+                'round': str(fila['ronda']),
+                'raceName': fila['nombre'],
+                'date': fila['fecha'],
+                'Circuit': self._circuito(fila),
+            }
+            if fila['hora']:
+                carrera['time'] = fila['hora']
+            carreras.append(carrera)
+        return carreras
+
+    def resultados(self, año: Any, circuito_id: str) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        # Como la API: si en el circuito hubo dos carreras ese año, sólo la primera
+        filas = self._conexion.execute(
+            'SELECT s.posicion, s.puntos, s.parrilla, s.vueltas, s.estado, s.tiempo, '
+            'p.piloto_id, p.nombre, p.apellido, p.fecha_nacimiento, p.nacionalidad, p.codigo, p.numero, '
+            'k.constructor_id, k.nombre AS constructor_nombre, k.nacionalidad AS constructor_nacionalidad '
+            'FROM carreras r '
+            'JOIN resultados s ON s.año = r.año AND s.ronda = r.ronda '
+            'JOIN pilotos p ON p.piloto_id = s.piloto_id '
+            'JOIN constructores k ON k.constructor_id = s.constructor_id '
+            'WHERE r.año = ? AND r.ronda = (SELECT MIN(ronda) FROM carreras WHERE año = ? AND circuito_id = ?) '
+            'ORDER BY s.orden',
+            (int(año), int(año), circuito_id),
+        ).fetchall()
+        if not filas:
+            return None
+        return [self._resultado(fila) for fila in filas]
+
+    def resultados_temporada(self, año: Any) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        return self._carreras_con_resultados(int(año), 'resultados', 'Results')
+
+    def sprints_temporada(self, año: Any) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        carreras = self._carreras_con_resultados(int(año), 'sprints', 'SprintResults')
+        # Las copias anteriores a la tabla de sprints no los tienen: se piden a la API
+        if not carreras and int(año) >= PRIMERA_TEMPORADA_SPRINT:
+            return None
+        return carreras
+
+    def _carreras_con_resultados(self, año: int, tabla: str, clave: str) -> List[Dict[str, Any]]:
+        filas = self._conexion.execute(
+            'SELECT r.ronda, r.nombre AS carrera_nombre, r.fecha, r.hora, c.circuito_id, '
+            'c.nombre AS circuito_nombre, c.localidad, c.pais, '
+            's.posicion, s.puntos, s.parrilla, s.vueltas, s.estado, s.tiempo, '
+            'p.piloto_id, p.nombre, p.apellido, p.fecha_nacimiento, p.nacionalidad, p.codigo, p.numero, '
+            'k.constructor_id, k.nombre AS constructor_nombre, k.nacionalidad AS constructor_nacionalidad '
+            'FROM carreras r '
+            'JOIN circuitos c ON c.circuito_id = r.circuito_id '
+            f'JOIN {tabla} s ON s.año = r.año AND s.ronda = r.ronda '
+            'JOIN pilotos p ON p.piloto_id = s.piloto_id '
+            'JOIN constructores k ON k.constructor_id = s.constructor_id '
+            'WHERE r.año = ? ORDER BY r.ronda, s.orden',
+            (año,),
+        ).fetchall()
+        carreras: List[Dict[str, Any]] = []
+        for fila in filas:
+            if not carreras or carreras[-1]['round'] != str(fila['ronda']):
+                carrera = {
+                    'season': str(año),
+                    'round': str(fila['ronda']),
+                    'raceName': fila['carrera_nombre'],
+                    'date': fila['fecha'],
+                    'Circuit': self._circuito(fila),
+                    clave: [],
+                }
+                if fila['hora']:
+                    carrera['time'] = fila['hora']
+                carreras.append(carrera)
+            carreras[-1][clave].append(self._resultado(fila))
+        return carreras
+
+    def temporadas_piloto(self, piloto_id: str) -> Optional[List[int]]:
+        filas = self._conexion.execute(
+            'SELECT DISTINCT año FROM resultados WHERE piloto_id = ? ORDER BY año', (piloto_id,)
+        ).fetchall()
+        return [fila['año'] for fila in filas if fila['año'] in self._completas] or None
+
+    def piloto(self, piloto_id: str) -> Optional[Dict[str, Any]]:
+        fila = self._conexion.execute('SELECT * FROM pilotos WHERE piloto_id = ?', (piloto_id,)).fetchone()
+        return self._piloto(fila) if fila else None
+
+    def clasificacion_pilotos(self, año: Any) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        filas = self._conexion.execute(
+            'SELECT c.posicion, c.puntos, c.victorias, c.constructores, p.* '
+            'FROM clasificacion_pilotos c JOIN pilotos p ON p.piloto_id = c.piloto_id '
+            'WHERE c.año = ? ORDER BY CAST(c.posicion AS INTEGER)',
+            (int(año),),
+        ).fetchall()
+        constructores = self._constructores_por_id()
+        clasificacion = []
+        for fila in filas:
+            clasificacion.append({
+                'position': fila['posicion'],
+                'points': fila['puntos'],
+                'wins': fila['victorias'],
+                'Driver': self._piloto(fila),
+                'Constructors': [constructores[c] for c in (fila['constructores'] or '').split(',')
+                                 if c in constructores],
+            })
+        return clasificacion
+
+    def clasificacion_constructores(self, año: Any) -> Optional[List[Dict[str, Any]]]:
+        if not self.cubre(año):
+            return None
+        filas = self._conexion.execute(
+            'SELECT c.posicion, c.puntos, c.victorias, k.constructor_id, '
+            'k.nombre AS constructor_nombre, k.nacionalidad AS constructor_nacionalidad '
+            'FROM clasificacion_constructores c JOIN constructores k ON k.constructor_id = c.constructor_id '
+            'WHERE c.año = ? ORDER BY CAST(c.posicion AS INTEGER)',
+            (int(año),),
+        ).fetchall()
+        return [{
+            'position': fila['posicion'],
+            'points': fila['puntos'],
+            'wins': fila['victorias'],
+            'Constructor': self._constructor(fila),
+        } for fila in filas]
+
+    def _constructores_por_id(self) -> Dict[str, Dict[str, Any]]:
+        filas = self._conexion.execute(
+            'SELECT constructor_id, nombre AS constructor_nombre, nacionalidad AS constructor_nacionalidad '
+            'FROM constructores'
+        )
+        return {fila['constructor_id']: self._constructor(fila) for fila in filas}
+
+
+###############################################################################
+# DESCARGA Y ACTUALIZACIÓN
+###############################################################################
+
+class DescargadorSnapshot:
+    """
+    Descarga los datos de la API Ergast en la base de datos del snapshot.
+
+    Args:
+        cliente (ClienteErgast): Cliente de la API (sin caché ni snapshot, con limitador)
+        conexion (sqlite3.Connection): Conexión abierta con `conectar()`
+    """
+
+    def __init__(self, cliente: ClienteErgast, conexion: sqlite3.Connection):
+        self.cliente = cliente
+        self.conexion = conexion
+
+    def _guardar_pilotos(self, pilotos: List[Dict[str, Any]]) -> None:
+        self.conexion.executemany(
+            'INSERT OR REPLACE INTO pilotos VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(p['driverId'], p.get('givenName', ''), p.get('familyName', ''), p.get('dateOfBirth'),
+              p.get('nationality'), p.get('code'), p.get('permanentNumber')) for p in pilotos],
+        )
+
+    def _guardar_constructores(self, constructores: List[Dict[str, Any]]) -> None:
+        self.conexion.executemany(
+            'INSERT OR REPLACE INTO constructores VALUES (?, ?, ?)',
+            [(c['constructorId'], c.get('name', ''), c.get('nationality')) for c in constructores],
+        )
+
+    def _guardar_circuitos(self, circuitos: List[Dict[str, Any]]) -> None:
+        self.conexion.executemany(
+            'INSERT OR REPLACE INTO circuitos VALUES (?, ?, ?, ?)',
+            [(c['circuitId'], c.get('circuitName', ''), c.get('Location', {}).get('locality'),
+              c.get('Location', {}).get('country')) for c in circuitos],
+        )
+
+    async def descargar_catalogos(self, prefijo: str = '') -> None:
+        """
+        Descarga pilotos, constructores y circuitos.
+
+        Args:
+            prefijo (str): "" para todo el histórico o "{año}/" para los de una temporada
+        """
+        pilotos = await self.cliente.listar(f'{prefijo}drivers', extraer_pilotos)
+        constructores = await self.cliente.listar(f'{prefijo}constructors', extraer_constructores)
+        circuitos = await self.cliente.listar(f'{prefijo}circuits', extraer_circuitos)
+        with self.conexion:
+            self._guardar_pilotos(pilotos)
+            self._guardar_constructores(constructores)
+            self._guardar_circuitos(circuitos)
+        logging.info(f"Catálogos guardados: {len(pilotos)} pilotos, {len(constructores)} constructores, "
+                     f"{len(circuitos)} circuitos")
+
+    async def _descargar_resultados(self, año: int, endpoint: str, clave: str, pilotos: Dict[str, Any],
+                                    constructores: Dict[str, Any]) -> List[tuple]:
+        """
+        Descarga los resultados de carrera (o de sprint) de una temporada como filas de la tabla.
+
+        Los resultados se procesan página a página; una carrera puede quedar
+        repartida entre dos páginas, por eso se numeran por ronda.
+        """
+        filas = []
+        orden_por_ronda: Dict[int, int] = {}
+        async for carrera in self.cliente.paginar(f'{año}/{endpoint}', extraer_carreras):
+            ronda = int(carrera['round'])
+            for resultado in carrera.get(clave, []):
+                orden = orden_por_ronda.get(ronda, 0)
+                orden_por_ronda[ronda] = orden + 1
+                piloto, constructor = resultado['Driver'], resultado['Constructor']
+                pilotos[piloto['driverId']] = piloto
+                constructores[constructor['constructorId']] = constructor
+                filas.append((
+                    año, ronda, orden, resultado.get('position', ''), piloto['driverId'],
+                    constructor['constructorId'], resultado.get('points'), resultado.get('grid'),
+                    resultado.get('laps'), resultado.get('status'), (resultado.get('Time') or {}).get('time'),
+                ))
+        return filas
+
+    async def descargar_temporada(self, año: int) -> None:
+        """
+        Descarga (o vuelve a descargar) todos los datos de una temporada.
+
+        Args:
+            año (int): Año de la temporada
+        """
+        carreras = await self.cliente.listar(f'{año}/races', extraer_carreras)
+        listas_pilotos = await self.cliente.listar(f'{año}/driverStandings', extraer_listas_clasificacion)
+        listas_constructores = await self.cliente.listar(f'{año}/constructorStandings', extraer_listas_clasificacion)
+
+        pilotos, constructores = {}, {}
+        filas_resultados = await self._descargar_resultados(año, 'results', 'Results', pilotos, constructores)
+        filas_sprints = []
+        if año >= PRIMERA_TEMPORADA_SPRINT:
+            filas_sprints = await self._descargar_resultados(año, 'sprint', 'SprintResults', pilotos, constructores)
+
+        filas_pilotos = []
+        for lista in listas_pilotos:
+            for fila in lista.get('DriverStandings', []):
+                pilotos[fila['Driver']['driverId']] = fila['Driver']
+                for constructor in fila.get('Constructors', []):
+                    constructores[constructor['constructorId']] = constructor
+                filas_pilotos.append((
+                    año, int(lista.get('round', 0)), fila.get('position', fila.get('positionText', '-')),
+                    fila['Driver']['driverId'], fila.get('points'), fila.get('wins'),
+                    ','.join(c['constructorId'] for c in fila.get('Constructors', [])),
+                ))
+
+        filas_constructores = []
+        for lista in listas_constructores:
+            for fila in lista.get('ConstructorStandings', []):
+                constructores[fila['Constructor']['constructorId']] = fila['Constructor']
+                filas_constructores.append((
+                    año, int(lista.get('round', 0)), fila.get('position', fila.get('positionText', '-')),
+                    fila['Constructor']['constructorId'], fila.get('points'), fila.get('wins'),
+                ))
+
+        # Reemplazar la temporada en una única transacción
+        with self.conexion:
+            for tabla in ('carreras', 'resultados', 'sprints', 'clasificacion_pilotos', 'clasificacion_constructores'):
+                self.conexion.execute(f'DELETE FROM {tabla} WHERE año = ?', (año,))
+            self._guardar_circuitos([c['Circuit'] for c in carreras])
+            self._guardar_pilotos(list(pilotos.values()))
+            self._guardar_constructores(list(constructores.values()))
+            self.conexion.executemany(
+                'INSERT INTO carreras VALUES (?, ?, ?, ?, ?, ?)',
+                [(año, int(c['round']), c['raceName'], c['date'], c.get('time'), c['Circuit']['circuitId'])
+                 for c in carreras],
+            )
+            self.conexion.executemany('INSERT INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                      filas_resultados)
+            self.conexion.executemany('INSERT INTO sprints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                      filas_sprints)
+            self.conexion.executemany('INSERT OR REPLACE INTO clasificacion_pilotos VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                      filas_pilotos)
+            self.conexion.executemany('INSERT OR REPLACE INTO clasificacion_constructores VALUES (?, ?, ?, ?, ?, ?)',
+                                      filas_constructores)
+            self.conexion.execute(
+                'INSERT OR REPLACE INTO temporadas VALUES (?, ?, ?)',
+                (año, int(año < temporada_actual()), time.time()),
+            )
+        logging.info(f"Temporada {año} guardada: {len(carreras)} carreras, {len(filas_resultados)} resultados")
+
+    async def descargar(self, desde: int = PRIMERA_TEMPORADA, hasta: Optional[int] = None) -> None:
+        """
+        Descarga completa: catálogos históricos y todas las temporadas del rango.
+        """
+        hasta = hasta if hasta is not None else temporada_actual()
+        await self.descargar_catalogos()
+        for año in range(desde, hasta + 1):
+            await self.descargar_temporada(año)
+
+    async def actualizar(self) -> None:
+        """
+        Actualización incremental: sólo la temporada en curso y las que aún no
+        se habían guardado como completas (p. ej. la anterior tras el cambio de año).
+        """
+        actual = temporada_actual()
+        pendientes = [fila['año'] for fila in self.conexion.execute(
+            'SELECT año FROM temporadas WHERE completa = 0 AND año < ?', (actual,))]
+        await self.descargar_catalogos(f'{actual}/')
+        for año in pendientes + [actual]:
+            await self.descargar_temporada(año)
+
+
+###############################################################################
+# COMPROBACIÓN FRENTE A LA API
+###############################################################################
+
+def _resumen(resultados: Optional[List[Resultado]]) -> List[tuple]:
+    return [(r.posicion, r.piloto.id, r.constructor.id, r.puntos) for r in resultados or []]
+
+
+async def comprobar_resultados(cliente: ClienteErgast, snapshot: SnapshotF1, año: int) -> List[str]:
+    """
+    Compara los resultados por circuito de una temporada del snapshot con los de la API.
+
+    Incluye los circuitos con dos carreras en la misma temporada (p. ej. 2020),
+    en los que ambas vías deben devolver sólo la primera.
+
+    Args:
+        cliente (ClienteErgast): Cliente de la API sin snapshot
+        snapshot (SnapshotF1): Copia local que se comprueba
+        año (int): Año de la temporada
+
+    Returns:
+        list: Descripción de cada circuito en el que no coinciden (vacía si todo coincide)
+    """
+    diferencias = []
+    for circuito in snapshot.circuitos(año) or []:
+        circuito_id = circuito['circuitId']
+        local = snapshot.resultados(año, circuito_id)
+        locales = _resumen([Resultado.desde_api(r) for r in local or []])
+        remotos = _resumen(await cliente.resultados(str(año), circuito_id))
+        if locales != remotos:
+            diferencias.append(f"{año} {circuito_id}: {len(locales)} resultados en el snapshot, "
+                               f"{len(remotos)} en la API")
+    return diferencias
+
+
+async def _ejecutar(argumentos: argparse.Namespace) -> None:
+    cliente = ClienteErgast(limitador=LimitadorPeticiones())
+    conexion = conectar(argumentos.ruta)
+    descargador = DescargadorSnapshot(cliente, conexion)
+    try:
+        if argumentos.accion == 'descargar':
+            await descargador.descargar(argumentos.desde, argumentos.hasta)
+        elif argumentos.accion == 'comprobar':
+            snapshot = SnapshotF1(conexion)
+            hasta = argumentos.hasta if argumentos.hasta is not None else temporada_actual()
+            diferencias = []
+            for año in range(argumentos.desde, hasta + 1):
+                diferencias.extend(await comprobar_resultados(cliente, snapshot, año))
+            for diferencia in diferencias:
+                logging.error(f"Resultados distintos: {diferencia}")
+            logging.info(f"Comprobación terminada: {len(diferencias)} diferencias")
+        else:
+            await descargador.actualizar()
+    except ErrorErgast as e:
+        logging.error(f"Descarga interrumpida: {e}")
+    finally:
+        await cliente.cerrar()
+        conexion.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Descarga una copia local de los datos de F1 de la API Ergast")
+    parser.add_argument('accion', choices=['descargar', 'actualizar', 'comprobar'],
+                        help="descargar: copia completa; actualizar: sólo la temporada en curso; "
+                             "comprobar: compara los resultados guardados con los de la API")
+    parser.add_argument('--ruta', default='f1.sqlite', help="Fichero SQLite de destino")
+    parser.add_argument('--desde', type=int, default=PRIMERA_TEMPORADA, help="Primera temporada a descargar")
+    parser.add_argument('--hasta', type=int, default=None, help="Última temporada a descargar")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_ejecutar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
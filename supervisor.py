@@ -0,0 +1,217 @@
+###############################################################################
+# Supervisor del despliegue en varios procesos
+#
+# Reparte los shards de Discord entre varios procesos de BotMain.py, los
+# arranca escalonados (Discord limita los IDENTIFY simultáneos) y los
+# reinicia con espera exponencial si terminan inesperadamente. Todos los
+# procesos comparten la caché en disco de la API y la copia local, así que
+# lo que descarga un shard lo aprovechan los demás.
+#
+# Uso:
+#   python supervisor.py --procesos 2                # shards recomendados por Discord
+#   python supervisor.py --procesos 2 --shards 4
+###############################################################################
+
+from __future__ import annotations
+
+import argparse              # Para los argumentos de la línea de comandos
+import asyncio               # Para lanzar y vigilar los procesos
+import logging               # Para registro de eventos y errores
+import os                    # Para el entorno de cada proceso
+import random                # Para el jitter de los reinicios
+import signal                # Para detener los procesos al recibir SIGINT/SIGTERM
+import sys                   # Intérprete con el que se lanzan los procesos
+import time                  # Para medir cuánto ha durado cada proceso
+from typing import Dict, List, Optional
+
+import aiohttp               # Para consultar a Discord los shards recomendados
+from dotenv import load_dotenv  # Para cargar variables desde archivo .env
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Fichero de la caché de la API compartido si no se configura ERGAST_CACHE_DISCO
+CACHE_COMPARTIDA = os.path.join(RAIZ, 'ergast_cache.sqlite3')
+
+# Segundos entre el arranque de un proceso y el siguiente
+ESPERA_ARRANQUE = 5.0
+
+# Espera inicial y máxima (segundos) antes de reiniciar un proceso caído
+ESPERA_REINICIO = 2.0
+MAX_ESPERA_REINICIO = 300.0
+
+# Un proceso que ha funcionado más de estos segundos vuelve a la espera inicial
+TIEMPO_ESTABLE = 600.0
+
+# Código de salida de BotMain.py con un token inválido: no tiene sentido reiniciar
+CODIGO_TOKEN_INVALIDO = 2
+
+URL_GATEWAY = 'https://discord.com/api/v10/gateway/bot'
+
+
+def repartir_shards(shards: int, procesos: int) -> List[List[int]]:
+    """
+    Reparte los shards en bloques consecutivos, uno por proceso.
+
+    Args:
+        shards (int): Número total de shards
+        procesos (int): Número de procesos
+
+    Returns:
+        list: IDs de shard de cada proceso (sin procesos vacíos)
+    """
+    procesos = max(1, min(procesos, shards))
+    base, resto = divmod(shards, procesos)
+    bloques, inicio = [], 0
+    for i in range(procesos):
+        tamaño = base + (1 if i < resto else 0)
+        bloques.append(list(range(inicio, inicio + tamaño)))
+        inicio += tamaño
+    return bloques
+
+
+async def shards_recomendados(token: str) -> int:
+    """
+    Pregunta a Discord cuántos shards recomienda para el bot.
+    """
+    async with aiohttp.ClientSession() as sesion:
+        async with sesion.get(URL_GATEWAY, headers={'Authorization': f'Bot {token}'}) as respuesta:
+            respuesta.raise_for_status()
+            return int((await respuesta.json())['shards'])
+
+
+class ProcesoBot:
+    """
+    Un proceso de BotMain.py con sus shards, que se reinicia si termina con error.
+
+    Args:
+        indice (int): Número de proceso (0 es el que hace la precarga)
+        shard_ids (list): Shards que atiende
+        entorno (dict): Variables de entorno del proceso
+    """
+
+    def __init__(self, indice: int, shard_ids: List[int], entorno: Dict[str, str]):
+        self.indice = indice
+        self.shard_ids = shard_ids
+        self.entorno = entorno
+        self.reinicios = 0
+        self.proceso: Optional[asyncio.subprocess.Process] = None
+
+    async def ejecutar(self, parar: asyncio.Event) -> None:
+        """
+        Mantiene el proceso en marcha hasta que se pida parar o falle el token.
+        """
+        espera = ESPERA_REINICIO
+        while not parar.is_set():
+            inicio = time.monotonic()
+            self.proceso = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.join(RAIZ, 'BotMain.py'), env=self.entorno, cwd=RAIZ)
+            logging.info(f"Proceso {self.indice} (shards {self.shard_ids}) arrancado con PID {self.proceso.pid}")
+            if parar.is_set():
+                self.terminar()
+            codigo = await self.proceso.wait()
+            if parar.is_set():
+                return
+            if codigo == CODIGO_TOKEN_INVALIDO:
+                logging.error(f"Proceso {self.indice}: token inválido, no se reinicia")
+                return
+            if time.monotonic() - inicio > TIEMPO_ESTABLE:
+                espera = ESPERA_REINICIO
+            retraso = espera * random.uniform(0.5, 1.5)
+            logging.warning(f"Proceso {self.indice} terminó con código {codigo}; se reinicia en {retraso:.1f} s")
+            self.reinicios += 1
+            try:
+                await asyncio.wait_for(parar.wait(), timeout=retraso)
+                return
+            except asyncio.TimeoutError:
+                pass
+            espera = min(espera * 2, MAX_ESPERA_REINICIO)
+
+    def terminar(self) -> None:
+        """
+        Envía SIGTERM al proceso si sigue en marcha.
+        """
+        if self.proceso is not None and self.proceso.returncode is None:
+            self.proceso.terminate()
+
+
+def preparar_entornos(bloques: List[List[int]], shards: int) -> List[Dict[str, str]]:
+    """
+    Variables de entorno de cada proceso: sus shards, la caché compartida y su puerto de métricas.
+    """
+    base = dict(os.environ)
+    base.setdefault('ERGAST_CACHE_DISCO', CACHE_COMPARTIDA)
+    puerto_metricas = base.get('METRICAS_PUERTO')
+    entornos = []
+    for indice, shard_ids in enumerate(bloques):
+        entorno = dict(base)
+        entorno.update({
+            'F1_SHARD_IDS': ','.join(map(str, shard_ids)),
+            'F1_SHARD_COUNT': str(shards),
+            'F1_PROCESOS': str(len(bloques)),
+            'F1_PROCESO': str(indice),
+        })
+        if puerto_metricas:
+            entorno['METRICAS_PUERTO'] = str(int(puerto_metricas) + indice)
+        entornos.append(entorno)
+    return entornos
+
+
+async def supervisar(procesos: int, shards: Optional[int], espera_arranque: float) -> None:
+    """
+    Arranca los procesos escalonados y los vigila hasta recibir SIGINT/SIGTERM.
+    """
+    if shards is None:
+        shards = await shards_recomendados(os.environ['DISCORD_TOKEN'])
+        logging.info(f"Discord recomienda {shards} shards")
+    bloques = repartir_shards(shards, procesos)
+    bots = [ProcesoBot(i, bloque, entorno)
+            for i, (bloque, entorno) in enumerate(zip(bloques, preparar_entornos(bloques, shards)))]
+
+    parar = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for señal in (signal.SIGINT, signal.SIGTERM):
+        bucle.add_signal_handler(señal, parar.set)
+
+    tareas = []
+    for bot in bots:
+        tareas.append(asyncio.create_task(bot.ejecutar(parar)))
+        if bot is not bots[-1]:
+            try:
+                await asyncio.wait_for(parar.wait(), timeout=espera_arranque)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+    # Se sigue hasta recibir una señal o hasta que todos los procesos terminen (p. ej. token inválido)
+    todas = asyncio.gather(*tareas)
+    esperar_parada = asyncio.create_task(parar.wait())
+    await asyncio.wait([todas, esperar_parada], return_when=asyncio.FIRST_COMPLETED)
+    parar.set()
+    logging.info("Deteniendo los procesos del bot")
+    for bot in bots:
+        bot.terminar()
+    await todas
+    esperar_parada.cancel()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Lanza el bot de F1 repartido en varios procesos con shards")
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Número de procesos")
+    parser.add_argument('--shards', type=int, default=None,
+                        help="Número total de shards (por defecto, el recomendado por Discord)")
+    parser.add_argument('--espera-arranque', type=float, default=ESPERA_ARRANQUE,
+                        help="Segundos entre el arranque de un proceso y el siguiente")
+    argumentos = parser.parse_args()
+    if not os.getenv('DISCORD_TOKEN'):
+        raise SystemExit("No se encontró DISCORD_TOKEN en las variables de entorno")
+    try:
+        asyncio.run(supervisar(argumentos.procesos, argumentos.shards, argumentos.espera_arranque))
+    except KeyboardInterrupt:
+        # Ctrl+C llega también a los procesos hijos (mismo grupo); ya se han detenido
+        pass
+
+
+if __name__ == '__main__':
+    main()
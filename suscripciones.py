@@ -0,0 +1,203 @@
+###############################################################################
+# Suscripciones de canales a los avisos del bot
+#
+# Cada canal suscrito guarda si quiere recordatorios antes de cada sesión,
+# con cuántos minutos de antelación, si quiere los resultados en cuanto se
+# publican y en qué zona horaria mostrar las horas (si no la fija, se usa la
+# de su servidor y, si tampoco, la hora española). Todo se guarda en SQLite
+# y se mantiene en memoria con índices por tipo de aviso, de modo que al
+# llegar un aviso se sabe a qué canales enviarlo sin recorrerlos todos.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para llevar la escritura en disco a un hilo aparte
+import sqlite3               # Almacén persistente
+import threading             # Para serializar el acceso a la conexión SQLite
+from typing import Dict, Iterable, NamedTuple, Optional, Set
+
+from cache import ESPERA_BLOQUEO_DISCO
+
+# Zona horaria de los canales y servidores que no han elegido otra
+ZONA_POR_DEFECTO = 'Europe/Madrid'
+
+# Antelación de los recordatorios, en minutos
+ANTELACION_POR_DEFECTO = 30
+ANTELACION_MINIMA = 5
+ANTELACION_MAXIMA = 24 * 60
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS canales (
+    canal_id INTEGER PRIMARY KEY, servidor_id INTEGER, zona TEXT,
+    recordatorios INTEGER NOT NULL, resultados INTEGER NOT NULL, antelacion INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS canales_servidor ON canales (servidor_id);
+CREATE TABLE IF NOT EXISTS servidores (
+    servidor_id INTEGER PRIMARY KEY, zona TEXT NOT NULL
+);
+"""
+
+
+class Suscripcion(NamedTuple):
+    canal_id: int
+    servidor_id: Optional[int]
+    zona: Optional[str]          # None: la del servidor
+    recordatorios: bool
+    resultados: bool
+    antelacion: int              # Minutos antes de cada sesión
+
+    @property
+    def activa(self) -> bool:
+        return self.recordatorios or self.resultados
+
+
+def zona_valida(nombre: str) -> Optional[str]:
+    """
+    Comprueba un nombre de zona horaria de la base de datos IANA (p. ej. "America/Mexico_City").
+
+    Returns:
+        str: El nombre tal como lo escribe pytz, o None si no existe
+    """
+    # Se importa al usarla: las zonas horarias no retrasan el arranque
+    import pytz
+    try:
+        return pytz.timezone(nombre.strip()).zone
+    except pytz.UnknownTimeZoneError:
+        return None
+
+
+class Suscripciones:
+    """
+    Preferencias de avisos de los canales y zonas horarias de los servidores.
+
+    Args:
+        ruta_fichero (str): Fichero SQLite (":memory:" para no guardarlas)
+    """
+
+    def __init__(self, ruta_fichero: str = ':memory:'):
+        self._bloqueo = threading.Lock()
+        # Varios procesos (p. ej. los de un despliegue con shards) pueden compartir el fichero
+        self._conexion = sqlite3.connect(ruta_fichero, check_same_thread=False, timeout=ESPERA_BLOQUEO_DISCO)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.executescript(ESQUEMA)
+        self.canales: Dict[int, Suscripcion] = {}
+        self.zonas_servidor: Dict[int, str] = {}
+        # Índices de los avisos: canales con recordatorios por antelación y canales con resultados
+        self.por_antelacion: Dict[int, Set[int]] = {}
+        self.con_resultados: Set[int] = set()
+        self._cargar()
+
+    def __len__(self) -> int:
+        return len(self.canales)
+
+    def _cargar(self) -> None:
+        with self._bloqueo:
+            filas = self._conexion.execute(
+                'SELECT canal_id, servidor_id, zona, recordatorios, resultados, antelacion FROM canales').fetchall()
+            zonas = self._conexion.execute('SELECT servidor_id, zona FROM servidores').fetchall()
+        for canal_id, servidor_id, zona, recordatorios, resultados, antelacion in filas:
+            self._indexar(Suscripcion(canal_id, servidor_id, zona, bool(recordatorios), bool(resultados), antelacion))
+        self.zonas_servidor.update(zonas)
+
+    def _indexar(self, suscripcion: Suscripcion) -> None:
+        self._desindexar(suscripcion.canal_id)
+        self.canales[suscripcion.canal_id] = suscripcion
+        if suscripcion.recordatorios:
+            self.por_antelacion.setdefault(suscripcion.antelacion, set()).add(suscripcion.canal_id)
+        if suscripcion.resultados:
+            self.con_resultados.add(suscripcion.canal_id)
+
+    def _desindexar(self, canal_id: int) -> None:
+        anterior = self.canales.pop(canal_id, None)
+        if anterior is None:
+            return
+        canales = self.por_antelacion.get(anterior.antelacion)
+        if canales is not None:
+            canales.discard(canal_id)
+            if not canales:
+                del self.por_antelacion[anterior.antelacion]
+        self.con_resultados.discard(canal_id)
+
+    ###########################################################################
+    # Consultas
+    ###########################################################################
+
+    def de_canal(self, canal_id: int, servidor_id: Optional[int] = None) -> Suscripcion:
+        """
+        Devuelve la suscripción de un canal (sin avisos si no tiene).
+        """
+        suscripcion = self.canales.get(canal_id)
+        if suscripcion is None:
+            return Suscripcion(canal_id, servidor_id, None, False, False, ANTELACION_POR_DEFECTO)
+        return suscripcion
+
+    def zona(self, canal_id: Optional[int], servidor_id: Optional[int]) -> str:
+        """
+        Zona horaria de un canal: la suya, la de su servidor o la zona por defecto.
+        """
+        suscripcion = self.canales.get(canal_id)
+        if suscripcion is not None and suscripcion.zona:
+            return suscripcion.zona
+        return self.zonas_servidor.get(servidor_id, ZONA_POR_DEFECTO)
+
+    @property
+    def antelaciones(self) -> Iterable[int]:
+        """
+        Antelaciones distintas con algún canal suscrito a los recordatorios.
+        """
+        return self.por_antelacion.keys()
+
+    ###########################################################################
+    # Cambios (se guardan en disco en un hilo aparte)
+    ###########################################################################
+
+    async def guardar(self, suscripcion: Suscripcion) -> None:
+        """
+        Guarda las preferencias de un canal; si ya no tiene avisos ni zona propia, lo borra.
+        """
+        if not suscripcion.activa and suscripcion.zona is None:
+            await self.borrar_canal(suscripcion.canal_id)
+            return
+        self._indexar(suscripcion)
+        await asyncio.to_thread(self._escribir,
+                                'INSERT OR REPLACE INTO canales (canal_id, servidor_id, zona, recordatorios, '
+                                'resultados, antelacion) VALUES (?, ?, ?, ?, ?, ?)',
+                                (suscripcion.canal_id, suscripcion.servidor_id, suscripcion.zona,
+                                 int(suscripcion.recordatorios), int(suscripcion.resultados), suscripcion.antelacion))
+
+    async def fijar_zona_servidor(self, servidor_id: int, zona: Optional[str]) -> None:
+        """
+        Fija la zona horaria por defecto de un servidor (None vuelve a la zona por defecto).
+        """
+        if zona is None:
+            self.zonas_servidor.pop(servidor_id, None)
+            await asyncio.to_thread(self._escribir, 'DELETE FROM servidores WHERE servidor_id = ?', (servidor_id,))
+            return
+        self.zonas_servidor[servidor_id] = zona
+        await asyncio.to_thread(self._escribir, 'INSERT OR REPLACE INTO servidores (servidor_id, zona) VALUES (?, ?)',
+                                (servidor_id, zona))
+
+    async def borrar_canal(self, canal_id: int) -> None:
+        if canal_id not in self.canales:
+            return
+        self._desindexar(canal_id)
+        await asyncio.to_thread(self._escribir, 'DELETE FROM canales WHERE canal_id = ?', (canal_id,))
+
+    async def borrar_servidor(self, servidor_id: int) -> None:
+        """
+        Olvida un servidor y todos sus canales (p. ej. cuando expulsa al bot).
+        """
+        for suscripcion in [s for s in self.canales.values() if s.servidor_id == servidor_id]:
+            self._desindexar(suscripcion.canal_id)
+        self.zonas_servidor.pop(servidor_id, None)
+        await asyncio.to_thread(self._escribir, 'DELETE FROM canales WHERE servidor_id = ?', (servidor_id,))
+        await asyncio.to_thread(self._escribir, 'DELETE FROM servidores WHERE servidor_id = ?', (servidor_id,))
+
+    def _escribir(self, sentencia: str, parametros: tuple) -> None:
+        with self._bloqueo:
+            self._conexion.execute(sentencia, parametros)
+            self._conexion.commit()
+
+    def cerrar(self) -> None:
+        with self._bloqueo:
+            self._conexion.close()
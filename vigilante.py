@@ -0,0 +1,151 @@
+###############################################################################
+# Vigilante del bucle de eventos
+#
+# Un hilo aparte comprueba que el bucle de asyncio sigue latiendo. Si deja de
+# hacerlo durante más de un umbral (algo lo está bloqueando: una petición
+# síncrona, un bucle muy largo...), captura la pila del hilo del bucle y la
+# registra junto con el comando que se estaba ejecutando. Desde el propio
+# bucle no se puede ver un bloqueo mientras dura; desde otro hilo, sí.
+#
+# Incluye también el modo de depuración de asyncio, que avisa de cada
+# callback que tarda más de lo configurado.
+###############################################################################
+
+from __future__ import annotations
+
+import asyncio               # Para el latido dentro del bucle
+import logging               # Para registro de eventos y errores
+import sys                   # Para capturar la pila del hilo del bucle
+import threading             # Hilo vigilante, independiente del bucle
+import time                  # Reloj monotónico para medir los bloqueos
+import traceback             # Para formatear la pila capturada
+from typing import Dict, Optional
+
+from metricas import REGISTRO
+
+# Segundos sin latido a partir de los cuales se considera bloqueado el bucle
+UMBRAL_BLOQUEO = 0.25
+
+# Cada cuánto late el bucle y cada cuánto lo comprueba el hilo vigilante
+INTERVALO_LATIDO = 0.05
+
+# Duración a partir de la cual el modo de depuración de asyncio avisa de un callback lento
+UMBRAL_CALLBACK_LENTO = 0.1
+
+bloqueos_bucle = REGISTRO.contador(
+    'f1bot_bucle_bloqueos_total', 'Bloqueos del bucle de eventos por encima del umbral', ('comando',))
+
+
+class VigilanteBucle:
+    """
+    Detecta bloqueos del bucle de eventos desde un hilo aparte.
+
+    Args:
+        umbral (float): Segundos sin latido para considerar bloqueado el bucle
+        intervalo (float): Segundos entre latidos y entre comprobaciones
+    """
+
+    def __init__(self, umbral: float = UMBRAL_BLOQUEO, intervalo: float = INTERVALO_LATIDO):
+        self.umbral = umbral
+        self.intervalo = intervalo
+        self.bloqueos = 0
+        self._latido = time.monotonic()
+        self._avisado = False
+        self._bucle: Optional[asyncio.AbstractEventLoop] = None
+        self._id_hilo_bucle: Optional[int] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        # Comando que ejecuta cada tarea (lo escribe el bucle y lo lee el hilo vigilante)
+        self._comandos: Dict[asyncio.Task, str] = {}
+
+    def iniciar(self) -> None:
+        """
+        Arranca el latido en el bucle actual y el hilo vigilante.
+        """
+        if self._hilo is not None:
+            return
+        self._bucle = asyncio.get_running_loop()
+        self._id_hilo_bucle = threading.get_ident()
+        self._latido = time.monotonic()
+        self._parar.clear()
+        self._tarea = asyncio.create_task(self._latir())
+        self._hilo = threading.Thread(target=self._vigilar, name='vigilante-bucle', daemon=True)
+        self._hilo.start()
+
+    async def detener(self) -> None:
+        """
+        Detiene el latido y el hilo vigilante.
+        """
+        self._parar.set()
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        if self._hilo is not None:
+            self._hilo.join(timeout=1)
+            self._hilo = None
+
+    def registrar_comando(self, descripcion: str) -> None:
+        """
+        Asocia un comando (p. ej. el texto del mensaje) a la tarea en curso.
+        """
+        tarea = asyncio.current_task()
+        if tarea is not None:
+            self._comandos[tarea] = descripcion
+
+    def olvidar_comando(self) -> None:
+        """
+        Deja de asociar un comando a la tarea en curso.
+        """
+        self._comandos.pop(asyncio.current_task(), None)
+
+    async def _latir(self) -> None:
+        while True:
+            self._latido = time.monotonic()
+            self._avisado = False
+            await asyncio.sleep(self.intervalo)
+
+    def _vigilar(self) -> None:
+        """
+        Bucle del hilo vigilante: avisa una vez por cada bloqueo que supere el umbral.
+        """
+        while not self._parar.wait(self.intervalo):
+            bloqueado = time.monotonic() - self._latido
+            if bloqueado > self.umbral and not self._avisado:
+                self._avisado = True
+                self._avisar(bloqueado)
+
+    def _avisar(self, bloqueado: float) -> None:
+        """
+        Registra la pila del hilo del bucle y el comando que lo está bloqueando.
+        """
+        marco = sys._current_frames().get(self._id_hilo_bucle)
+        pila = ''.join(traceback.format_stack(marco)) if marco is not None else '(pila no disponible)'
+        try:
+            tarea = asyncio.current_task(self._bucle)
+        except RuntimeError:
+            tarea = None
+        comando = self._comandos.get(tarea) if tarea is not None else None
+        self.bloqueos += 1
+        bloqueos_bucle.inc(comando=comando.split(' ', 1)[0] if comando else '')
+        contexto = f" durante el comando {comando!r}" if comando else ''
+        logging.warning(f"Bucle de eventos bloqueado más de {bloqueado:.3f} s{contexto}. Pila:\n{pila}")
+
+
+def activar_depuracion_asyncio(umbral: float = UMBRAL_CALLBACK_LENTO) -> None:
+    """
+    Activa el modo de depuración de asyncio en el bucle actual: registra cada
+    callback que tarde más de `umbral` segundos y las corrutinas que nunca se esperan.
+
+    Args:
+        umbral (float): Segundos a partir de los cuales un callback se considera lento
+    """
+    bucle = asyncio.get_running_loop()
+    bucle.set_debug(True)
+    bucle.slow_callback_duration = umbral
+    logging.getLogger('asyncio').setLevel(logging.WARNING)
+    logging.info(f"Modo de depuración de asyncio activado (callbacks lentos > {umbral} s)")